@@ -0,0 +1,231 @@
+# async_checker.py
+"""
+asyncio tabanlı eşzamanlı link kontrolü (aiohttp).
+Genel bir eşzamanlılık sınırı ve host başına ayrı bir sınır uygular; yönlendirmeler elle
+izlenir, böylece doi.org'dan sonra varılan yayıncı host'u da kendi sınırına ve nezaket
+beklemesine tabidir;
+dönüş sözleşmesi check_url ile aynıdır: (status, has_title, info, is_accessible).
+Birden çok makalenin adayı olan URL (ör. sayı PDF'i, dergi sayfası) bir kez indirilir;
+başlıklar TitleMatcher ile tek taramada aranır.
+"""
+import asyncio
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from config import UA, TIMEOUT, HTTP_MAX_BYTES, ASYNC_CONCURRENCY, ASYNC_PER_HOST, PDF_MAX_BYTES
+from fetcher import HttpPage, http_verdict, sniff_charset
+from utils import is_pdf_mime_or_url, cached_pdf_text
+from polite import get_scheduler
+from pdf_cache import pdf_validator
+from titlematch import TitleMatcher
+
+Verdict = Tuple[int, bool, str, bool, str]
+
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 10
+
+
+def aiohttp_available() -> bool:
+    try:
+        import aiohttp  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class AsyncLinkChecker:
+    """
+    Kullanım:
+        async with AsyncLinkChecker(concurrency=32, per_host=4) as checker:
+            status, has_title, info, ok = await checker.check_url(url, title_norm)
+    """
+
+    def __init__(self, concurrency: int = ASYNC_CONCURRENCY, per_host: int = ASYNC_PER_HOST,
+                 timeout: float = TIMEOUT):
+        self.concurrency = max(1, int(concurrency))
+        self.per_host = max(1, int(per_host))
+        self.timeout = timeout
+        self._session = None
+        self._global_sem: Optional[asyncio.Semaphore] = None
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+        # Birden çok işte geçen URL'ler: kalan kullanıcı sayısı ve ortak indirme
+        self._share_left: Dict[str, int] = {}
+        self._shared: Dict[str, "asyncio.Future[HttpPage]"] = {}
+        self.shared_hits = 0
+
+    async def __aenter__(self) -> "AsyncLinkChecker":
+        try:
+            import aiohttp
+        except ImportError:
+            raise RuntimeError("aiohttp kurulu değil: pip install aiohttp")
+        self._global_sem = asyncio.Semaphore(self.concurrency)
+        # Sınırları semaforlarla biz uyguluyoruz; connector yalnızca havuzlasın
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": UA},
+            # requests'teki gibi bağlantı ve okuma başına süre; toplam süre sınırı yok
+            # (yavaş ama akan PDF'ler PDF_MAX_BYTES'a kadar okunabilsin, iki katman aynı davransın)
+            timeout=aiohttp.ClientTimeout(total=None, connect=self.timeout, sock_read=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _host_sem(self, url: str) -> asyncio.Semaphore:
+        host = (urlsplit(url).hostname or "").lower()
+        sem = self._host_sems.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self.per_host)
+            self._host_sems[host] = sem
+        return sem
+
+    async def fetch(self, url: str) -> HttpPage:
+        """fetcher.http_fetch'in async karşılığı (aynı HttpPage döner)."""
+        for _ in range(_MAX_REDIRECTS + 1):
+            # Her yönlendirme adımı kendi host'unun sınırı ve sırasıyla
+            async with self._host_sem(url):
+                # Host bazında nezaket: yalnızca bu host'un sırası bekletilir; bekleyen
+                # istek genel eşzamanlılık hakkını meşgul etmesin
+                await get_scheduler().acquire_async(url)
+                async with self._global_sem:
+                    page, location = await self._get(url)
+            if page is not None:
+                return page
+            url = location
+        return HttpPage(0, url, "", "", b"", f"{_MAX_REDIRECTS}'dan fazla yönlendirme")
+
+    def share(self, url_lists: Iterable[List[str]]) -> None:
+        """Birden çok aday listesinde geçen URL'ler tek indirmeyle paylaşılsın."""
+        counts = Counter(u for urls in url_lists for u in set(urls) if u)
+        self._share_left = {u: n for u, n in counts.items() if n > 1}
+
+    async def fetch_shared(self, url: str) -> HttpPage:
+        """Paylaşılan URL'de ilk çağıran indirir, diğerleri aynı sonucu bekler."""
+        if url not in self._share_left:
+            return await self.fetch(url)
+        task = self._shared.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self.fetch(url))
+            self._shared[url] = task
+        else:
+            self.shared_hits += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            # Son kullanıcı da aldıysa sayfa bellekte tutulmasın
+            self._share_left[url] -= 1
+            if self._share_left[url] <= 0:
+                del self._share_left[url]
+                self._shared.pop(url, None)
+
+    async def _get(self, url: str) -> Tuple[Optional[HttpPage], str]:
+        """Tek istek. Dönüş: (sayfa, "") ya da yönlendirmede (None, sonraki_url)."""
+        import aiohttp
+        try:
+            async with self._session.get(url, allow_redirects=False) as resp:
+                location = resp.headers.get("Location")
+                if resp.status in _REDIRECT_STATUSES and location:
+                    return None, urljoin(str(resp.url) or url, location)
+                mime_type = (resp.content_type or "").lower()
+                final_url = str(resp.url) or url
+                validator = pdf_validator(resp.headers)
+                if is_pdf_mime_or_url(mime_type, final_url):
+                    cached = cached_pdf_text(final_url, validator=validator) if resp.status == 200 else None
+                    if cached is not None:
+                        return HttpPage(resp.status, final_url, mime_type, "", b"", "", cached, validator), ""
+                    content, truncated = await self._read_pdf(resp)
+                    return HttpPage(resp.status, final_url, mime_type, "", content, "", None,
+                                    validator, truncated), ""
+                buf = bytearray()
+                while len(buf) < HTTP_MAX_BYTES:
+                    chunk = await resp.content.read(64 * 1024)
+                    if not chunk:
+                        break
+                    buf.extend(chunk)
+                if bytes(buf[:5]) == b"%PDF-":
+                    # Content-Type yanlış olabilir; imzadan PDF olduğu anlaşılıyor
+                    cached = cached_pdf_text(final_url, validator=validator) if resp.status == 200 else None
+                    if cached is not None:
+                        return HttpPage(resp.status, final_url, "application/pdf", "", b"", "",
+                                        cached, validator), ""
+                    rest, truncated = await self._read_pdf(resp, len(buf))
+                    buf.extend(rest)
+                    return HttpPage(resp.status, final_url, "application/pdf", "", bytes(buf), "",
+                                    None, validator, truncated), ""
+                body = bytes(buf)
+                text = body.decode(sniff_charset(resp.headers.get("Content-Type") or "", body),
+                                   errors="replace")
+                return HttpPage(resp.status, final_url, mime_type, text, b"", ""), ""
+        except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeError) as e:
+            return HttpPage(0, url, "", "", b"", str(e) or e.__class__.__name__), ""
+
+    @staticmethod
+    async def _read_pdf(resp, already: int = 0) -> Tuple[bytes, bool]:
+        """
+        PDF gövdesini en fazla PDF_MAX_BYTES (baştan okunmuş already dahil) oku.
+        Dönüş: (bytes, kesildi_mi) — read_capped ile aynı.
+        """
+        buf = bytearray()
+        while already + len(buf) < PDF_MAX_BYTES:
+            chunk = await resp.content.read(64 * 1024)
+            if not chunk:
+                return bytes(buf), False
+            buf.extend(chunk)
+        return bytes(buf[:max(0, PDF_MAX_BYTES - already)]), True
+
+    async def check_verdict(self, url: str, title_norm: str,
+                            matcher: Optional[TitleMatcher] = None) -> Verdict:
+        """(status, has_title, info, is_accessible, escalate_reason)"""
+        if not url:
+            return 0, False, "boş URL", False, ""
+        page = await self.fetch_shared(url)
+        # PDF metin çıkarma süreç havuzunda; sonucu beklerken event loop bloklanmasın
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, http_verdict, page, title_norm, matcher, url)
+
+    async def check_url(self, url: str, title_norm: str) -> Tuple[int, bool, str, bool]:
+        status, has_title, info, is_accessible, _ = await self.check_verdict(url, title_norm)
+        return status, has_title, info, is_accessible
+
+    async def check_candidates(self, urls: List[str], title_norm: str,
+                               matcher: Optional[TitleMatcher] = None) -> Dict[str, Verdict]:
+        """
+        Bir makalenin aday URL'lerini sırayla dene; ilk 200 + başlıkta dur.
+        Dönüş: {url: verdict} (denenen URL'ler).
+        """
+        verdicts: Dict[str, Verdict] = {}
+        for url in urls:
+            if url in verdicts:
+                continue
+            v = await self.check_verdict(url, title_norm, matcher)
+            verdicts[url] = v
+            if v[0] == 200 and v[1]:
+                break
+        return verdicts
+
+
+async def _check_many(jobs: List[Tuple[List[str], str]], concurrency: int, per_host: int,
+                      matcher: Optional[TitleMatcher]) -> List[Dict[str, Verdict]]:
+    async with AsyncLinkChecker(concurrency=concurrency, per_host=per_host) as checker:
+        checker.share(urls for urls, _ in jobs)
+        return await asyncio.gather(*(checker.check_candidates(urls, t, matcher) for urls, t in jobs))
+
+
+def check_many(jobs: List[Tuple[List[str], str]], concurrency: int = ASYNC_CONCURRENCY,
+               per_host: int = ASYNC_PER_HOST,
+               matcher: Optional[TitleMatcher] = None) -> List[Dict[str, Verdict]]:
+    """
+    Senkron kod için giriş noktası. jobs: [(aday_url_listesi, title_norm), ...]
+    Her makalenin adayları kendi içinde sıralı, makaleler birbirine paralel denenir.
+    matcher: sayfadaki tüm başlıklar URL başına kaydedilir (processor tekrar açmadan kullanır).
+    Dönüş sırası jobs ile aynıdır.
+    """
+    if not jobs:
+        return []
+    return asyncio.run(_check_many(jobs, concurrency, per_host, matcher))
+
@@ -5,6 +5,47 @@ CROSSREF_API_TEMPLATE = (
     "&rows=50&sort=created&order=asc"
 )
 
+# Cursor (deep paging) ile sayfa sayfa akış: {rows} sayfa boyu, {cursor} ilk istekte "*"
+CROSSREF_CURSOR_TEMPLATE = (
+    "https://api.crossref.org/journals/{issn}/works"
+    "?select=DOI,prefix,title,publisher,type,resource,URL,ISSN,created,container-title"
+    "&rows={rows}&sort=created&order=asc&cursor={cursor}"
+)
+# Sayfa başına kayıt (Crossref en fazla 1000 kabul eder)
+CROSSREF_ROWS = 100
+# Dergi başına en fazla kaç makale test edilsin (0: hepsi). 50 = eski davranış
+CROSSREF_MAX_ITEMS = 50
+# Kontrol sürerken arka planda önceden indirilecek sayfa sayısı
+CROSSREF_PREFETCH_PAGES = 2
+# Link kontrolü sürerken sıradaki kaç derginin ilk Crossref sayfası önceden indirilsin
+# (prefetch.py, main.py --prefetch); 0: kapalı
+CROSSREF_PREFETCH_JOURNALS = 4
+# Toplu hasat (main.py --batch N): N derginin kayıtları tek /works?filter=issn:A,issn:B,... sorgusu
+# ile çekilip kayıtların ISSN alanına göre dergilere dağıtılır. 0: kapalı (her dergiye ayrı istek)
+CROSSREF_BATCH_TEMPLATE = (
+    "https://api.crossref.org/works?filter={filter}"
+    "&select=DOI,prefix,title,publisher,type,resource,URL,ISSN,created,container-title"
+    "&rows={rows}&sort=created&order=asc&cursor={cursor}"
+)
+CROSSREF_BATCH_SIZE = 0
+CROSSREF_BATCH_ROWS = 1000
+# Toplu sorguda en fazla kaç sayfa gezilsin; bu sürede tamamlanamayan dergiler ayrı sorguya düşer
+CROSSREF_BATCH_MAX_PAGES = 3
+# Yıl tabakalı örnekleme (main.py --sample N): dergi başına N makale, yayın yıllarına (published
+# facet) orantılı dağıtılıp her tabakadan Crossref sample= ile rastgele çekilir
+CROSSREF_FACET_TEMPLATE = "https://api.crossref.org/journals/{issn}/works?rows=0&facet=published:*"
+CROSSREF_SAMPLE_TEMPLATE = (
+    "https://api.crossref.org/journals/{issn}/works?filter={filter}&sample={sample}"
+    "&select=DOI,prefix,title,publisher,type,resource,URL,ISSN,created,container-title,published"
+)
+CROSSREF_SAMPLE_SIZE = 0
+# En fazla kaç tabaka (her tabaka bir istek); yıllar nüfusu yakın ardışık aralıklara birleştirilir
+CROSSREF_SAMPLE_MAX_STRATA = 5
+# Crossref sample= üst sınırı
+CROSSREF_SAMPLE_LIMIT = 100
+# Önceden indirilmiş (henüz işlenmemiş) sayfaların bellekte tutabileceği toplam boyut
+CROSSREF_PREFETCH_MAX_BYTES = 64 * 1024 * 1024
+
 UA = "AcademicLinkTester/1.0"
 TIMEOUT = 5
 
@@ -13,3 +54,148 @@ START_INDEX = 1
 
 # Hedef siteleri yormamak için (saniye)
 POLITE_DELAY = 0.5
+
+# Host bazında nezaket (polite.HostScheduler): aynı host'a iki istek arası en az
+# HOST_MIN_INTERVAL saniye; saniyede HOST_RATE istek, en fazla HOST_BURST birikim.
+# Farklı host'lara giden istekler birbirini bekletmez.
+HOST_MIN_INTERVAL = POLITE_DELAY
+HOST_RATE = 2.0
+HOST_BURST = 2
+
+# ---------- Katmanlı fetch (önce düz HTTP, gerekirse Selenium) ----------
+# "tiered": önce requests ile dene, sonuç belirsizse tarayıcıya geç
+# "selenium": her URL doğrudan tarayıcıda açılır (eski davranış)
+FETCHER = "tiered"
+
+# Havuzlanmış HTTP istemcisi: host başına açık tutulacak bağlantı sayısı
+HTTP_POOL_SIZE = 20
+
+# HTML yanıtında okunacak en fazla bayt (dev sayfalar belleği şişirmesin)
+HTTP_MAX_BYTES = 5 * 1024 * 1024
+
+# ---------- Başlık eşleştirme (textnorm.py) ----------
+# Tam eşleşme yoksa başlık kelimelerinin en az bu oranı sayfada geçerse başlık bulunmuş sayılır
+# (0: kapalı, yalnızca normalize metinde tam eşleşme)
+TITLE_SIMILARITY = 0.0
+# Bundan az kelimeli başlıklarda benzerlik kullanılmaz (yanlış pozitif)
+TITLE_SIMILARITY_MIN_TOKENS = 4
+# Normalize başlık önbelleği (lru_cache boyutu)
+TITLE_NORM_CACHE = 65536
+
+# HTML'den görünür metin çıkarma (htmltext.py): "auto" | "selectolax" | "lxml" | "regex"
+# auto: kurulu olan en hızlı ayrıştırıcı, hiçbiri yoksa stdlib regex
+HTML_PARSER = "auto"
+
+# ---------- PDF metin çıkarma (pdf_service.py) ----------
+# İndirilecek en fazla PDF baytı; fazlası okunmaz (taranmış sayı PDF'leri onlarca MB olabilir)
+PDF_MAX_BYTES = 8 * 1024 * 1024
+# Yalnızca ilk N sayfa okunur (başlık ilk sayfalarda); 0: hepsi
+PDF_MAX_PAGES = 3
+# Tek PDF için en fazla çıkarma süresi (saniye)
+PDF_TIMEOUT = 20
+# Çıkarma süreç havuzu boyutu (0: çekirdek sayısı - 1)
+PDF_WORKERS = 0
+# pdfminer yoksa/hata verirse/süre dolarsa: "latin1" (ham baytlardan kaba metin) ya da "none" (boş metin)
+PDF_FALLBACK = "latin1"
+
+# Çıkarılmış PDF metni önbelleği (pdf_cache.py): içerik SHA-256'sı + URL eşlemesi, zlib
+PDF_CACHE_DIR = ".pdf_cache"
+PDF_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Görünür metni bundan kısa olan HTML'ler "yalnızca JS kabuğu" sayılır
+JS_SHELL_MIN_TEXT = 200
+
+# Selenium'da başlık/404 kontrolü nerede yapılsın:
+# "page": sayfanın içinde (execute_script, document.body.innerText); yalnızca küçük bir sonuç döner
+# "source": driver.page_source çekilip Python'da aranır (eski davranış)
+SELENIUM_TITLE_CHECK = "page"
+
+# Tarayıcıda ana belgenin status/mime/yönlendirme bilgisi nasıl alınsın (netcapture.py):
+# "cdp": CDP Network olaylarına abone olunur (trio gerekir; yoksa "log"a düşer)
+# "log": performance logu okunur (eski yöntem)
+NET_CAPTURE = "cdp"
+
+# ---------- Tarayıcı profili ----------
+# "validation": headless, page_load_strategy=eager, görsel/font/stil/medya ve izleyici
+#               alan adları engellenir (yalnızca status + başlık okunuyor)
+# "interactive": görünür pencere, her şey yüklenir (eski davranış)
+BROWSER_PROFILE = "validation"
+
+# Network.setBlockedURLs kalıpları (validation profili); '*' joker, kalıp URL'in tamamıyla eşleşir.
+# Sürümlü varlıklar (style.css?v=3) için uzantı başına "?" kalıbı da eklenir;
+# "*.css*" gibi açık uçlu kalıp kullanılmaz ("www.bmp-dergi.org" gibi alan adlarını da engellerdi)
+BLOCKED_RESOURCE_EXTENSIONS = [
+    "png", "jpg", "jpeg", "gif", "webp", "svg", "ico", "bmp",
+    "woff", "woff2", "ttf", "otf", "eot",
+    "css",
+    "mp4", "webm", "mp3", "m4a", "ogg",
+]
+BLOCKED_RESOURCE_PATTERNS = [p for ext in BLOCKED_RESOURCE_EXTENSIONS
+                             for p in (f"*.{ext}", f"*.{ext}?*")]
+TRACKER_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com",
+    "doubleclick.net", "adservice.google.com", "connect.facebook.net",
+    "hotjar.com", "mc.yandex.ru", "addthis.com", "sharethis.com",
+    "scorecardresearch.com", "clarity.ms", "cdn.mathjax.org",
+]
+
+# ---------- Tarayıcı açılışı ----------
+# ChromeDriverManager().install() sonucu burada saklanır; sonraki açılışlarda ağa çıkılmaz
+CHROMEDRIVER_CACHE_FILE = ".chromedriver.json"
+# Kayıtlı yol bu süreden (saniye) eskiyse sürüm kontrolü için yeniden çözülür (ağ yoksa eskisi kullanılır)
+CHROMEDRIVER_RECHECK = 7 * 24 * 3600
+# Kalıcı Chrome profili (HTTP önbelleği, TLS oturumları) için kök klasör; "" = her açılışta boş profil.
+# Havuzdaki her tarayıcı kendi alt klasörünü kullanır (Chrome aynı profili iki süreçte açamaz).
+CHROME_PROFILE_DIR = ""
+
+# ---------- Tarayıcı yaşam döngüsü (managed_browser.ManagedBrowser) ----------
+# Bu kadar sayfa açıldıktan sonra tarayıcı yeniden başlatılır (0: kapalı)
+BROWSER_MAX_NAVIGATIONS = 500
+# Chrome süreç ağacının toplam RSS'i bunu aşınca yeniden başlatılır (MB, 0: kapalı)
+BROWSER_MAX_RSS_MB = 1500
+# RSS ölçümü kaç sayfada bir yapılsın (/proc taraması ucuz ama bedava değil)
+BROWSER_RSS_CHECK_EVERY = 25
+
+# ---------- Eşzamanlı (asyncio) HTTP kontrolü ----------
+# Aynı anda en fazla kaç istek (0: kapalı, sıralı kontrol)
+ASYNC_CONCURRENCY = 32
+# Aynı host'a aynı anda en fazla kaç istek
+ASYNC_PER_HOST = 4
+
+# ---------- Crossref disk önbelleği ----------
+CROSSREF_CACHE_DIR = ".crossref_cache"
+# Bu süreden (saniye) yeni kayıtlar için hiç istek atılmaz; sonrası ETag/Last-Modified ile doğrulanır
+CROSSREF_CACHE_TTL = 7 * 24 * 3600
+# Toplam boyut sınırı (sıkıştırılmış); aşılınca LRU ile silinir
+CROSSREF_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# ---------- Crossref istemcisi (crossref_client.py) ----------
+# Polite pool için iletişim adresi; UA'ya "(mailto:...)" olarak eklenir (ortam: CROSSREF_MAILTO)
+CROSSREF_MAILTO = ""
+# Crossref X-Rate-Limit-* / X-Concurrency-Limit başlıkları gelene kadar kullanılacak sınırlar
+CROSSREF_DEFAULT_RATE = 5.0
+CROSSREF_DEFAULT_CONCURRENCY = 1
+# Başlıktaki hızın bu oranı kullanılır (saat farkı / ani artışlara pay)
+CROSSREF_RATE_SAFETY = 0.9
+# Süreçler arası ortak bütçe dosyası (aynı klasörde çalışan tüm main.py süreçleri paylaşır); boş: süreç içi
+CROSSREF_RATE_FILE = ".crossref_rate.lock"
+# 429 / 5xx / bağlantı hatasında tekrar sayısı ve üstel bekleme (saniye, jitter'lı)
+CROSSREF_MAX_RETRIES = 5
+CROSSREF_BACKOFF_BASE = 1.0
+CROSSREF_BACKOFF_MAX = 60.0
+CROSSREF_TIMEOUT = 10
+
+# ---------- Koşu durumu ----------
+# İşlenmiş dergilerin (normalize ISSN) tutulduğu SQLite dosyası
+RUN_STATE_DB = "run_state.sqlite"
+
+# ---------- İş kuyruğu (work_queue.py, main.py --queue) ----------
+# Kiralanan dergi bu süre içinde heartbeat almazsa başka işçiye geçer (saniye)
+JOB_LEASE_SECONDS = 300
+# Bir dergi en fazla kaç kez denenir; sonra "failed"
+JOB_MAX_ATTEMPTS = 3
+
+# ---------- JSONL yazıcı ----------
+# Bu kadar satır birikince ya da bu kadar saniye geçince dosyaya yazılır
+JSONL_FLUSH_LINES = 200
+JSONL_FLUSH_SECONDS = 1.0
@@ -0,0 +1,406 @@
+# crossref.py
+"""
+Crossref /journals/{issn}/works için cursor tabanlı (deep paging) akış.
+İlk sayfa hemen indirilir; sonraki sayfalar kontrol sürerken arka planda
+sınırlı bir kuyruğa çekilir. Bellekte en fazla birkaç sayfa tutulur.
+set_cache() ile disk önbelleği (crossref_cache) devreye alınabilir.
+"""
+import json
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+import requests
+
+from config import (
+    CROSSREF_CURSOR_TEMPLATE, UA, CROSSREF_ROWS, CROSSREF_MAX_ITEMS,
+    CROSSREF_PREFETCH_PAGES, CROSSREF_TIMEOUT, CROSSREF_BATCH_TEMPLATE, CROSSREF_BATCH_ROWS,
+    CROSSREF_BATCH_MAX_PAGES, CROSSREF_FACET_TEMPLATE, CROSSREF_SAMPLE_TEMPLATE,
+    CROSSREF_SAMPLE_MAX_STRATA, CROSSREF_SAMPLE_LIMIT
+)
+from crossref_cache import CrossrefCache
+from crossref_client import get_client
+from run_state import normalize_issn
+
+_END = object()
+
+# Tüm Crossref istekleri için ortak disk önbelleği (None: önbellek yok)
+_cache: Optional[CrossrefCache] = None
+
+
+class CrossrefError(Exception):
+    """Crossref isteği başarısız (ilk sayfa dışında, akış ortasında)."""
+
+
+def set_cache(cache: Optional[CrossrefCache]) -> None:
+    global _cache
+    _cache = cache
+
+
+def get_cache() -> Optional[CrossrefCache]:
+    return _cache
+
+
+def build_cursor_url(issn: str, rows: int, cursor: str = "*") -> str:
+    return CROSSREF_CURSOR_TEMPLATE.format(issn=issn, rows=rows, cursor=quote(cursor, safe="*"))
+
+
+def build_batch_url(issns: List[str], rows: int, cursor: str = "*") -> str:
+    flt = ",".join(f"issn:{i}" for i in issns)
+    return CROSSREF_BATCH_TEMPLATE.format(filter=quote(flt, safe=":,"), rows=rows,
+                                          cursor=quote(cursor, safe="*"))
+
+
+def get_json(url: str, user_agent: str = UA, timeout: float = CROSSREF_TIMEOUT,
+             key_url: Optional[str] = None, refresh: bool = False) -> Dict[str, Any]:
+    """
+    Crossref JSON yanıtı; önbellek tanımlıysa onun üzerinden. Ağ istekleri
+    crossref_client üzerinden gider (hız sınırı, 429/5xx tekrarları, mailto UA).
+    """
+    headers = {"User-Agent": user_agent}
+    client = get_client()
+    if _cache is None:
+        r = client.get(url, headers=headers, timeout=timeout)
+        r.raise_for_status()
+        return r.json()
+    body = _cache.get(url, session=client, headers=headers, timeout=timeout, key_url=key_url,
+                      refresh=refresh)
+    return json.loads(body)
+
+
+def fetch_page(url: str, key_url: Optional[str] = None, refresh: bool = False) -> Dict[str, Any]:
+    """Tek sayfa indir; Crossref yanıtındaki 'message' nesnesini döndür."""
+    return get_json(url, key_url=key_url, refresh=refresh).get("message") or {}
+
+
+def journal_name_from_items(items: List[Dict[str, Any]]) -> str:
+    """İlk kayıttan dergi adı (container-title, yoksa publisher)."""
+    journal_name = "Unknown Journal"
+    if items:
+        it0 = items[0]
+        ct = it0.get("container-title") or []
+        if ct and isinstance(ct, list) and ct[0]:
+            journal_name = (ct[0] or "").strip()
+        elif (it0.get("publisher") or "").strip():
+            journal_name = (it0.get("publisher") or "").strip()
+    return journal_name
+
+
+class WorksStream:
+    """
+    Bir ISSN'in Crossref kayıtlarını sayfa sayfa akıtır.
+
+        stream = WorksStream(issn, max_items=0).open()   # ilk sayfa burada iner
+        stream.total, stream.journal_name
+        for page in stream.pages():               # List[item]
+            ...
+
+    İlk sayfa hatası open() içinde requests.RequestException olarak yükselir; sonraki
+    sayfalardaki hata pages() içinde CrossrefError olarak yükselir.
+    """
+
+    def __init__(self, issn: str, max_items: int = CROSSREF_MAX_ITEMS,
+                 rows: int = CROSSREF_ROWS, prefetch_pages: int = CROSSREF_PREFETCH_PAGES):
+        self.issn = issn
+        self.max_items = max(0, int(max_items or 0))
+        self.rows = min(rows, self.max_items) if self.max_items else rows
+        self.prefetch_pages = max(1, int(prefetch_pages))
+        self.api_url = build_cursor_url(issn, self.rows)
+        self.total = 0
+        self.journal_name = "Unknown Journal"
+        self._first_items: List[Dict[str, Any]] = []
+        self._next_cursor: Optional[str] = None
+        self.is_open = False
+        # Örneklemede kullanılan tabakalar (SampledWorksStream); tam akışta None
+        self.strata: Optional[List[Dict[str, Any]]] = None
+
+    def _page_key(self, page_no: int) -> str:
+        # Cursor token'ları her koşuda değişir; önbellek anahtarı sayfa numarası olsun
+        return build_cursor_url(self.issn, self.rows, f"page:{page_no}")
+
+    def _live_cursor(self, page_no: int) -> Optional[str]:
+        """
+        Önbellekten gelen cursor zinciri süresi dolmuş olabilir: ilk sayfadan
+        itibaren ağdan tazeleyip page_no. sayfa için geçerli cursor'ı bul.
+        """
+        cursor = "*"
+        for n in range(1, page_no):
+            msg = fetch_page(build_cursor_url(self.issn, self.rows, cursor),
+                             key_url=self._page_key(n), refresh=True)
+            cursor = msg.get("next-cursor")
+            if not cursor:
+                return None
+        return cursor
+
+    def open(self) -> "WorksStream":
+        """İlk sayfayı indir; total ve journal_name dolar."""
+        msg = fetch_page(self.api_url, key_url=self._page_key(1))
+        self._first_items = msg.get("items") or []
+        self._next_cursor = msg.get("next-cursor")
+        total_results = int(msg.get("total-results") or len(self._first_items))
+        self.total = min(total_results, self.max_items) if self.max_items else total_results
+        self.journal_name = journal_name_from_items(self._first_items)
+        self.is_open = True
+        return self
+
+    @classmethod
+    def from_items(cls, issn: str, items: List[Dict[str, Any]], max_items: int = CROSSREF_MAX_ITEMS,
+                   api_url: Optional[str] = None) -> "WorksStream":
+        """Kayıtları zaten elde olan (toplu hasat) dergi için açılmış akış; ağa çıkmaz."""
+        stream = cls(issn, max_items=max_items)
+        if api_url:
+            stream.api_url = api_url
+        stream._first_items = items
+        stream.total = min(len(items), stream.max_items) if stream.max_items else len(items)
+        stream.journal_name = journal_name_from_items(items)
+        stream.is_open = True
+        return stream
+
+    def approx_bytes(self) -> int:
+        """Bellekte tutulan ilk sayfanın yaklaşık boyutu (prefetch bütçesi için)."""
+        return len(json.dumps(self._first_items, ensure_ascii=False))
+
+    def _producer(self, q: "queue.Queue", stop: threading.Event, remaining: int) -> None:
+        cursor = self._next_cursor
+        page_no = 1
+        try:
+            while cursor and remaining > 0 and not stop.is_set():
+                page_no += 1
+                url = build_cursor_url(self.issn, self.rows, cursor)
+                try:
+                    try:
+                        msg = fetch_page(url, key_url=self._page_key(page_no))
+                    except requests.HTTPError:
+                        if _cache is None or _cache.offline:
+                            raise
+                        # Önbellekteki eski cursor reddedildi; zinciri tazele, bir kez daha dene
+                        cursor = self._live_cursor(page_no)
+                        if not cursor:
+                            break
+                        url = build_cursor_url(self.issn, self.rows, cursor)
+                        msg = fetch_page(url, key_url=self._page_key(page_no), refresh=True)
+                except (requests.RequestException, ValueError) as e:
+                    self._put(q, stop, CrossrefError(f"{url}: {e}"))
+                    return
+                items = msg.get("items") or []
+                if not items:
+                    break
+                items = items[:remaining]
+                remaining -= len(items)
+                cursor = msg.get("next-cursor")
+                self._put(q, stop, items)
+        finally:
+            self._put(q, stop, _END)
+
+    @staticmethod
+    def _put(q: "queue.Queue", stop: threading.Event, obj: Any) -> None:
+        # Tüketici erken çıkarsa (stop) producer kuyrukta takılı kalmasın
+        while not stop.is_set():
+            try:
+                q.put(obj, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def pages(self) -> Iterator[List[Dict[str, Any]]]:
+        first = self._first_items[:self.total]
+        remaining = self.total - len(first)
+        if remaining <= 0 or not self._next_cursor or len(self._first_items) < self.rows:
+            if first:
+                yield first
+            return
+
+        # Producer'ı ilk sayfa kontrol edilmeden önce başlat: indirme ile kontrol çakışsın
+        q: "queue.Queue" = queue.Queue(maxsize=self.prefetch_pages)
+        stop = threading.Event()
+        t = threading.Thread(target=self._producer, args=(q, stop, remaining),
+                             name=f"crossref-{self.issn}", daemon=True)
+        t.start()
+        try:
+            yield first
+            while True:
+                obj = q.get()
+                if obj is _END:
+                    return
+                if isinstance(obj, Exception):
+                    raise obj
+                yield obj
+        finally:
+            stop.set()
+
+    def items(self) -> Iterator[Dict[str, Any]]:
+        for page in self.pages():
+            yield from page
+
+
+def harvest_batch(groups: List[List[str]], max_items: int = CROSSREF_MAX_ITEMS,
+                  rows: int = CROSSREF_BATCH_ROWS,
+                  max_pages: int = CROSSREF_BATCH_MAX_PAGES) -> Tuple[str, List[Optional[List[Dict[str, Any]]]]]:
+    """
+    Birden çok derginin kayıtlarını tek /works?filter=issn:A,issn:B,... akışından çek ve
+    kayıtların ISSN alanına göre dergilere dağıt. groups[k]: k. derginin ISSN/eISSN'leri.
+    Dönüş: (sorgu URL'i, her dergi için created sırasıyla ilk max_items kayıt). Akış max_pages
+    içinde bitmediyse ve dergi max_items'a ulaşmadıysa None: o dergi ayrı sorgulanmalı.
+    Akışta hiç kaydı olmayan dergi de None olur (Crossref'te olmayan ya da kayıtları başka ISSN
+    ile listelenen dergi); ayrı sorgu 404 verir ve dergi denetlenmiş sayılmaz.
+    İlk sayfa hatası çağırana geçer; sonraki sayfalarda hata olursa eksik dergiler None olur.
+    """
+    owners: Dict[str, List[int]] = {}
+    for k, issns in enumerate(groups):
+        for issn in issns:
+            key = normalize_issn(issn)
+            if key and k not in owners.setdefault(key, []):
+                owners[key].append(k)
+    filter_issns = sorted(owners)
+    api_url = build_batch_url(filter_issns, rows)
+    found: List[List[Dict[str, Any]]] = [[] for _ in groups]
+
+    exhausted = False
+    cursor = "*"
+    for page_no in range(1, max(1, int(max_pages)) + 1):
+        url = build_batch_url(filter_issns, rows, cursor)
+        try:
+            msg = fetch_page(url, key_url=build_batch_url(filter_issns, rows, f"page:{page_no}"))
+        except (requests.RequestException, ValueError):
+            if page_no == 1:
+                raise
+            break
+        items = msg.get("items") or []
+        for it in items:
+            hit = set()
+            for issn in it.get("ISSN") or []:
+                hit.update(owners.get(normalize_issn(issn), ()))
+            for k in hit:
+                if not max_items or len(found[k]) < max_items:
+                    found[k].append(it)
+        cursor = msg.get("next-cursor")
+        if not cursor or len(items) < rows:
+            exhausted = True
+            break
+        if max_items and all(len(f) >= max_items for f in found):
+            break
+
+    return api_url, [f if f and (exhausted or (max_items and len(f) >= max_items)) else None for f in found]
+
+
+# ---------- Yıl tabakalı örnekleme ----------
+def year_strata(year_counts: Dict[int, int], max_strata: int = CROSSREF_SAMPLE_MAX_STRATA) -> List[Dict[str, int]]:
+    """
+    {yıl: makale sayısı} → ardışık yıl aralıkları [{"from", "until", "population"}].
+    Yıl sayısı max_strata'dan fazlaysa yıllar nüfusu yaklaşık eşit aralıklara birleştirilir.
+    """
+    years = sorted(y for y, c in year_counts.items() if c > 0)
+    total = sum(year_counts[y] for y in years)
+    n = max(1, int(max_strata))
+    strata: List[Dict[str, int]] = []
+    seen = 0
+    for y in years:
+        # Yılın orta noktasındaki kümülatif nüfusa göre tabaka: ardışık ve nüfusça dengeli
+        k = min(n - 1, int((seen + year_counts[y] / 2) * n / total)) if len(years) > n else len(strata)
+        if k >= len(strata):
+            strata.append({"from": y, "until": y, "population": 0})
+        strata[-1]["until"] = y
+        strata[-1]["population"] += year_counts[y]
+        seen += year_counts[y]
+    return strata
+
+
+def allocate_sample(populations: List[int], size: int) -> List[int]:
+    """
+    size'ı tabakalara nüfusla orantılı dağıt (en büyük kalan yöntemi). size yetiyorsa her
+    tabakaya en az 1; hiçbir tabakaya nüfusundan fazlası verilmez.
+    """
+    total = sum(populations)
+    size = min(max(0, int(size)), total)
+    if not size:
+        return [0] * len(populations)
+    alloc = [0] * len(populations)
+    if size >= len(populations):
+        alloc = [1 if p > 0 else 0 for p in populations]
+    rest = size - sum(alloc)
+    quotas = [rest * p / total for p in populations]
+    for k, q in enumerate(quotas):
+        alloc[k] += min(int(q), populations[k] - alloc[k])
+    # Kalanlar: en büyük kesirden başlayarak, kapasitesi olan tabakalara
+    order = sorted(range(len(populations)), key=lambda k: quotas[k] - int(quotas[k]), reverse=True)
+    while sum(alloc) < size:
+        for k in order:
+            if sum(alloc) >= size:
+                break
+            if alloc[k] < populations[k]:
+                alloc[k] += 1
+    return alloc
+
+
+def _item_year(it: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(((it.get("published") or {}).get("date-parts") or [[None]])[0][0])
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class SampledWorksStream(WorksStream):
+    """
+    Derginin tamamı yerine yıl tabakalı rastgele örnek:
+      1) published facet ile yıl başına makale sayısı (tek istek, rows=0)
+      2) yıllar en fazla max_strata aralığa birleştirilir, sample_size orantılı dağıtılır
+      3) her aralık için filter=from-pub-date:Y1,until-pub-date:Y2&sample=k
+    Kayıtlar yıl sırasıyla tek sayfada döner; kullanılan tabakalar self.strata'da.
+    """
+
+    def __init__(self, issn: str, sample_size: int, max_strata: int = CROSSREF_SAMPLE_MAX_STRATA):
+        super().__init__(issn, max_items=0)
+        self.sample_size = max(1, int(sample_size))
+        self.max_strata = max_strata
+        self.api_url = CROSSREF_FACET_TEMPLATE.format(issn=issn)
+        self.population = 0
+
+    def _sample(self, stratum: Dict[str, int], k: int) -> List[Dict[str, Any]]:
+        flt = quote(f"from-pub-date:{stratum['from']},until-pub-date:{stratum['until']}", safe=":,")
+        items: Dict[str, Dict[str, Any]] = {}
+        # sample= en fazla CROSSREF_SAMPLE_LIMIT; fazlası için tekrarla (DOI ile tekilleştir)
+        for n in range((k + CROSSREF_SAMPLE_LIMIT - 1) // CROSSREF_SAMPLE_LIMIT):
+            want = min(CROSSREF_SAMPLE_LIMIT, k - len(items))
+            if want <= 0:
+                break
+            url = CROSSREF_SAMPLE_TEMPLATE.format(issn=self.issn, filter=flt, sample=want)
+            msg = fetch_page(url, key_url=f"{url}&page=sample:{n + 1}")
+            for it in msg.get("items") or []:
+                items.setdefault((it.get("DOI") or "").lower(), it)
+        return list(items.values())[:k]
+
+    def open(self) -> "SampledWorksStream":
+        msg = fetch_page(self.api_url)
+        values = (((msg.get("facets") or {}).get("published") or {}).get("values")) or {}
+        year_counts: Dict[int, int] = {}
+        for year, count in values.items():
+            try:
+                year_counts[int(year)] = int(count)
+            except (TypeError, ValueError):
+                continue
+        self.population = int(msg.get("total-results") or sum(year_counts.values()))
+
+        strata = year_strata(year_counts, self.max_strata)
+        alloc = allocate_sample([s["population"] for s in strata], self.sample_size)
+        items: List[Dict[str, Any]] = []
+        for stratum, k in zip(strata, alloc):
+            got = self._sample(stratum, k) if k else []
+            got.sort(key=lambda it: _item_year(it) or 0)
+            stratum["sampled"] = len(got)
+            items.extend(got)
+
+        self.strata = strata
+        self._first_items = items
+        self._next_cursor = None
+        self.total = len(items)
+        self.journal_name = journal_name_from_items(items)
+        self.is_open = True
+        return self
+
+
+def make_stream(issn: str, max_items: int = CROSSREF_MAX_ITEMS, sample: int = 0) -> WorksStream:
+    """sample > 0 ise yıl tabakalı örnek, değilse created sırasıyla ilk max_items kayıt."""
+    if sample > 0:
+        return SampledWorksStream(issn, sample)
+    return WorksStream(issn, max_items=max_items)
@@ -0,0 +1,165 @@
+# crossref_cache.py
+"""
+Crossref API yanıtları için diskte kalıcı önbellek.
+- Anahtar: normalize edilmiş URL'in SHA-256'sı
+- TTL dolana kadar istek atılmaz; dolunca ETag/Last-Modified ile yeniden doğrulanır (304)
+- Toplam boyut sınırı aşılınca en uzun süredir kullanılmayanlar (LRU) silinir
+- offline modda yalnızca önbellekten okunur
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from config import CROSSREF_CACHE_DIR, CROSSREF_CACHE_TTL, CROSSREF_CACHE_MAX_BYTES
+
+
+class CacheMiss(requests.RequestException):
+    """offline modda önbellekte olmayan URL istendi."""
+
+
+class CacheEntry(NamedTuple):
+    body: bytes
+    meta: Dict[str, Any]
+    fresh: bool
+
+
+def normalize_url(url: str) -> str:
+    """Şema/host küçük harf, query parametreleri sıralı; anahtar üretimi için."""
+    parts = urlsplit((url or "").strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+def cache_key(url: str) -> str:
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+class CrossrefCache:
+    def __init__(self, root: str = CROSSREF_CACHE_DIR, ttl: float = CROSSREF_CACHE_TTL,
+                 max_bytes: int = CROSSREF_CACHE_MAX_BYTES, offline: bool = False):
+        self.root = Path(root)
+        self.ttl = float(ttl)
+        self.max_bytes = int(max_bytes)
+        self.offline = offline
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._size = sum(p.stat().st_size for p in self.root.glob("*/*.gz"))
+
+    def _paths(self, key: str):
+        d = self.root / key[:2]
+        return d / f"{key}.gz", d / f"{key}.meta.json"
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        body_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = gzip.decompress(body_path.read_bytes())
+        except (OSError, ValueError, EOFError):
+            return None
+        # LRU: erişim zamanı meta dosyasının mtime'ı
+        try:
+            os.utime(meta_path, None)
+        except OSError:
+            pass
+        fresh = (time.time() - float(meta.get("fetched_at", 0))) < self.ttl
+        return CacheEntry(body, meta, fresh)
+
+    def store(self, key: str, url: str, body: bytes, headers: Dict[str, str]) -> None:
+        body_path, meta_path = self._paths(key)
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        data = gzip.compress(body)
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        old_size = body_path.stat().st_size if body_path.exists() else 0
+        # Yarım yazılmış dosya kalmasın: önce tmp, sonra rename
+        tmp = body_path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+        tmp.write_bytes(data)
+        os.replace(tmp, body_path)
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+        with self._lock:
+            self._size += len(data) - old_size
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def touch(self, key: str) -> None:
+        """304 sonrası: içerik aynı, tazelik süresini yenile."""
+        _, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            meta["fetched_at"] = time.time()
+            meta_path.write_text(json.dumps(meta), encoding="utf-8")
+        except (OSError, ValueError):
+            pass
+
+    def evict(self) -> None:
+        """Boyut sınırının %90'ına inene kadar en eski erişilenleri sil."""
+        with self._lock:
+            entries = []
+            for meta_path in self.root.glob("*/*.meta.json"):
+                body_path = meta_path.with_name(meta_path.name.replace(".meta.json", ".gz"))
+                try:
+                    entries.append((meta_path.stat().st_mtime, body_path.stat().st_size,
+                                    body_path, meta_path))
+                except OSError:
+                    continue
+            entries.sort()
+            target = int(self.max_bytes * 0.9)
+            for _, size, body_path, meta_path in entries:
+                if self._size <= target:
+                    break
+                for p in (body_path, meta_path):
+                    try:
+                        p.unlink()
+                    except OSError:
+                        pass
+                self._size -= size
+
+    def get(self, url: str, session: Optional[requests.Session] = None,
+            headers: Optional[Dict[str, str]] = None, timeout: float = 10,
+            key_url: Optional[str] = None, refresh: bool = False) -> bytes:
+        """
+        URL gövdesini önbellek üzerinden getir.
+        key_url: anahtar için URL'den farklı bir kimlik (ör. cursor yerine sayfa no).
+        refresh: taze kayıt olsa bile ağdan doğrula.
+        """
+        key = cache_key(key_url or url)
+        entry = self.lookup(key)
+        if entry is not None and (self.offline or (entry.fresh and not refresh)):
+            self.hits += 1
+            return entry.body
+        if self.offline:
+            self.misses += 1
+            raise CacheMiss(f"offline: önbellekte yok: {url}")
+
+        req_headers = dict(headers or {})
+        if entry is not None:
+            if entry.meta.get("etag"):
+                req_headers["If-None-Match"] = entry.meta["etag"]
+            if entry.meta.get("last_modified"):
+                req_headers["If-Modified-Since"] = entry.meta["last_modified"]
+
+        r = (session or requests).get(url, headers=req_headers, timeout=timeout)
+        if r.status_code == 304 and entry is not None:
+            self.revalidated += 1
+            self.touch(key)
+            return entry.body
+        r.raise_for_status()
+        self.misses += 1
+        self.store(key, key_url or url, r.content, r.headers)
+        return r.content
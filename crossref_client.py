@@ -0,0 +1,254 @@
+# crossref_client.py
+"""
+api.crossref.org için hız sınırına uyan HTTP istemcisi.
+- Crossref'in X-Rate-Limit-Limit / X-Rate-Limit-Interval / X-Concurrency-Limit başlıkları
+  her yanıttan okunur; istekler arası aralık ve eşzamanlı istek sayısı buna göre ayarlanır
+- Bütçe thread'ler ve süreçler arasında ortaktır: sıradaki istek zamanı CROSSREF_RATE_FILE'da
+  (flock altında) tutulur; eşzamanlılık için her süreç {dosya}.slotN kilitlerinden birini alır
+  (süreç ölürse kilidi işletim sistemi bırakır)
+- 429 / 5xx / bağlantı hatasında jitter'lı üstel bekleme ile tekrar (Retry-After varsa o);
+  429 tüm süreçlerin sıradaki istek zamanını da ileri iter
+- User-Agent'a polite pool için "(mailto:...)" eklenir
+fcntl olmayan sistemlerde (Windows) bütçe yalnızca süreç içinde paylaşılır.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import requests
+
+from config import (
+    UA, CROSSREF_MAILTO, CROSSREF_DEFAULT_RATE, CROSSREF_DEFAULT_CONCURRENCY, CROSSREF_RATE_SAFETY,
+    CROSSREF_RATE_FILE, CROSSREF_MAX_RETRIES, CROSSREF_BACKOFF_BASE, CROSSREF_BACKOFF_MAX,
+    CROSSREF_TIMEOUT
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+_INTERVAL_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*$")
+_UNIT_SECONDS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+
+def with_mailto(user_agent: str, mailto: str) -> str:
+    """'Tool/1.0' → 'Tool/1.0 (mailto:a@b.org)'; zaten mailto içeriyorsa dokunma."""
+    if not mailto or "mailto:" in (user_agent or ""):
+        return user_agent
+    return f"{user_agent} (mailto:{mailto})"
+
+
+def parse_interval(value: str) -> float:
+    """X-Rate-Limit-Interval: '1s' → 1.0, '1m' → 60.0. Anlaşılmazsa 0."""
+    m = _INTERVAL_RE.match(value or "")
+    if not m:
+        return 0.0
+    return float(m.group(1)) * _UNIT_SECONDS[m.group(2)]
+
+
+def retry_after(headers: Dict[str, str]) -> float:
+    """Retry-After (saniye biçimi); yoksa 0."""
+    try:
+        return max(0.0, float(headers.get("Retry-After") or 0))
+    except ValueError:
+        return 0.0
+
+
+class CrossrefClient:
+    """
+    requests.get yerine geçer (CrossrefCache.get'e session olarak da verilebilir):
+        r = client.get(url, headers={...}, timeout=10)
+    Tekrarlar tükenince son yanıt döner (çağıran raise_for_status yapar) ya da bağlantı hatası yükselir.
+    """
+
+    def __init__(self, rate_file: str = CROSSREF_RATE_FILE, mailto: Optional[str] = None,
+                 rate: float = CROSSREF_DEFAULT_RATE, concurrency: int = CROSSREF_DEFAULT_CONCURRENCY,
+                 safety: float = CROSSREF_RATE_SAFETY, max_retries: int = CROSSREF_MAX_RETRIES,
+                 backoff_base: float = CROSSREF_BACKOFF_BASE, backoff_max: float = CROSSREF_BACKOFF_MAX):
+        self.rate_file = rate_file if (rate_file and fcntl is not None) else ""
+        self.mailto = mailto if mailto is not None else (os.environ.get("CROSSREF_MAILTO") or CROSSREF_MAILTO)
+        self.safety = min(1.0, max(0.1, float(safety)))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self._interval = 1.0 / max(1e-6, float(rate))
+        self._concurrency = max(1, int(concurrency))
+        self._cond = threading.Condition()
+        self._next_slot = 0.0  # süreç içi mod (time.time)
+        self._active = 0
+        self._session = requests.Session()
+        # İstatistik
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+    # ---------- Ortak durum (dosya) ----------
+    @contextmanager
+    def _shared(self) -> Iterator[Dict[str, Any]]:
+        """Bütçe dosyasını kilitle; yield edilen sözlükteki değişiklikler geri yazılır."""
+        fd = os.open(self.rate_file, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                try:
+                    state = json.loads(f.read() or "{}")
+                except ValueError:
+                    state = {}
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _reserve(self, penalty: float = 0.0) -> Tuple[float, int]:
+        """
+        Sıradaki istek zamanını ayır. Dönüş: (beklenecek süre, eşzamanlılık sınırı); ikisi de
+        bütçe dosyasının aynı kilitli okumasından gelir. penalty: herkes için ileri it.
+        """
+        now = time.time()
+        if self.rate_file:
+            with self._shared() as st:
+                interval = float(st.get("interval") or self._interval)
+                concurrency = max(1, int(st.get("concurrency") or self._concurrency))
+                if penalty:
+                    st["next"] = max(float(st.get("next") or 0), now + penalty)
+                    return 0.0, concurrency
+                slot = max(now, float(st.get("next") or 0))
+                st["next"] = slot + interval
+            return slot - now, concurrency
+        with self._cond:
+            if penalty:
+                self._next_slot = max(self._next_slot, now + penalty)
+                return 0.0, self._concurrency
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+            return slot - now, self._concurrency
+
+    @contextmanager
+    def _slot(self, limit: int) -> Iterator[None]:
+        """
+        Eşzamanlı istek hakkı (süreçler arası: slot dosyası kilidi). limit: _reserve'ün
+        döndürdüğü sınır (süreç içi modda self._concurrency canlı okunur).
+        """
+        if not self.rate_file:
+            with self._cond:
+                while self._active >= self._concurrency:
+                    self._cond.wait()
+                self._active += 1
+            try:
+                yield
+            finally:
+                with self._cond:
+                    self._active -= 1
+                    self._cond.notify()
+            return
+
+        while True:
+            for k in range(limit):
+                f = open(f"{self.rate_file}.slot{k}", "a")
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    f.close()
+                    continue
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                    f.close()
+                return
+            time.sleep(0.05)
+
+    def _update_limits(self, headers: Dict[str, str]) -> None:
+        """Yanıt başlıklarından hız/eşzamanlılık sınırını güncelle (tüm süreçler için)."""
+        interval, concurrency = 0.0, 0
+        try:
+            limit = float(headers.get("X-Rate-Limit-Limit") or 0)
+            window = parse_interval(headers.get("X-Rate-Limit-Interval") or "")
+            if limit > 0 and window > 0:
+                interval = window / (limit * self.safety)
+            concurrency = int(headers.get("X-Concurrency-Limit") or 0)
+        except ValueError:
+            return
+        if not interval and concurrency <= 0:
+            return
+        with self._cond:
+            if interval:
+                self._interval = interval
+            if concurrency > 0:
+                self._concurrency = concurrency
+                self._cond.notify_all()
+        if self.rate_file:
+            with self._shared() as st:
+                if interval:
+                    st["interval"] = interval
+                if concurrency > 0:
+                    st["concurrency"] = concurrency
+
+    def _backoff(self, attempt: int, resp: Optional[requests.Response]) -> float:
+        delay = retry_after(resp.headers) if resp is not None else 0.0
+        if not delay:
+            cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+            delay = random.uniform(cap / 2, cap)
+        return delay
+
+    # ---------- İstek ----------
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            timeout: float = CROSSREF_TIMEOUT) -> requests.Response:
+        req_headers = dict(headers or {})
+        req_headers["User-Agent"] = with_mailto(req_headers.get("User-Agent") or UA, self.mailto)
+        for attempt in range(self.max_retries + 1):
+            wait, limit = self._reserve()
+            if wait > 0:
+                self.waited += wait
+                time.sleep(wait)
+            resp, error = None, None
+            with self._slot(limit):
+                try:
+                    resp = self._session.get(url, headers=req_headers, timeout=timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+            self.requests += 1
+            if resp is not None:
+                self._update_limits(resp.headers)
+                if resp.status_code not in RETRY_STATUSES:
+                    return resp
+            if attempt == self.max_retries:
+                if resp is not None:
+                    return resp
+                raise error
+            delay = self._backoff(attempt, resp)
+            if resp is not None and resp.status_code == 429:
+                self.throttled += 1
+                self._reserve(penalty=delay)  # diğer thread/süreçler de yavaşlasın
+            self.retries += 1
+            reason = resp.status_code if resp is not None else type(error).__name__
+            print(f"[CROSSREF] {reason}: {delay:.1f} sn sonra tekrar ({attempt + 1}/{self.max_retries})")
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "retries": self.retries,
+                "throttled": self.throttled, "waited": round(self.waited, 1)}
+
+
+# Süreç genelinde tek istemci (WorksStream producer thread'leri ve prefetch aynı bütçeyi kullanır)
+_client: Optional[CrossrefClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> CrossrefClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = CrossrefClient()
+        return _client
@@ -6,6 +6,10 @@ from typing import Optional, Tuple
 
 import requests
 
+from config import CROSSREF_CACHE_DIR, CROSSREF_CACHE_TTL
+from crossref import set_cache, get_json
+from crossref_cache import CrossrefCache
+
 CROSSREF_API_TEMPLATE = (
     "https://api.crossref.org/journals/{issn}/works"
     "?select=DOI,prefix,title,publisher,type,title,resource,URL,ISSN,created"
@@ -54,19 +58,27 @@ def build_doi_url(doi: str) -> str:
 def main():
     parser = argparse.ArgumentParser(description="Crossref link testi (ISSN bazlı).")
     parser.add_argument("--issn", default="2148-5704", help="ISSN (ör. 2148-5704)")
+    parser.add_argument("--cache-dir", default=CROSSREF_CACHE_DIR, help="Crossref disk önbelleği klasörü")
+    parser.add_argument("--cache-ttl", type=float, default=CROSSREF_CACHE_TTL,
+                        help="Önbellek tazelik süresi (saniye); sonrası ETag/Last-Modified ile doğrulanır")
+    parser.add_argument("--no-cache", action="store_true", help="Crossref önbelleğini kullanma")
+    parser.add_argument("--offline", action="store_true", help="Yalnızca önbellekteki Crossref yanıtlarını kullan")
     args = parser.parse_args()
+    if not args.no_cache:
+        set_cache(CrossrefCache(args.cache_dir, ttl=args.cache_ttl, offline=args.offline))
+    elif args.offline:
+        print("[ERR] --offline için önbellek gerekli (--no-cache ile birlikte kullanılamaz)")
+        sys.exit(1)
 
     api_url = CROSSREF_API_TEMPLATE.format(issn=args.issn)
     print(f"[INFO] Crossref API: {api_url}")
 
     try:
-        r = requests.get(api_url, headers={"User-Agent": UA}, timeout=TIMEOUT)
-        r.raise_for_status()
-    except requests.RequestException as e:
+        data = get_json(api_url, user_agent=UA, timeout=TIMEOUT)
+    except (requests.RequestException, ValueError) as e:
         print(f"[ERR] Crossref API hatası: {e}")
         sys.exit(1)
 
-    data = r.json()
     items = (data.get("message") or {}).get("items") or []
     total = len(items)
     print(f"[INFO] Toplam kayıt: {total}")
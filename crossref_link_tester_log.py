@@ -1,5 +1,4 @@
 import argparse
-import re
 import sys
 import json
 from typing import Tuple, List, Dict, Any
@@ -7,6 +6,13 @@ from pathlib import Path
 
 import requests
 
+from config import CROSSREF_CACHE_DIR, CROSSREF_CACHE_TTL
+from crossref import set_cache, get_json
+from crossref_cache import CrossrefCache
+from htmltext import page_text_norm
+from titlematch import title_found
+from textnorm import normalize_title
+
 CROSSREF_API_TEMPLATE = (
     "https://api.crossref.org/journals/{issn}/works"
     "?select=DOI,prefix,title,publisher,type,resource,URL,ISSN,created,container-title"
@@ -15,9 +21,6 @@ CROSSREF_API_TEMPLATE = (
 UA = "PiriLinkTester/1.0 (mailto:you@example.com)"
 TIMEOUT = 5
 
-def normalize_text(s: str) -> str:
-    return re.sub(r"\s+", " ", s or "").strip().lower()
-
 def check_url(url: str, title_norm: str) -> Tuple[int, bool, str, bool]:
     """
     URL'e GET atar ve döndürür:
@@ -38,10 +41,11 @@ def check_url(url: str, title_norm: str) -> Tuple[int, bool, str, bool]:
         )
         status = resp.status_code
         if status == 200:
-            text_norm = normalize_text(resp.text)
-            if "404 not found" in text_norm:
+            # Yalnızca görünür metin + citation_title/og:title/<title>; başlık önce metadatada aranır
+            text_norm, meta_norm = page_text_norm(resp.text)
+            if "404 not found" in text_norm or any("404 not found" in t for t in meta_norm):
                 return 404, False, "200 ama sayfada '404 Not Found' var ❌", False
-            contains_title = title_norm in text_norm if title_norm else False
+            contains_title = title_found(title_norm, text_norm, meta=meta_norm)
             return status, contains_title, "200 OK", True
         else:
             return status, False, f"HTTP {status}", False
@@ -81,7 +85,20 @@ def main():
     parser.add_argument("--issn", default="2148-5704", help="ISSN (ör. 2148-5704)")
     parser.add_argument("--summary", default="summary.jsonl", help="Özet JSONL dosyası")
     parser.add_argument("--detail", default="detail.jsonl", help="Detay JSONL dosyası")
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="Eşzamanlı istek sayısı (asyncio/aiohttp). 0: sıralı kontrol")
+    parser.add_argument("--per-host", type=int, default=4, help="Aynı host'a eşzamanlı en fazla istek")
+    parser.add_argument("--cache-dir", default=CROSSREF_CACHE_DIR, help="Crossref disk önbelleği klasörü")
+    parser.add_argument("--cache-ttl", type=float, default=CROSSREF_CACHE_TTL,
+                        help="Önbellek tazelik süresi (saniye); sonrası ETag/Last-Modified ile doğrulanır")
+    parser.add_argument("--no-cache", action="store_true", help="Crossref önbelleğini kullanma")
+    parser.add_argument("--offline", action="store_true", help="Yalnızca önbellekteki Crossref yanıtlarını kullan")
     args = parser.parse_args()
+    if not args.no_cache:
+        set_cache(CrossrefCache(args.cache_dir, ttl=args.cache_ttl, offline=args.offline))
+    elif args.offline:
+        print("[ERR] --offline için önbellek gerekli (--no-cache ile birlikte kullanılamaz)")
+        sys.exit(1)
 
     api_url = CROSSREF_API_TEMPLATE.format(issn=args.issn)
     detail_path = Path(args.detail)
@@ -89,16 +106,14 @@ def main():
 
     # Crossref verisini çek
     try:
-        r = requests.get(api_url, headers={"User-Agent": UA}, timeout=TIMEOUT)
-        r.raise_for_status()
-    except requests.RequestException as e:
+        data = get_json(api_url, user_agent=UA, timeout=TIMEOUT)
+    except (requests.RequestException, ValueError) as e:
         msg = f"[ERR] Crossref API hatası: {e}"
         print(msg)
         # hata da detail.jsonl'a yazılsın
         append_jsonl(detail_path, {"level": "ERROR", "issn": args.issn, "msg": msg, "api_url": api_url})
         sys.exit(1)
 
-    data = r.json()
     items = (data.get("message") or {}).get("items") or []
     total = len(items)
 
@@ -134,11 +149,13 @@ def main():
         "total": total
     })
 
-    for i, it in enumerate(items, 1):
+    # Aday URL'leri önce topla; --concurrency verilmişse hepsini paralel kontrol et
+    prepared = []
+    for it in items:
         doi = (it.get("DOI") or "").strip()
         title_list = it.get("title") or []
         title = (title_list[0] if title_list else "").strip()
-        title_norm = normalize_text(title)
+        title_norm = normalize_title(title)
 
         # Aday URL sırası
         try:
@@ -156,13 +173,28 @@ def main():
             ("URL", crossref_url),
             ("DOI", doi_url),
         ]
+        prepared.append((doi, title, title_norm, candidates))
+
+    async_verdicts = None
+    if args.concurrency > 0:
+        from async_checker import check_many
+        async_verdicts = check_many(
+            [([url for _, url in cands], t_norm) for _, _, t_norm, cands in prepared],
+            concurrency=args.concurrency, per_host=args.per_host,
+        )
 
+    for i, (doi, title, title_norm, candidates) in enumerate(prepared, 1):
         passed = False
         this_item_accessible = False
         trials: List[Dict[str, Any]] = []
 
         for label, url in candidates:
-            status, has_title, info, is_accessible = check_url(url, title_norm)
+            if async_verdicts is not None:
+                if url not in async_verdicts[i - 1]:
+                    break
+                status, has_title, info, is_accessible, _ = async_verdicts[i - 1][url]
+            else:
+                status, has_title, info, is_accessible = check_url(url, title_norm)
             trials.append({
                 "label": label,
                 "url": url,
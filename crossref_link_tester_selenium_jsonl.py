@@ -10,8 +10,8 @@ from io import BytesIO
 import requests
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+
+from driver import start_chrome
 
 
 # ====== Crossref & Genel Ayarlar ======
@@ -39,7 +39,7 @@ def build_driver(detach=True) -> webdriver.Chrome:
     # HTTP durumlarını + mimeType'ı performance log'tan okumak için
     opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
+    driver = start_chrome(opts)
     driver.set_page_load_timeout(TIMEOUT)
     try:
         driver.execute_cdp_cmd("Network.enable", {})
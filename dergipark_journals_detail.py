@@ -6,11 +6,11 @@ from urllib.parse import urljoin
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+
+from driver import start_chrome
 
 
 # ----------------------------------
@@ -34,7 +34,7 @@ def build_driver(headless=False):              # görünür tarayıcı için hea
     opts.add_argument("--window-size=1400,900")
     opts.add_argument("--lang=tr-TR")
     opts.add_argument("--user-agent=PiriHarvester/1.0 (+you@example.com)")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
+    driver = start_chrome(opts)
     driver.set_page_load_timeout(60)
     return driver
 
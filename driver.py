@@ -1,11 +1,102 @@
 # driver.py
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
 from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from config import TIMEOUT
+from config import (
+    TIMEOUT, NET_CAPTURE, BROWSER_PROFILE, BLOCKED_RESOURCE_PATTERNS, TRACKER_DOMAINS,
+    CHROMEDRIVER_CACHE_FILE, CHROMEDRIVER_RECHECK
+)
+from netcapture import cdp_available
+
+_driver_path_lock = threading.Lock()
+_driver_path: Optional[str] = None  # süreç içi: bir kez çözülür
+
+
+def _read_cached_driver_path() -> Optional[dict]:
+    try:
+        data = json.loads(Path(CHROMEDRIVER_CACHE_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    path = data.get("path") or ""
+    if not (path and os.path.isfile(path) and os.access(path, os.X_OK)):
+        return None
+    return data
+
+
+def chromedriver_path(refresh: bool = False) -> Optional[str]:
+    """
+    chromedriver'ın yolu. Sıra: CHROMEDRIVER ortam değişkeni → süreç içi değer →
+    CHROMEDRIVER_CACHE_FILE → ChromeDriverManager().install() (ağ). Ağ yoksa eski kayıt
+    kullanılır; o da yoksa None (Selenium Manager kendisi çözer).
+    refresh: kayıtlı yolu yok say (ör. Chrome güncellendi, sürüm uyuşmuyor).
+    """
+    global _driver_path
+    env = os.environ.get("CHROMEDRIVER")
+    if env:
+        return env
+    with _driver_path_lock:
+        if _driver_path and not refresh:
+            return _driver_path
+        cached = None if refresh else _read_cached_driver_path()
+        if cached and (time.time() - float(cached.get("resolved_at", 0))) < CHROMEDRIVER_RECHECK:
+            _driver_path = cached["path"]
+            return _driver_path
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+        except Exception as e:
+            if cached:
+                print(f"[WARN] chromedriver çözülemedi ({e}); kayıtlı yol kullanılıyor")
+                _driver_path = cached["path"]
+                return _driver_path
+            print(f"[WARN] chromedriver çözülemedi ({e}); Selenium Manager denenecek")
+            return None
+        _driver_path = path
+        try:
+            Path(CHROMEDRIVER_CACHE_FILE).write_text(
+                json.dumps({"path": path, "resolved_at": time.time()}), encoding="utf-8")
+        except OSError:
+            pass
+        return path
+
+
+def chrome_service(refresh: bool = False) -> Service:
+    """Önbellekli chromedriver yolu ile Service (yol yoksa Selenium Manager)."""
+    path = chromedriver_path(refresh)
+    return Service(path) if path else Service()
 
-def build_driver(detach: bool = True) -> webdriver.Chrome:
+
+def start_chrome(opts: Options) -> webdriver.Chrome:
+    """Chrome'u önbellekli sürücüyle aç; sürüm uyuşmazsa sürücüyü bir kez yeniden çöz."""
+    try:
+        return webdriver.Chrome(service=chrome_service(), options=opts)
+    except SessionNotCreatedException:
+        return webdriver.Chrome(service=chrome_service(refresh=True), options=opts)
+
+
+def blocked_url_patterns():
+    """validation profilinde Network.setBlockedURLs'e verilecek kalıplar."""
+    return list(BLOCKED_RESOURCE_PATTERNS) + [f"*://*.{d}/*" for d in TRACKER_DOMAINS] \
+        + [f"*://{d}/*" for d in TRACKER_DOMAINS]
+
+
+def build_driver(detach: bool = True, profile: str = BROWSER_PROFILE,
+                 user_data_dir: Optional[str] = None) -> webdriver.Chrome:
+    """
+    profile: "validation" (headless, eager, gereksiz kaynaklar engelli) ya da
+    "interactive" (görünür pencere, eski davranış).
+    user_data_dir: kalıcı Chrome profili; önbellek ve TLS oturumları açılışlar arasında korunur.
+    Aynı klasör aynı anda tek tarayıcıda kullanılabilir.
+    """
+    validation = profile == "validation"
     opts = Options()
     opts.add_argument("--window-size=1400,900")
     opts.add_argument("--lang=tr-TR")
@@ -14,18 +105,38 @@ def build_driver(detach: bool = True) -> webdriver.Chrome:
     opts.add_argument("--disable-gpu")
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option("useAutomationExtension", False)
-    if detach:
+    if user_data_dir:
+        Path(user_data_dir).mkdir(parents=True, exist_ok=True)
+        opts.add_argument(f"--user-data-dir={Path(user_data_dir).resolve()}")
+        # Kalıcı profilde ilk açılış/varsayılan tarayıcı ekranları çıkmasın
+        opts.add_argument("--no-first-run")
+        opts.add_argument("--no-default-browser-check")
+    if validation:
+        opts.add_argument("--headless=new")
+        opts.add_argument("--mute-audio")
+        # Görseller engellensin (CSS arka planları dahil); setBlockedURLs uzantısız URL'leri kaçırabilir
+        opts.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        # DOMContentLoaded yeterli: status + görünür metin için alt kaynakları beklemeye gerek yok
+        opts.page_load_strategy = "eager"
+    elif detach:
         opts.add_experimental_option("detach", True)
-    # Sayfa daha hızlı hazır sayılsın (opsiyonel)
-    # opts.page_load_strategy = "eager"
 
-    # Performance logları (HTTP status + mimeType) için
-    opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    # Performance logları (HTTP status + mimeType) için; CDP olay aboneliği varsa
+    # gereksiz: log açık kalırsa tarayıcı her alt kaynak için girdi biriktirir
+    if NET_CAPTURE != "cdp" or not cdp_available():
+        opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
+    driver = start_chrome(opts)
     driver.set_page_load_timeout(TIMEOUT)
     try:
         driver.execute_cdp_cmd("Network.enable", {})
+        if validation:
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns()})
     except Exception:
         pass
     return driver
+
+
+def profile_dir_for(root: str, name: str) -> Optional[str]:
+    """Havuz üyesine ait kalıcı profil klasörü (root boşsa None)."""
+    return str(Path(root) / name) if root else None
@@ -0,0 +1,103 @@
+# driver_pool.py
+"""
+N adet Chrome WebDriver'dan oluşan havuz. Boşta olan driver'ı işe verir,
+çökmüş olanı geri alırken yeniden kurar.
+"""
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+from selenium import webdriver
+
+from driver import build_driver
+from managed_browser import ManagedBrowser
+
+
+def is_driver_alive(driver: webdriver.Chrome) -> bool:
+    """Oturum hâlâ cevap veriyor mu? (pencere kapanmış / chromedriver ölmüş olabilir)"""
+    try:
+        _ = driver.window_handles
+        return True
+    except Exception:
+        return False
+
+
+class DriverPool:
+    """
+    Kullanım:
+        pool = DriverPool(4)
+        with pool.driver() as d:
+            process_one_issn(d, ...)
+        pool.close()
+    Driver'lar ilk ihtiyaç anında kurulur (tembel).
+    """
+
+    def __init__(self, size: int, factory: Callable[[], webdriver.Chrome] = None):
+        self.size = max(1, int(size))
+        self._factory = factory or (lambda: build_driver(detach=False))
+        self._idle: "queue.Queue[webdriver.Chrome]" = queue.Queue()
+        self._all: List[webdriver.Chrome] = []
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def _acquire(self) -> webdriver.Chrome:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_build = len(self._all) < self.size
+            if can_build:
+                # yer ayır; kurulum kilit dışında (yavaş)
+                self._all.append(None)
+        if can_build:
+            try:
+                d = self._factory()
+            except Exception:
+                with self._lock:
+                    self._all.remove(None)
+                raise
+            with self._lock:
+                self._all[self._all.index(None)] = d
+            return d
+        return self._idle.get()
+
+    def _replace(self, old: webdriver.Chrome) -> webdriver.Chrome:
+        try:
+            old.quit()
+        except Exception:
+            pass
+        new = self._factory()
+        with self._lock:
+            self._all[self._all.index(old)] = new
+            self.rebuilds += 1
+        print(f"[POOL] Çöken tarayıcı yeniden kuruldu (toplam {self.rebuilds})")
+        return new
+
+    @contextmanager
+    def driver(self) -> Iterator[webdriver.Chrome]:
+        d = self._acquire()
+        try:
+            yield d
+        finally:
+            # ManagedBrowser ölü oturumu kendisi onarır
+            if not isinstance(d, ManagedBrowser) and not is_driver_alive(d):
+                try:
+                    d = self._replace(d)
+                except Exception as e:
+                    print(f"[POOL] Tarayıcı yeniden kurulamadı: {e}")
+                    with self._lock:
+                        self._all.remove(d)
+                    d = None
+            if d is not None:
+                self._idle.put(d)
+
+    def close(self) -> None:
+        with self._lock:
+            drivers, self._all = [d for d in self._all if d is not None], []
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
@@ -0,0 +1,258 @@
+# fetcher.py
+"""
+Katmanlı URL doğrulama: önce havuzlanmış düz HTTP istemcisi, sonuç belirsizse
+(JS kabuğu, bot koruması, başlık bulunamadı) Selenium'a yükselt.
+"""
+import codecs
+import re
+import threading
+from typing import NamedTuple, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from selenium import webdriver
+
+from config import UA, TIMEOUT, HTTP_POOL_SIZE, HTTP_MAX_BYTES, JS_SHELL_MIN_TEXT
+from utils import (
+    is_pdf_mime_or_url, pdf_text_norm, cached_pdf_text,
+    check_url_selenium
+)
+from polite import get_scheduler
+from pdf_service import read_capped
+from pdf_cache import pdf_validator
+from managed_browser import ManagedBrowser
+from titlematch import TitleMatcher, title_found
+from htmltext import page_text_norm
+
+# Hangi katmanın karar verdiği (trial kayıtlarındaki "tier" alanı)
+TIER_HTTP = "http"
+TIER_SELENIUM = "selenium"
+
+# Bot koruması / challenge sayfası işaretleri (ham HTML, küçük harf)
+_CHALLENGE_MARKERS = (
+    "cf_chl_opt",
+    "/cdn-cgi/challenge-platform/",
+    "<title>just a moment...</title>",
+    "checking your browser before accessing",
+    "ddos-guard",
+    "attention required! | cloudflare",
+)
+# Bu status'lar çoğunlukla bot engeli; tarayıcıda tekrar denenmeli
+_BLOCKING_STATUSES = (401, 403, 429, 503)
+
+_META_REFRESH_RE = re.compile(r"<meta[^>]+http-equiv\s*=\s*[\"']?refresh", re.I)
+_HEADER_CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+_local = threading.local()
+
+
+class HttpPage(NamedTuple):
+    status: int          # 0: bağlantı hatası
+    final_url: str
+    mime_type: str
+    text: str            # HTML gövdesi (PDF için boş)
+    content: bytes       # PDF bytes (HTML için boş)
+    error: str
+    pdf_text: Optional[str] = None  # önbellekten gelen normalize PDF metni (gövde indirilmedi)
+    pdf_validator: str = ""  # PDF yanıtının ETag/Last-Modified/Content-Length imzası (pdf_cache)
+    truncated: bool = False  # PDF gövdesi PDF_MAX_BYTES sınırında kesildi
+
+
+# ---------- HTTP istemcisi ----------
+def get_http_session() -> requests.Session:
+    """Thread başına tek, bağlantı havuzlu requests.Session."""
+    sess = getattr(_local, "session", None)
+    if sess is None:
+        sess = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        sess.mount("http://", adapter)
+        sess.mount("https://", adapter)
+        sess.headers["User-Agent"] = UA
+        _local.session = sess
+    return sess
+
+
+def _known_codec(name: str) -> str:
+    try:
+        return codecs.lookup(name).name
+    except (LookupError, TypeError):
+        return ""
+
+
+def sniff_charset(content_type: str, body: bytes) -> str:
+    """
+    HTML gövdesinin karakter kümesi: başlıktaki açık charset, BOM, <meta charset>;
+    hiçbiri yoksa UTF-8 olarak çözülebiliyorsa UTF-8, değilse içerikten tahmin.
+    (requests başlıkta charset yokken text/html için ISO-8859-1 varsayar; UTF-8
+    Türkçe sayfalar bozulur ve başlık HTTP katmanında bulunamaz.)
+    """
+    m = _HEADER_CHARSET_RE.search(content_type or "")
+    if m and _known_codec(m.group(1)):
+        return m.group(1)
+    for bom, name in _BOMS:
+        if body.startswith(bom):
+            return name
+    m = _META_CHARSET_RE.search(body[:4096])
+    if m and _known_codec(m.group(1).decode("ascii", "ignore")):
+        return m.group(1).decode("ascii")
+    try:
+        body.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        if e.start >= len(body) - 3:
+            return "utf-8"  # HTTP_MAX_BYTES sınırında yarım kalmış çok baytlı karakter
+    guess = (chardet.detect(body[:64 * 1024]) or {}).get("encoding") or ""
+    return guess if _known_codec(guess) else "utf-8"
+
+
+def http_fetch(url: str) -> HttpPage:
+    """
+    URL'i düz HTTP ile indir. HTML en fazla HTTP_MAX_BYTES, PDF en fazla
+    PDF_MAX_BYTES kadar okunur (metin çıkarma ilk sayfalarla yetinir).
+    """
+    try:
+        resp = get_http_session().get(url, allow_redirects=True, timeout=TIMEOUT, stream=True)
+    except requests.RequestException as e:
+        return HttpPage(0, url, "", "", b"", str(e))
+    try:
+        mime_type = (resp.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        final_url = resp.url or url
+        validator = pdf_validator(resp.headers)
+        if is_pdf_mime_or_url(mime_type, final_url):
+            cached = cached_pdf_text(final_url, validator=validator) if resp.status_code == 200 else None
+            if cached is not None:
+                return HttpPage(resp.status_code, final_url, mime_type, "", b"", "", cached, validator)
+            content, truncated = read_capped(resp.iter_content(chunk_size=64 * 1024))
+            return HttpPage(resp.status_code, final_url, mime_type, "", content, "", None, validator, truncated)
+        buf = bytearray()
+        chunks = resp.iter_content(chunk_size=64 * 1024)
+        for chunk in chunks:
+            buf.extend(chunk)
+            if len(buf) >= HTTP_MAX_BYTES:
+                break
+        if bytes(buf[:5]) == b"%PDF-":
+            # Content-Type yanlış olabilir; imzadan PDF olduğu anlaşılıyor
+            cached = cached_pdf_text(final_url, validator=validator) if resp.status_code == 200 else None
+            if cached is not None:
+                return HttpPage(resp.status_code, final_url, "application/pdf", "", b"", "", cached, validator)
+            content, truncated = read_capped(chunks, head=bytes(buf))
+            return HttpPage(resp.status_code, final_url, "application/pdf", "", content, "", None,
+                            validator, truncated)
+        body = bytes(buf)
+        text = body.decode(sniff_charset(resp.headers.get("Content-Type") or "", body), errors="replace")
+        return HttpPage(resp.status_code, final_url, mime_type, text, b"", "")
+    except requests.RequestException as e:
+        return HttpPage(0, url, "", "", b"", str(e))
+    finally:
+        resp.close()
+
+
+def http_verdict(page: HttpPage, title_norm: str, matcher: Optional[TitleMatcher] = None,
+                 url: str = "") -> Tuple[int, bool, str, bool, str]:
+    """
+    HTTP yanıtını değerlendir.
+    Dönüş: (status, has_title, info, is_accessible, escalate_reason)
+    escalate_reason boşsa sonuç kesindir; doluysa tarayıcıda tekrar denenmeli.
+    matcher: verilirse metin bir kez taranır, sayfadaki tüm başlıklar url için kaydedilir.
+    """
+    url = url or page.final_url
+    if page.error:
+        return 0, False, f"Bağlantı hatası: {page.error}", False, "bağlantı hatası"
+
+    status = page.status
+
+    # PDF: metni burada çıkar, karar kesin
+    if is_pdf_mime_or_url(page.mime_type, page.final_url) or page.content or page.pdf_text is not None:
+        if status != 200:
+            return status, False, f"HTTP {status} (PDF)", False, ""
+        if page.pdf_text is not None:
+            text_norm, note = page.pdf_text, ""
+        else:
+            text_norm, note = pdf_text_norm(page.content, page.final_url, validator=page.pdf_validator,
+                                            truncated=page.truncated)
+        if "404 not found" in text_norm:
+            return 404, False, "PDF 200 ama içerikte '404 not found' var ❌", False, ""
+        has_title = title_found(title_norm, text_norm, matcher, url)
+        info = f"200 OK (PDF, {note})" if note else "200 OK (PDF)"
+        return 200, has_title, info, True, ""
+
+    html_l = (page.text or "").lower()
+    if status in _BLOCKING_STATUSES or any(m in html_l for m in _CHALLENGE_MARKERS):
+        return status, False, f"HTTP {status}", False, "bot koruması"
+    if status != 200:
+        return status, False, f"HTTP {status}", False, ""
+
+    # Yalnızca görünür metin ve başlık metadatası normalize edilir (script/JSON blob'ları değil)
+    text_norm, meta_norm = page_text_norm(page.text)
+    if "404 not found" in text_norm or any("404 not found" in t for t in meta_norm):
+        return 404, False, "200 ama sayfada '404 Not Found' var ❌", False, ""
+    # HTML'de bulunamayan başlık tarayıcıda tekrar aranabilir: tarama kesin değil
+    has_title = title_found(title_norm, text_norm, matcher, url, final=False, meta=meta_norm)
+    if has_title:
+        return 200, True, "200 OK", True, ""
+    if _META_REFRESH_RE.search(page.text) or len(text_norm) < JS_SHELL_MIN_TEXT:
+        return 200, False, "200 OK", True, "JS kabuğu"
+    if not title_norm:
+        return 200, False, "200 OK", True, ""
+    return 200, False, "200 OK", True, "başlık yok"
+
+
+# ---------- Katmanlı kontrol ----------
+def selenium_check(driver, url: str, title_norm: str,
+                   matcher: Optional[TitleMatcher] = None) -> Tuple[int, bool, str, bool]:
+    """driver bir ManagedBrowser ise yönetilen yoldan (yeniden başlatma/ölü oturum), değilse doğrudan."""
+    if isinstance(driver, ManagedBrowser):
+        return driver.check_url(url, title_norm, matcher=matcher)
+    return check_url_selenium(driver, url, title_norm, matcher=matcher)
+
+
+def check_url_tiered(
+    driver: Optional[webdriver.Chrome], url: str, title_norm: str,
+    prefetched: Optional[Tuple[int, bool, str, bool, str]] = None,
+    matcher: Optional[TitleMatcher] = None
+) -> Tuple[int, bool, str, bool, str]:
+    """
+    Önce düz HTTP; sonuç belirsizse ve driver varsa Selenium ile tekrar dene.
+    prefetched: async_checker'dan gelmiş hazır HTTP kararı (varsa tekrar indirilmez).
+    matcher: sayfadaki diğer makale başlıkları da kaydedilsin (titlematch).
+    Dönüş: (status, has_title, info, is_accessible, tier)
+    """
+    if not url:
+        return 0, False, "boş URL", False, TIER_HTTP
+
+    if prefetched is None:
+        get_scheduler().acquire(url)
+        prefetched = http_verdict(http_fetch(url), title_norm, matcher, url)
+    status, has_title, info, is_accessible, reason = prefetched
+    if not reason or driver is None:
+        if matcher is not None:
+            matcher.mark_final(url)  # tarayıcıya çıkılmayacak: HTTP taraması son söz
+        return status, has_title, info, is_accessible, TIER_HTTP
+
+    get_scheduler().acquire(url)
+    s_status, s_has_title, s_info, s_accessible = selenium_check(driver, url, title_norm, matcher)
+    return s_status, s_has_title, f"{s_info} (HTTP: {reason})", s_accessible, TIER_SELENIUM
+
+
+def check_url(
+    driver: Optional[webdriver.Chrome], url: str, title_norm: str, mode: str = "tiered",
+    prefetched: Optional[Tuple[int, bool, str, bool, str]] = None,
+    matcher: Optional[TitleMatcher] = None
+) -> Tuple[int, bool, str, bool, str]:
+    """processor için tek giriş noktası: mode 'tiered' ya da 'selenium'."""
+    if mode == "selenium":
+        get_scheduler().acquire(url)
+        status, has_title, info, is_accessible = selenium_check(driver, url, title_norm, matcher)
+        return status, has_title, info, is_accessible, TIER_SELENIUM
+    return check_url_tiered(driver, url, title_norm, prefetched, matcher)
+
+
+def needs_network(url: str, mode: str = "tiered",
+                  prefetched: Optional[Tuple[int, bool, str, bool, str]] = None) -> bool:
+    """check_url bu URL için ağa çıkacak mı? (hazır ve kesin HTTP kararı varsa hayır)"""
+    if not url:
+        return False
+    return mode == "selenium" or prefetched is None or bool(prefetched[4])
@@ -0,0 +1,143 @@
+# htmltext.py
+"""
+HTML'den görünür metin ve başlık metadatası çıkarma.
+- script/style/noscript/template/svg içerikleri atılır: JSON blob'ları ve izleyici
+  yüklerindeki başlıklarla eşleşme olmaz, normalize edilecek metin küçülür
+- Metadata: citation_title, og:title ve <title> (sayfa sırasıyla); başlık önce burada aranır
+- Ayrıştırıcı: selectolax (en hızlı) ya da lxml kuruluysa o, değilse stdlib regex yolu
+  (HTML_PARSER ile zorlanabilir). Ayrıştırıcı hata verirse regex yoluna düşülür.
+"""
+import html
+import re
+from typing import List, NamedTuple, Tuple
+
+from config import HTML_PARSER
+from textnorm import INLINE_TAGS, normalize_text, normalize_title, strip_inline_tags
+
+_META_NAMES = ("citation_title", "og:title")
+_DROP_TAGS = ("script", "style", "noscript", "template", "svg")
+
+_DROP_RE = re.compile(r"<(script|style|noscript|template|svg)\b.*?</\1\s*>", re.I | re.S)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+_TAG_RE = re.compile(r"<[^>]+>")
+_META_RE = re.compile(r"<meta\s[^>]*>", re.I)
+_ATTR_RE = re.compile(r"""([\w:.-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+_TITLE_RE = re.compile(r"<title\b[^>]*>(.*?)</title\s*>", re.I | re.S)
+_BODY_RE = re.compile(r"<body\b", re.I)
+
+
+class PageText(NamedTuple):
+    text: str          # görünür gövde metni (normalize edilmemiş)
+    titles: List[str]  # citation_title, og:title, <title> (normalize edilmemiş)
+    parser: str        # "selectolax" | "lxml" | "regex"
+
+
+def selectolax_available() -> bool:
+    try:
+        import selectolax  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def lxml_available() -> bool:
+    try:
+        import lxml.html  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _pick_parser(parser: str) -> str:
+    if parser == "auto":
+        if selectolax_available():
+            return "selectolax"
+        if lxml_available():
+            return "lxml"
+        return "regex"
+    return parser
+
+
+_parser = _pick_parser(HTML_PARSER)
+
+
+def _meta_title(attrs) -> Tuple[str, str]:
+    """(ad, içerik); name ya da property kullanılabilir."""
+    name = (attrs.get("name") or attrs.get("property") or "").strip().lower()
+    return name, (attrs.get("content") or "").strip()
+
+
+def _order_titles(meta: List[Tuple[str, str]], title: str) -> List[str]:
+    titles = [content for want in _META_NAMES for name, content in meta if name == want and content]
+    if title.strip():
+        titles.append(title.strip())
+    return titles
+
+
+def _extract_selectolax(html: str) -> PageText:
+    from selectolax.parser import HTMLParser
+    tree = HTMLParser(html)
+    meta = [_meta_title(node.attributes) for node in tree.css("meta")]
+    title_node = tree.css_first("title")
+    title = title_node.text() if title_node is not None else ""
+    tree.strip_tags(list(_DROP_TAGS))
+    tree.unwrap_tags(list(INLINE_TAGS))  # "CO<sub>2</sub>" → "CO2" (başlık tarafıyla aynı)
+    root = tree.body if tree.body is not None else tree.root
+    text = root.text(separator=" ") if root is not None else ""
+    return PageText(text, _order_titles(meta, title), "selectolax")
+
+
+def _extract_lxml(html: str) -> PageText:
+    import lxml.etree
+    import lxml.html
+    doc = lxml.html.document_fromstring(html)
+    meta = [_meta_title(el.attrib) for el in doc.iter("meta")]
+    title_el = doc.find(".//title")
+    title = title_el.text_content() if title_el is not None else ""
+    for el in list(doc.iter(*_DROP_TAGS)):
+        el.drop_tree()
+    lxml.etree.strip_tags(doc, *INLINE_TAGS)  # "CO<sub>2</sub>" → "CO2" (başlık tarafıyla aynı)
+    body = doc.find("body")
+    text = " ".join((body if body is not None else doc).itertext())
+    return PageText(text, _order_titles(meta, title), "lxml")
+
+
+def _extract_regex(markup: str) -> PageText:
+    meta = []
+    for tag in _META_RE.findall(markup):
+        # selectolax/lxml gibi öznitelik değerleri çözülür: "CO&lt;sub&gt;2&lt;/sub&gt;" → "CO<sub>2</sub>"
+        attrs = {m.group(1).lower(): html.unescape(m.group(2) or m.group(3) or m.group(4) or "")
+                 for m in _ATTR_RE.finditer(tag)}
+        meta.append(_meta_title(attrs))
+    m = _TITLE_RE.search(markup)
+    title = m.group(1) if m else ""
+    stripped = strip_inline_tags(_DROP_RE.sub(" ", _COMMENT_RE.sub(" ", markup)))
+    body = _BODY_RE.search(stripped)
+    if body is not None:
+        stripped = stripped[body.start():]
+    return PageText(_TAG_RE.sub(" ", stripped), _order_titles(meta, title), "regex")
+
+
+def extract_page_text(html: str, parser: str = "") -> PageText:
+    """HTML'den görünür metin + başlık metadatası."""
+    parser = _pick_parser(parser) if parser else _parser
+    if not html:
+        return PageText("", [], parser)
+    if parser == "selectolax":
+        try:
+            return _extract_selectolax(html)
+        except Exception:
+            pass
+    elif parser == "lxml":
+        try:
+            return _extract_lxml(html)
+        except Exception:
+            pass  # boş belge, XML bildirimi olan str vb.
+    return _extract_regex(html)
+
+
+def page_text_norm(html: str) -> Tuple[str, List[str]]:
+    """(normalize görünür metin, normalize metadata başlıkları)."""
+    page = extract_page_text(html)
+    # Metadata başlıkları Crossref başlığıyla aynı kuralla (içlerindeki etiketler dahil)
+    return normalize_text(page.text), [t for t in (normalize_title(t) for t in page.titles) if t]
@@ -6,11 +6,11 @@ from urllib.parse import urljoin, urlparse, parse_qs
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+
+from driver import start_chrome
 
 BASE = "https://dergipark.org.tr"
 START_URL = f"{BASE}/tr/pub/explore/journals"
@@ -25,8 +25,7 @@ def build_driver(headless=False):  # <-- GÖRÜNÜR İÇİN headless=False
     opts.add_argument("--window-size=1400,900")
     opts.add_argument("--lang=tr-TR")
     opts.add_argument("--user-agent=PiriHarvester/1.0 (+mail@example.com)")
-    return webdriver.Chrome(service=Service(ChromeDriverManager().install()),
-                            options=opts)
+    return start_chrome(opts)
 
 def wait_for_list(driver):
     # Listenin geldiğini garanti et
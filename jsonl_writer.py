@@ -0,0 +1,194 @@
+# jsonl_writer.py
+"""
+Tek yazıcılı, tamponlu JSONL çıktısı.
+Kayıtlar çağıran thread'de JSON'a çevrilip kuyruğa atılır; arka plandaki tek
+thread dosyaları açık tutar ve satırları toplu yazar. Flush satır sayısı ya da
+süre dolunca yapılır; sync() çağrısı (dergi sınırı) fsync ile diske indirir.
+"""
+import atexit
+import json
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, List, Optional
+
+from config import JSONL_FLUSH_LINES, JSONL_FLUSH_SECONDS
+
+_STOP = object()
+
+
+class _Barrier:
+    def __init__(self, fsync: bool):
+        self.fsync = fsync
+        self.done = threading.Event()
+
+
+class JsonlWriter:
+    """
+    Kullanım:
+        writer = JsonlWriter()
+        writer.write(detail_path, {...})
+        writer.sync()      # dergi bitti: flush + fsync
+        writer.close()     # kuyruktakileri yazıp kapat
+    """
+
+    def __init__(self, flush_lines: int = JSONL_FLUSH_LINES,
+                 flush_seconds: float = JSONL_FLUSH_SECONDS):
+        self.flush_lines = max(1, int(flush_lines))
+        self.flush_seconds = float(flush_seconds)
+        self._q: "queue.Queue" = queue.Queue()
+        self._files: Dict[Path, IO[str]] = {}
+        self._pending: Dict[Path, List[str]] = {}
+        self._pending_cnt = 0
+        self._closed = False
+        # _closed kontrolü ile kuyruğa atma arasına close() giremesin (RLock: sinyal işleyicisi
+        # ana thread'de write() ortasında close() çağırabilir)
+        self._lock = threading.RLock()
+        self._late_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ---------- Üretici tarafı ----------
+    def write(self, path: Path, obj: Dict[str, Any]) -> None:
+        line = json.dumps(obj, ensure_ascii=False) + "\n"
+        with self._lock:
+            if not self._closed:
+                self._q.put((Path(path), line))
+                return
+        # Kapanıştan sonra gelen kayıt (ör. sinyal sırasında çalışan thread) kaybolmasın;
+        # yazıcı thread son flush'ı bitirene kadar bekle, sonra doğrudan ekle
+        self._thread.join()
+        with self._late_lock:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as f:
+                f.write(line)
+
+    def flush(self) -> None:
+        """Kuyruktakileri dosyaya yaz (fsync yok) ve bitmesini bekle."""
+        self._barrier(fsync=False)
+
+    def sync(self) -> None:
+        """Kuyruktakileri yaz ve fsync ile diske indir (dergi sınırlarında)."""
+        self._barrier(fsync=True)
+
+    def _barrier(self, fsync: bool) -> None:
+        b = _Barrier(fsync)
+        with self._lock:
+            queued = not self._closed
+            if queued:
+                self._q.put(b)
+        if queued:
+            # STOP'tan önce kuyruğa girdi: yazıcı thread ya işler ya da boşaltırken bırakır
+            b.done.wait()
+            return
+        # Kapanmış: STOP boşaltması her şeyi yazar (geç kayıtlar doğrudan dosyaya gider);
+        # yalnızca onun bitmesini bekle, kuyruğa atılmamış bariyeri bekleme
+        self._thread.join()
+
+    def close(self) -> None:
+        """Kuyruğu boşalt, fsync yap, dosyaları kapat. Birden çok kez çağrılabilir."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._q.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- Yazıcı thread ----------
+    def _file(self, path: Path) -> IO[str]:
+        f = self._files.get(path)
+        if f is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            f = path.open("a", encoding="utf-8")
+            self._files[path] = f
+        return f
+
+    def _flush(self, fsync: bool = False) -> None:
+        for path, lines in self._pending.items():
+            if lines:
+                f = self._file(path)
+                f.write("".join(lines))
+                lines.clear()
+        self._pending_cnt = 0
+        for f in self._files.values():
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_seconds - (time.monotonic() - last_flush))
+            try:
+                item = self._q.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                # STOP'tan hemen önce/sonra kuyruğa giren kayıtları da al
+                barriers = []
+                while True:
+                    try:
+                        late = self._q.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(late, _Barrier):
+                        barriers.append(late)
+                    elif late is not _STOP:
+                        self._pending.setdefault(late[0], []).append(late[1])
+                try:
+                    self._flush(fsync=True)
+                    for f in self._files.values():
+                        f.close()
+                    self._files.clear()
+                finally:
+                    for b in barriers:
+                        b.done.set()
+                return
+            if isinstance(item, _Barrier):
+                try:
+                    self._flush(fsync=item.fsync)
+                finally:
+                    item.done.set()
+                last_flush = time.monotonic()
+                continue
+            if item is not None:
+                path, line = item
+                self._pending.setdefault(path, []).append(line)
+                self._pending_cnt += 1
+
+            if self._pending_cnt >= self.flush_lines or \
+                    (time.monotonic() - last_flush) >= self.flush_seconds:
+                if self._pending_cnt:
+                    self._flush()
+                last_flush = time.monotonic()
+
+
+def install_signal_handlers(writer: Optional[JsonlWriter] = None,
+                            on_signal: Optional[Callable[[], None]] = None) -> None:
+    """
+    SIGINT/SIGTERM geldiğinde yazıcıyı boşaltıp çık. Yalnızca ana thread'den çağrılmalı.
+    on_signal: yazıcı kapanmadan önce çalışır (ör. bekleyen işleri iptal etmek için).
+    """
+    def _handler(signum, frame):
+        print(f"\n[INFO] Sinyal {signum} alındı; JSONL kuyruğu diske yazılıyor...")
+        if on_signal is not None:
+            on_signal()
+        if writer is not None:
+            writer.close()
+        sys.exit(128 + signum)
+
+    signal.signal(signal.SIGINT, _handler)
+    signal.signal(signal.SIGTERM, _handler)
@@ -1,15 +1,283 @@
 # main.py
 import argparse
+import itertools
 import json
+import subprocess
 import sys
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
-from typing import Set
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from config import START_INDEX, POLITE_DELAY
-from driver import build_driver
-from utils import append_jsonl, load_summary_names
+from config import (
+    START_INDEX, FETCHER, ASYNC_CONCURRENCY, CROSSREF_MAX_ITEMS,
+    CROSSREF_CACHE_DIR, CROSSREF_CACHE_TTL, RUN_STATE_DB, BROWSER_PROFILE,
+    CHROME_PROFILE_DIR, PDF_CACHE_DIR, CROSSREF_PREFETCH_JOURNALS, CROSSREF_BATCH_SIZE, CROSSREF_SAMPLE_SIZE,
+    TITLE_SIMILARITY
+)
+from driver import build_driver, profile_dir_for
+from driver_pool import DriverPool
+from managed_browser import ManagedBrowser
 from processor import process_one_issn
+from prefetch import CrossrefPrefetcher
+from crossref import set_cache
+from crossref_cache import CrossrefCache
+from crossref_client import get_client
+from run_state import RunState, normalize_issn
+from jsonl_writer import JsonlWriter, install_signal_handlers
+from netcapture import capture_stats
+from pdf_cache import PdfTextCache, set_pdf_cache, get_pdf_cache
+from pdf_service import get_pdf_service
+from textnorm import set_similarity
+from shard import parse_shard, part_path, journal_key, shard_of, merge_parts
+from work_queue import WorkQueue, worker_id
+
+# run_journal / fast_skip'in main() içinde koşu durumu bağlanmış halleri (functools.partial)
+RunFn = Callable[..., bool]  # (browser, idx, issn, dp_name[, stream]) -> bitti_mi
+SkipFn = Callable[[int, str, str, str], bool]  # (idx, dp_name, issn, eissn) -> atlandı_mı
+
+
+def merge_outputs(summary_path: Path, detail_path: Path) -> None:
+    """Parça çıktılarını asıl summary/detail dosyalarına ekle."""
+    n_summary = merge_parts(summary_path, dedupe_issn=True)
+    n_detail = merge_parts(detail_path)
+    print(f"[MERGE] {summary_path}: +{n_summary} satır | {detail_path}: +{n_detail} satır")
+
+
+def _strip_option(argv: List[str], name: str) -> List[str]:
+    """argv'den '--name X' ya da '--name=X' çıkar."""
+    out, skip = [], False
+    for a in argv:
+        if skip:
+            skip = False
+            continue
+        if a == name:
+            skip = True
+            continue
+        if a.startswith(name + "="):
+            continue
+        out.append(a)
+    return out
+
+
+def run_workers(n: int, summary_path: Path, detail_path: Path) -> int:
+    """Aynı komutu n süreçte --shard k/n ile çalıştır, hepsi bitince birleştir."""
+    base = _strip_option(_strip_option(sys.argv[1:], "--workers"), "--shard")
+    procs = []
+    for k in range(1, n + 1):
+        cmd = [sys.executable, sys.argv[0], *base, "--shard", f"{k}/{n}"]
+        procs.append(subprocess.Popen(cmd, stdin=subprocess.DEVNULL))
+    print(f"[WORKERS] {n} süreç başlatıldı")
+    try:
+        codes = [p.wait() for p in procs]
+    except KeyboardInterrupt:
+        # Çocuklar da SIGINT aldı; kuyruklarını yazıp çıkmalarını bekle. Parçalar sonra --merge ile birleşir.
+        for p in procs:
+            p.wait()
+        print("[WORKERS] Kesildi; parçalar birleştirilmedi (python main.py --merge)")
+        return 130
+    failed = [k for k, c in enumerate(codes, start=1) if c != 0]
+    if failed:
+        print(f"[WARN] Hata ile biten parçalar: {failed}")
+    merge_outputs(summary_path, detail_path)
+    return 1 if failed else 0
+
+
+def run_journal(args: argparse.Namespace, state: RunState, writer: JsonlWriter, summary_path: Path,
+                detail_path: Path, b: ManagedBrowser, idx: int, issn: str, dp_name: str,
+                stream=None) -> bool:
+    """Dergiyi işle; bittiyse True, hata/yarım kaldıysa False."""
+    try:
+        return process_one_issn(b, issn, summary_path, detail_path, dp_journal_name=dp_name,
+                                fetcher=args.fetcher, http_concurrency=args.concurrency,
+                                max_items=args.max_items, state=state, writer=writer,
+                                resume=args.resume, stream=stream, sample=args.sample)
+    except Exception as e:
+        msg = f"[ERR] {dp_name} (ISSN={issn}) işlenemedi: {e}"
+        print(msg)
+        writer.write(detail_path, {
+            "level": "ERROR", "event": "journal-failed",
+            "issn": issn, "dp_journal_name": dp_name, "idx": idx, "msg": msg
+        })
+        return False
+
+
+def fast_skip(state: RunState, writer: JsonlWriter, detail_path: Path,
+              idx: int, dp_name: str, issn: str, eissn: str) -> bool:
+    """Hızlı SKIP: ISSN/eISSN ya da (normalize) ad koşu durumunda varsa Crossref/Selenium'a girmeden atla."""
+    chosen_issn = issn if issn else eissn
+    if state.is_done(issn, eissn):
+        print(f"[FAST-SKIP] ISSN zaten işlenmiş: {chosen_issn} ({dp_name})")
+        writer.write(detail_path, {
+            "level": "INFO",
+            "event": "fast-skip-issn",
+            "issn": chosen_issn,
+            "dp_journal_name": dp_name,
+            "idx": idx
+        })
+        return True
+    if state.has_name(dp_name):
+        info = f"[FAST-SKIP] summary’de isim var: {dp_name}"
+        print(info)
+        writer.write(detail_path, {
+            "level": "INFO",
+            "event": "fast-skip-name",
+            "dp_journal_name": dp_name,
+            "idx": idx
+        })
+        return True
+    return False
+
+
+def static_jobs(journals: List[Dict[str, Any]], skip: SkipFn, writer: JsonlWriter, detail_path: Path,
+                start_idx: int = 1, max_jobs: int = 0,
+                shard: Optional[Tuple[int, int]] = None) -> Iterator[Tuple[int, str, str, Tuple[str, str]]]:
+    """İşlenecek dergiler (idx, issn, dp_name, (issn, eissn)); atlananlar burada loglanır."""
+    processed_issns: Set[str] = set()  # bu koşuda tekrar ISSN işlenmesin
+    total_cnt = 0
+    for idx, j in enumerate(journals, start=1):
+        if max_jobs and total_cnt >= max_jobs:
+            return
+        if idx < start_idx:
+            continue
+        if shard is not None and shard_of(journal_key(j), shard[1]) != shard[0]:
+            continue
+
+        dp_name = (j.get("journal_name") or "").strip()
+        issn = (j.get("issn") or "").strip()
+        eissn = (j.get("eissn") or "").strip()
+        chosen_issn = issn if issn else eissn
+
+        if skip(idx, dp_name, issn, eissn):
+            continue
+
+        if not chosen_issn:
+            info = f"[SKIP] ISSN ve eISSN yok: {dp_name}"
+            print(info)
+            writer.write(detail_path, {
+                "level": "WARN", "event": "skip-no-issn",
+                "dp_journal_name": dp_name, "idx": idx
+            })
+            continue
+
+        if normalize_issn(chosen_issn) in processed_issns:
+            info = f"[SKIP] Aynı ISSN tekrar: {chosen_issn} ({dp_name})"
+            print(info)
+            writer.write(detail_path, {
+                "level": "INFO", "event": "skip-dup-issn",
+                "issn": chosen_issn, "dp_journal_name": dp_name, "idx": idx
+            })
+            continue
+
+        processed_issns.add(normalize_issn(chosen_issn))
+        total_cnt += 1
+        yield idx, chosen_issn, dp_name, (issn, eissn)
+
+
+def _run_pooled(pool: DriverPool, run: RunFn, prefetcher: Optional[CrossrefPrefetcher],
+                idx: int, issn: str, dp_name: str, stream=None, item=None) -> None:
+    try:
+        with pool.driver() as b:
+            run(b, idx, issn, dp_name, stream)
+    except Exception as e:
+        # Tarayıcı kurulamadı
+        print(f"[ERR] {dp_name} (ISSN={issn}) için tarayıcı alınamadı: {e}")
+    finally:
+        if item is not None:
+            prefetcher.done(item)
+
+
+def run_static(work: Iterable[Tuple[Tuple[Any, ...], Any]], total: int, run: RunFn,
+               stopping: threading.Event, prefetcher: Optional[CrossrefPrefetcher] = None,
+               browser: Optional[ManagedBrowser] = None, pool: Optional[DriverPool] = None,
+               executor: Optional[ThreadPoolExecutor] = None) -> None:
+    """
+    Girdi listesinden gelen dergileri sırayla işle. executor verilirse her dergi havuzdaki
+    boş tarayıcıya gönderilir (beklemek çağıranın işi), yoksa tek tarayıcıda burada işlenir.
+    """
+    for (idx, chosen_issn, dp_name, _), item in work:
+        if stopping.is_set():
+            break
+        print(f"[RUN] {idx}/{total}  {dp_name}  → ISSN={chosen_issn}")
+        stream = item.stream if item is not None else None
+        if executor is not None:
+            executor.submit(_run_pooled, pool, run, prefetcher, idx, chosen_issn, dp_name, stream, item)
+            continue
+        try:
+            run(browser, idx, chosen_issn, dp_name, stream)
+        finally:
+            if item is not None:
+                prefetcher.done(item)
+
+
+def run_queue(queue: WorkQueue, run: RunFn, skip: SkipFn, stopping: threading.Event, max_jobs: int,
+              browser_ctx: Callable[[], ContextManager[ManagedBrowser]],
+              executor: Optional[ThreadPoolExecutor] = None, threads: int = 1) -> None:
+    """
+    Kuyruktan dergi kiralayıp işle; kuyruk boşalınca (ya da max_jobs dolunca) dön.
+    executor verilirse threads kadar işçi thread'i aynı kuyruktan kiralar.
+    """
+    claimed = itertools.count(1)
+    owner_prefix = worker_id() + ":"
+
+    def run_claimed(owner: str) -> None:
+        while not stopping.is_set():
+            if max_jobs and next(claimed) > max_jobs:
+                return
+            job = queue.claim(owner)
+            if job is None:
+                return
+            if skip(job.idx, job.dp_name, job.raw_issn, job.eissn):
+                queue.complete(job, owner)
+                continue
+            print(f"[RUN] #{job.idx}  {job.dp_name}  → ISSN={job.raw_issn} (deneme {job.attempts})")
+            ok = False
+            try:
+                with queue.leased(job, owner), browser_ctx() as b:
+                    ok = run(b, job.idx, job.raw_issn, job.dp_name)
+            except Exception as e:
+                print(f"[ERR] {job.dp_name} (ISSN={job.raw_issn}) için tarayıcı alınamadı: {e}")
+            if ok:
+                queue.complete(job, owner)
+            else:
+                new_state = queue.fail(job, owner, "journal-failed / crossref hatası (detail.jsonl)")
+                print(f"[QUEUE] {job.raw_issn} → {new_state}")
+
+    try:
+        if executor is None:
+            run_claimed(worker_id("t1"))
+        else:
+            for k in range(1, threads + 1):
+                executor.submit(run_claimed, worker_id(f"t{k}"))
+            executor.shutdown(wait=True)
+    finally:
+        # Kesintide kiradaki işleri hemen geri bırak (kira süresinin dolmasını bekletme)
+        released = queue.release(owner_prefix)
+        if released:
+            print(f"[QUEUE] {released} iş geri bırakıldı")
+        print(f"[QUEUE] Durum: {queue.counts()}")
+
+
+def report_stats(writer: JsonlWriter, detail_path: Path, profile: str) -> None:
+    """Koşu sonu tarayıcı / PDF / Crossref istatistikleri; PDF havuzu burada kapanır."""
+    # Tarayıcı trafiği: engellenen istekler ve indirilen bayt
+    stats = capture_stats()
+    print(f"[INFO] Tarayıcı: {stats['navigations']} sayfa | engellenen istek={stats['blocked']} | "
+          f"indirilen={stats['bytes'] / 1e6:.1f} MB")
+    writer.write(detail_path, {"level": "INFO", "event": "browser-stats", "profile": profile, **stats})
+
+    pdf_stats = get_pdf_service().stats()
+    pdf_cache = get_pdf_cache()
+    if pdf_stats["jobs"] or (pdf_cache is not None and pdf_cache.hits):
+        cached = f" | önbellek={pdf_cache.hits} (indirmeden={pdf_cache.url_hits})" if pdf_cache is not None else ""
+        print(f"[INFO] PDF: {pdf_stats['jobs']} çıkarma | yedek yöntem={pdf_stats['fallbacks']} | "
+              f"kesilen={pdf_stats['truncated']} | zaman aşımı={pdf_stats['timeouts']}{cached}")
+    get_pdf_service().close()
+    crossref_stats = get_client().stats()
+    print(f"[INFO] Crossref: {crossref_stats['requests']} istek | tekrar={crossref_stats['retries']} | "
+          f"429={crossref_stats['throttled']} | hız beklemesi={crossref_stats['waited']} sn")
 
 
 def main():
@@ -23,8 +291,82 @@ def main():
     parser.add_argument("--max", type=int, default=0, help="İlk N dergi ile sınırla (0=hepsi)")
     parser.add_argument("--start", type=int, default=START_INDEX,
                         help=f"Başlangıç index'i (1-based). Varsayılan: {START_INDEX}")
+    parser.add_argument("--fetcher", choices=["tiered", "selenium"], default=FETCHER,
+                        help="tiered: önce düz HTTP, belirsizse Selenium; selenium: her URL tarayıcıda")
+    parser.add_argument("--concurrency", type=int, default=ASYNC_CONCURRENCY,
+                        help="HTTP katmanında eşzamanlı istek sayısı (0: sıralı)")
+    parser.add_argument("--profile", choices=["validation", "interactive"], default=BROWSER_PROFILE,
+                        help="validation: headless + eager + kaynak engelleme; interactive: görünür tarayıcı")
+    parser.add_argument("--chrome-profile", default=CHROME_PROFILE_DIR,
+                        help="Kalıcı Chrome profilleri için klasör (her tarayıcıya bir alt klasör; boş: geçici profil)")
+    parser.add_argument("--browsers", type=int, default=1,
+                        help="Paralel tarayıcı sayısı; >1 ise dergiler N driver'lık havuza dağıtılır")
+    parser.add_argument("--max-items", type=int, default=CROSSREF_MAX_ITEMS,
+                        help=f"Dergi başına test edilecek en fazla makale (0=hepsi). Varsayılan: {CROSSREF_MAX_ITEMS}")
+    parser.add_argument("--prefetch", type=int, default=CROSSREF_PREFETCH_JOURNALS,
+                        help="Kontrol sürerken sıradaki kaç derginin Crossref ilk sayfası önceden indirilsin "
+                             f"(0: kapalı). Varsayılan: {CROSSREF_PREFETCH_JOURNALS}")
+    parser.add_argument("--batch", type=int, default=CROSSREF_BATCH_SIZE,
+                        help="N dergiyi tek Crossref sorgusunda (filter=issn:A,issn:B,...) topla; 0: kapalı")
+    parser.add_argument("--sample", type=int, default=CROSSREF_SAMPLE_SIZE,
+                        help="Dergi başına N makalelik yıl tabakalı rastgele örnek (0: created sırasıyla "
+                             "ilk --max-items makale). --batch ile birlikte kullanılmaz")
+    parser.add_argument("--cache-dir", default=CROSSREF_CACHE_DIR, help="Crossref disk önbelleği klasörü")
+    parser.add_argument("--cache-ttl", type=float, default=CROSSREF_CACHE_TTL,
+                        help="Önbellek tazelik süresi (saniye); sonrası ETag/Last-Modified ile doğrulanır")
+    parser.add_argument("--no-cache", action="store_true", help="Crossref önbelleğini kullanma")
+    parser.add_argument("--offline", action="store_true",
+                        help="Crossref'e hiç istek atma; yalnızca önbellekteki yanıtları kullan")
+    parser.add_argument("--pdf-cache-dir", default=PDF_CACHE_DIR,
+                        help="Çıkarılmış PDF metni önbelleği klasörü (içerik SHA-256'sı + URL eşlemesi)")
+    parser.add_argument("--no-pdf-cache", action="store_true", help="PDF metin önbelleğini kullanma")
+    parser.add_argument("--title-similarity", type=float, default=TITLE_SIMILARITY,
+                        help="Tam eşleşme yoksa başlık kelimelerinin bu oranı sayfada geçerse kabul et "
+                             "(0-1, 0: kapalı)")
+    parser.add_argument("--state", default=RUN_STATE_DB,
+                        help="Koşu durumu SQLite dosyası (işlenmiş ISSN'ler)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Yarıda kalmış dergilerde yalnızca kontrol edilmemiş makaleleri kontrol et")
+    parser.add_argument("--shard", default="",
+                        help="Yalnızca bu parçadaki dergileri işle: i/n (1-based, ISSN özetine göre). "
+                             "Çıktılar summary.part-i-of-n.jsonl / detail.part-i-of-n.jsonl'e yazılır")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="N yerel süreç başlat (--shard 1/N ... N/N), bitince parçaları birleştir")
+    parser.add_argument("--queue", default="",
+                        help="SQLite iş kuyruğu dosyası; verilirse dergiler kuyruktan kiralanır "
+                             "(birden çok süreç aynı kuyruğu paylaşabilir, --start kullanılmaz)")
+    parser.add_argument("--merge", action="store_true",
+                        help="Yalnızca parça çıktılarını summary/detail dosyalarına birleştir ve çık")
     args = parser.parse_args()
 
+    if args.sample > 0 and args.batch > 1:
+        print("[WARN] --sample ile --batch birlikte kullanılamaz; toplu sorgu kapatıldı")
+        args.batch = 0
+
+    if args.merge:
+        merge_outputs(Path(args.summary), Path(args.detail))
+        return
+    if args.workers > 1:
+        sys.exit(run_workers(args.workers, Path(args.summary), Path(args.detail)))
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        print(f"[ERR] {e}")
+        sys.exit(1)
+
+    if not args.no_cache:
+        set_cache(CrossrefCache(args.cache_dir, ttl=args.cache_ttl, offline=args.offline))
+    elif args.offline:
+        print("[ERR] --offline için önbellek gerekli (--no-cache ile birlikte kullanılamaz)")
+        sys.exit(1)
+    if not args.offline and not get_client().mailto:
+        print("[WARN] CROSSREF_MAILTO boş: Crossref polite pool kullanılamıyor "
+              "(config.CROSSREF_MAILTO ya da CROSSREF_MAILTO ortam değişkeni)")
+
+    if not args.no_pdf_cache:
+        set_pdf_cache(PdfTextCache(args.pdf_cache_dir))
+    set_similarity(args.title_similarity)
+
     in_path = Path(args.input)
     if not in_path.exists():
         print(f"[ERR] Girdi dosyası yok: {in_path.resolve()}")
@@ -40,72 +382,121 @@ def main():
 
     summary_path = Path(args.summary)
     detail_path = Path(args.detail)
+    if shard is not None:
+        # Her parça kendi dosyasına yazar; asıl dosyalar --merge ile oluşur
+        summary_path = part_path(summary_path, *shard)
+        detail_path = part_path(detail_path, *shard)
+        print(f"[SHARD] {shard[0]}/{shard[1]} → {summary_path.name}, {detail_path.name}")
 
-    # --- summary.jsonl'deki dergi adlarını (journal_name + dp_journal_name) tek seferde yükle
-    processed_names = load_summary_names(summary_path)
+    # Tüm summary/detail satırları tek yazıcı thread üzerinden
+    writer = JsonlWriter()
 
-    # Selenium (tek pencere)
-    driver = build_driver(detach=True)
+    # --- Koşu durumu: summary.jsonl'de yeni eklenen satırlar varsa içe aktar (ilk seferde tamamı)
+    state = RunState(args.state)
+    imported = state.import_summary_jsonl(summary_path)
+    if shard is not None:
+        # Parça çalışırken asıl summary.jsonl'deki (önceki koşular) dergiler de atlanmalı
+        imported += state.import_summary_jsonl(Path(args.summary))
+    if imported:
+        print(f"[INFO] summary.jsonl'den {imported} dergi koşu durumuna aktarıldı → {args.state}")
+    if args.resume:
+        # Checkpoint'ten önceki koşular için yarım dergilerin makale satırlarını detail.jsonl'den al
+        imported = state.import_detail_jsonl(detail_path)
+        if imported:
+            print(f"[INFO] detail.jsonl'den {imported} makale checkpoint'i alındı")
 
-    processed_issns: Set[str] = set()  # bu koşuda tekrar ISSN işlenmesin
-    total_cnt = 0
-    N = len(journals)
-    start_idx = max(1, int(args.start))
+    queue = None
+    if args.queue:
+        # Aynı listeyi her işçi ekleyebilir; var olan işler değişmez
+        queue = WorkQueue(args.queue)
+        added = queue.enqueue(journals)
+        print(f"[QUEUE] {args.queue}: +{added} iş | durum: {queue.counts()}")
 
-    for idx, j in enumerate(journals, start=1):
-        if args.max and total_cnt >= args.max:
-            break
-        if idx < start_idx:
-            continue
+    browsers = max(1, int(args.browsers))
+    browser_no = itertools.count(1)
 
-        dp_name = (j.get("journal_name") or "").strip()
-        dp_name_l = dp_name.lower()
+    def make_browser() -> ManagedBrowser:
+        # Sayfa/RSS sınırında ya da oturum ölünce yeniden kurulur; olaylar detail.jsonl'e.
+        # Yeniden kurulan tarayıcı aynı kalıcı profil klasörünü kullanır (sıcak önbellek).
+        name = f"chrome-{next(browser_no)}" if shard is None else f"chrome-{shard[0]}-{next(browser_no)}"
+        user_data_dir = profile_dir_for(args.chrome_profile, name)
+        return ManagedBrowser(
+            lambda: build_driver(detach=browsers == 1, profile=args.profile,
+                                 user_data_dir=user_data_dir),
+            on_event=lambda ev: writer.write(detail_path, ev),
+            name=name,
+        )
 
-        # --- Hızlı SKIP (isim bazlı): summary’de aynı ad varsa Crossref/Selenium'a girmeden atla
-        if dp_name_l in processed_names:
-            info = f"[FAST-SKIP] summary’de isim var: {dp_name}"
-            print(info)
-            append_jsonl(detail_path, {
-                "level": "INFO",
-                "event": "fast-skip-name",
-                "dp_journal_name": dp_name,
-                "idx": idx
-            })
-            continue
+    if browsers == 1:
+        # Selenium (tek pencere); driver ilk Selenium kontrolünde kurulur
+        browser = make_browser()
+    else:
+        # N tarayıcılık havuz: her dergi boştaki tarayıcıya verilir
+        pool = DriverPool(browsers, factory=make_browser)
+        executor = ThreadPoolExecutor(max_workers=browsers)
 
-        issn = (j.get("issn") or "").strip()
-        eissn = (j.get("eissn") or "").strip()
-        chosen_issn = issn if issn else eissn
+    # SIGINT/SIGTERM: kuyruktaki dergileri iptal et, JSONL kuyruğunu diske yazıp çık.
+    # Çalışmakta olan dergiler bitene kadar yazdıkları satırlar da kaybolmaz.
+    stopping = threading.Event()
 
-        if not chosen_issn:
-            info = f"[SKIP] ISSN ve eISSN yok: {dp_name}"
-            print(info)
-            append_jsonl(detail_path, {
-                "level": "WARN", "event": "skip-no-issn",
-                "dp_journal_name": dp_name, "idx": idx
-            })
-            continue
+    prefetcher = None
 
-        if chosen_issn in processed_issns:
-            info = f"[SKIP] Aynı ISSN tekrar: {chosen_issn} ({dp_name})"
-            print(info)
-            append_jsonl(detail_path, {
-                "level": "INFO", "event": "skip-dup-issn",
-                "issn": chosen_issn, "dp_journal_name": dp_name, "idx": idx
-            })
-            continue
+    def on_signal() -> None:
+        stopping.set()  # kuyruk işçileri yeni dergi kiralamasın
+        if prefetcher is not None:
+            prefetcher.close()
+        if browsers > 1:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        print(f"[RUN] {idx}/{N}  {dp_name}  → ISSN={chosen_issn}")
-        process_one_issn(driver, chosen_issn, summary_path, detail_path, dp_journal_name=dp_name)
-        processed_issns.add(chosen_issn)
-        total_cnt += 1
+    install_signal_handlers(writer, on_signal=on_signal)
+
+    run = partial(run_journal, args, state, writer, summary_path, detail_path)
+    skip = partial(fast_skip, state, writer, detail_path)
+
+    if queue is not None:
+        if browsers == 1:
+            run_queue(queue, run, skip, stopping, args.max, lambda: nullcontext(browser))
+        else:
+            run_queue(queue, run, skip, stopping, args.max, pool.driver, executor, browsers)
+    else:
+        jobs = static_jobs(journals, skip, writer, detail_path, max(1, int(args.start)), args.max, shard)
+        if args.prefetch > 0 or args.batch > 1:
+            # Tarayıcılar kontrol ederken sıradaki dergilerin Crossref ilk sayfası arka planda iner;
+            # işlenmekte olanlar + args.prefetch kadar dergi önde tutulur
+            prefetcher = CrossrefPrefetcher(jobs, depth=browsers + args.prefetch,
+                                            max_items=args.max_items, batch_size=args.batch,
+                                            sample=args.sample)
+            work = ((item.job, item) for item in prefetcher)
+        else:
+            work = ((job, None) for job in jobs)
+        if browsers == 1:
+            run_static(work, len(journals), run, stopping, prefetcher, browser=browser)
+        else:
+            run_static(work, len(journals), run, stopping, prefetcher, pool=pool, executor=executor)
 
-        # Dergi bazında nazik gecikme
-        time.sleep(POLITE_DELAY)
+    if browsers > 1:
+        executor.shutdown(wait=True)
+    if prefetcher is not None:
+        prefetcher.close()
+        if prefetcher.batch_size > 1:
+            print(f"[INFO] Toplu Crossref sorgusundan karşılanan dergi: {prefetcher.batched}")
 
-    input("Tarayıcı açık. Kapatmak için Enter'a basın...")
-    driver.quit()
+    report_stats(writer, detail_path, args.profile)
 
+    if browsers > 1:
+        pool.close()
+    writer.close()
+    state.close()
+    if queue is not None:
+        queue.close()
+    if browsers > 1:
+        return
+    if args.profile == "interactive":
+        try:
+            input("Tarayıcı açık. Kapatmak için Enter'a basın...")
+        except EOFError:  # --workers altında stdin yok
+            pass
+    browser.quit()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,163 @@
+# managed_browser.py
+"""
+Uzun koşular için kendini yöneten tarayıcı.
+- BROWSER_MAX_NAVIGATIONS sayfadan sonra ya da Chrome süreç ağacının RSS'i
+  BROWSER_MAX_RSS_MB'ı aşınca driver kapatılıp yeniden kurulur (bellek şişmesi).
+- Oturum ölmüşse (is_dead_session_error) driver yeniden kurulur ve o anki URL
+  bir kez daha denenir; yeniden başlatmalar on_event ile bildirilir (detail.jsonl).
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from selenium import webdriver
+
+from config import BROWSER_MAX_NAVIGATIONS, BROWSER_MAX_RSS_MB, BROWSER_RSS_CHECK_EVERY
+from titlematch import TitleMatcher
+from utils import check_url_selenium, is_dead_session_error
+
+
+def _tree_rss_mb(root_pid: int) -> float:
+    """root_pid ve tüm alt süreçlerinin toplam RSS'i (MB). Ölçülemiyorsa 0."""
+    try:
+        import psutil
+        root = psutil.Process(root_pid)
+        procs = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs) / (1024 * 1024)
+    except ImportError:
+        pass
+    except Exception:
+        return 0.0
+
+    # psutil yoksa: Linux /proc üzerinden ebeveyn haritası
+    if not os.path.isdir("/proc"):
+        return 0.0
+    children: Dict[int, list] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "rb") as f:
+                stat = f.read()
+            # "pid (comm) state ppid ...": comm boşluk içerebilir, son ')' sonrası okunur
+            ppid = int(stat[stat.rindex(b")") + 2:].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+
+    page = os.sysconf("SC_PAGE_SIZE")
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"/proc/{pid}/statm", "rb") as f:
+                total += int(f.read().split()[1]) * page
+        except (OSError, ValueError, IndexError):
+            pass
+        stack.extend(children.get(pid, ()))
+    return total / (1024 * 1024)
+
+
+class ManagedBrowser:
+    """
+    Kullanım:
+        browser = ManagedBrowser(lambda: build_driver(detach=False), on_event=log)
+        status, has_title, info, is_accessible = browser.check_url(url, title_norm)
+        browser.quit()
+    processor/fetcher'a driver yerine verilebilir; Selenium kontrolleri buradan geçer.
+    """
+
+    def __init__(self, factory: Callable[[], webdriver.Chrome] = None,
+                 max_navigations: int = BROWSER_MAX_NAVIGATIONS,
+                 max_rss_mb: float = BROWSER_MAX_RSS_MB,
+                 rss_check_every: int = BROWSER_RSS_CHECK_EVERY,
+                 on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 name: str = ""):
+        if factory is None:
+            from driver import build_driver
+            factory = lambda: build_driver(detach=False)  # noqa: E731
+        self._factory = factory
+        self.max_navigations = int(max_navigations)
+        self.max_rss_mb = float(max_rss_mb)
+        self.rss_check_every = max(1, int(rss_check_every))
+        self.on_event = on_event
+        self.name = name
+        self._driver: Optional[webdriver.Chrome] = None
+        self._lock = threading.Lock()
+        self.navigations = 0  # mevcut driver'ın açtığı sayfa sayısı
+        self.total_navigations = 0
+        self.restarts = 0
+
+    @property
+    def driver(self) -> webdriver.Chrome:
+        if self._driver is None:
+            self._driver = self._factory()
+        return self._driver
+
+    def rss_mb(self) -> float:
+        d = self._driver
+        try:
+            pid = d.service.process.pid
+        except Exception:
+            return 0.0
+        return _tree_rss_mb(pid)
+
+    def quit(self) -> None:
+        d, self._driver = self._driver, None
+        self.navigations = 0
+        if d is not None:
+            try:
+                d.quit()
+            except Exception:
+                pass
+
+    def restart(self, reason: str, **extra: Any) -> None:
+        """Driver'ı kapatıp yenisini kur; olayı bildir."""
+        navigations = self.navigations
+        self.quit()
+        t0 = time.monotonic()
+        self._driver = self._factory()
+        self.restarts += 1
+        event = {
+            "level": "WARN" if reason == "dead-session" else "INFO",
+            "event": "browser-restart",
+            "browser": self.name,
+            "reason": reason,
+            "navigations": navigations,
+            "restarts": self.restarts,
+            "rebuild_seconds": round(time.monotonic() - t0, 2),
+        }
+        event.update(extra)
+        print(f"[BROWSER] {self.name or 'tarayıcı'} yeniden başlatıldı: {reason} "
+              f"({navigations} sayfa, toplam {self.restarts})")
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _maybe_recycle(self) -> None:
+        if self._driver is None:
+            return
+        if self.max_navigations > 0 and self.navigations >= self.max_navigations:
+            self.restart("navigations")
+        elif self.max_rss_mb > 0 and self.navigations and self.navigations % self.rss_check_every == 0:
+            rss = self.rss_mb()
+            if rss > self.max_rss_mb:
+                self.restart("rss", rss_mb=round(rss, 1))
+
+    def check_url(self, url: str, title_norm: str,
+                  matcher: Optional[TitleMatcher] = None) -> Tuple[int, bool, str, bool]:
+        """
+        check_url_selenium'un yönetilen hali. Oturum ölmüşse driver yeniden kurulup
+        URL bir kez daha denenir; ikinci kez de ölürse hata çağırana geçer.
+        """
+        with self._lock:
+            self._maybe_recycle()
+            for attempt in (1, 2):
+                self.navigations += 1
+                self.total_navigations += 1
+                try:
+                    return check_url_selenium(self.driver, url, title_norm, matcher=matcher)
+                except Exception as e:
+                    if attempt == 2 or not is_dead_session_error(e):
+                        raise
+                    self.restart("dead-session", url=url, error=(str(e).splitlines() or [""])[0][:300])
@@ -0,0 +1,298 @@
+# netcapture.py
+"""
+Ana çerçeve (main frame) belge isteğinin ağ bilgisini yakalar.
+Tercih: CDP olay aboneliği (driver.bidi_connection, trio). Arka plandaki bir thread
+yalnızca Network.requestWillBeSent / Network.responseReceived olaylarını dinler ve
+sadece ana çerçevenin "Document" isteğini tutar; yönlendirme zinciri de buradan çıkar.
+CDP bağlanamazsa performance logu okunur (build_driver logu açtıysa), o da yoksa
+sayfadaki Navigation Timing kaydından status/mime alınır.
+"""
+import json
+import threading
+import weakref
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from selenium import webdriver
+
+from config import NET_CAPTURE
+
+# Ana belge yanıtı sürücü döndükten sonra thread'e en geç bu kadar sürede ulaşır (saniye)
+_RESPONSE_GRACE = 0.5
+# CDP olay kanalı tamponu; ağır sayfalarda olay kaybolmasın
+_EVENT_BUFFER = 4096
+
+_NAV_TIMING_JS = """
+var nav = (performance.getEntriesByType && performance.getEntriesByType("navigation")[0]) || {};
+return {status: nav.responseStatus || 0, mime: document.contentType || "",
+        redirects: nav.redirectCount || 0};
+"""
+
+
+class NavResult(NamedTuple):
+    status: int
+    final_url: str
+    mime_type: str
+    redirects: List[Tuple[int, str]]  # [(status, url), ...] son yanıttan önceki atlamalar
+    source: str  # "cdp" | "log" | "timing"
+    blocked: int = 0  # engellenen alt kaynak sayısı (Network.setBlockedURLs)
+    bytes: int = 0  # sayfanın indirdiği toplam bayt (yalnızca cdp)
+
+
+class _Stats:
+    """Süreç geneli sayaçlar: kaç gezinme, kaç engellenen istek, kaç bayt indirildi."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.navigations = 0
+        self.blocked = 0
+        self.bytes = 0
+
+    def add(self, nav: NavResult) -> None:
+        with self._lock:
+            self.navigations += 1
+            self.blocked += nav.blocked
+            self.bytes += nav.bytes
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {"navigations": self.navigations, "blocked": self.blocked, "bytes": self.bytes}
+
+
+_stats = _Stats()
+
+
+def capture_stats() -> Dict[str, int]:
+    return _stats.as_dict()
+
+
+def cdp_available() -> bool:
+    try:
+        import trio  # noqa: F401
+        from selenium.webdriver.common.bidi import cdp  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _is_document(resource_type) -> bool:
+    return getattr(resource_type, "value", resource_type) == "Document"
+
+
+class NetworkCapture:
+    """
+    Kullanım:
+        cap = NetworkCapture(driver); cap.start()
+        cap.begin(); driver.get(url); nav = cap.result(driver.current_url)
+    """
+
+    def __init__(self, driver: webdriver.Chrome):
+        self._driver = weakref.ref(driver)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._got_response = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.active = False
+        self.error = ""
+        self._main_frame = ""
+        self._reset()
+
+    def _reset(self) -> None:
+        self._request_id = ""
+        self._chain: List[Tuple[int, str]] = []
+        self._status = 0
+        self._url = ""
+        self._mime = ""
+        self._blocked = 0
+        self._bytes = 0
+        self._got_response.clear()
+
+    # ---------- Yaşam döngüsü ----------
+    def start(self, timeout: float = 5.0) -> bool:
+        """Dinleyici thread'i başlat; abonelik kurulunca True döner."""
+        if self._thread is not None:
+            return self.active
+        if not cdp_available():
+            self.error = "trio/CDP yok"
+            return False
+        self._thread = threading.Thread(target=self._run, name="netcapture", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        return self.active
+
+    def _run(self) -> None:
+        import trio
+        try:
+            trio.run(self._listen)
+        except BaseException as e:  # tarayıcı kapanınca bağlantı kopar
+            self.error = str(e) or type(e).__name__
+        finally:
+            self.active = False
+            self._ready.set()
+
+    async def _listen(self) -> None:
+        import trio
+        driver = self._driver()
+        if driver is None:
+            return
+        async with driver.bidi_connection() as conn:
+            session, devtools = conn.session, conn.devtools
+            await session.execute(devtools.network.enable())
+            try:
+                tree = await session.execute(devtools.page.get_frame_tree())
+                self._main_frame = str(tree.frame.id_)
+            except Exception:
+                # Chrome'da ana çerçeve kimliği sekmenin target id'si ile aynıdır
+                self._main_frame = driver.current_window_handle
+            requests_ch = session.listen(devtools.network.RequestWillBeSent, buffer_size=_EVENT_BUFFER)
+            responses_ch = session.listen(devtools.network.ResponseReceived, buffer_size=_EVENT_BUFFER)
+            loading_ch = session.listen(devtools.network.LoadingFinished, devtools.network.LoadingFailed,
+                                        buffer_size=_EVENT_BUFFER)
+            self.active = True
+            self._ready.set()
+            async with trio.open_nursery() as nursery:
+                nursery.start_soon(self._on_requests, requests_ch)
+                nursery.start_soon(self._on_responses, responses_ch)
+                nursery.start_soon(self._on_loading, loading_ch)
+
+    def _is_main_document(self, ev) -> bool:
+        return _is_document(ev.type_) and str(ev.frame_id or "") == self._main_frame
+
+    async def _on_requests(self, channel) -> None:
+        async for ev in channel:
+            if not self._is_main_document(ev):
+                continue
+            with self._lock:
+                if ev.redirect_response is not None and str(ev.request_id) == self._request_id:
+                    self._chain.append((int(ev.redirect_response.status), ev.redirect_response.url))
+                else:
+                    # Yeni gezinme: zinciri baştan başlat
+                    self._chain = []
+                    self._status, self._url, self._mime = 0, "", ""
+                    self._got_response.clear()
+                self._request_id = str(ev.request_id)
+
+    async def _on_responses(self, channel) -> None:
+        async for ev in channel:
+            if not self._is_main_document(ev):
+                continue
+            with self._lock:
+                if str(ev.request_id) != self._request_id:
+                    continue
+                self._status = int(ev.response.status)
+                self._url = ev.response.url
+                self._mime = ev.response.mime_type or ""
+            self._got_response.set()
+
+    async def _on_loading(self, channel) -> None:
+        # Alt kaynaklar dahil: engellenenleri ve indirilen baytı say
+        async for ev in channel:
+            with self._lock:
+                if hasattr(ev, "encoded_data_length"):
+                    self._bytes += int(ev.encoded_data_length or 0)
+                elif ev.blocked_reason is not None:
+                    self._blocked += 1
+
+    # ---------- Gezinme başına ----------
+    def begin(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def result(self, final_url: str) -> NavResult:
+        self._got_response.wait(_RESPONSE_GRACE)
+        with self._lock:
+            return NavResult(self._status, self._url or final_url, self._mime,
+                             list(self._chain), "cdp", self._blocked, self._bytes)
+
+
+# ---------- performance logu / Navigation Timing yedekleri ----------
+def _drain_log(driver: webdriver.Chrome) -> list:
+    try:
+        return driver.get_log("performance")
+    except Exception:
+        return []
+
+
+def _result_from_log(driver: webdriver.Chrome, final_url: str) -> Optional[NavResult]:
+    """Performance logundan ana çerçevenin belge isteği; ilgisiz girdiler parse edilmez."""
+    entries = _drain_log(driver)
+    if not entries:
+        return None
+    main_frame = driver.current_window_handle
+    chain: List[Tuple[int, str]] = []
+    status, url, mime, request_id = 0, "", "", ""
+    blocked = 0
+    for entry in entries:
+        raw = entry.get("message") or ""
+        if '"blockedReason"' in raw and '"inspector"' in raw:
+            blocked += 1
+            continue
+        # Ucuz ön eleme: ağır sayfalarda binlerce alt kaynak girdisi var
+        if '"Document"' not in raw or "Network." not in raw:
+            continue
+        try:
+            msg = json.loads(raw)["message"]
+        except (ValueError, KeyError, TypeError):
+            continue
+        method = msg.get("method")
+        params = msg.get("params", {})
+        if params.get("type") != "Document" or params.get("frameId") != main_frame:
+            continue
+        if method == "Network.requestWillBeSent":
+            redirect = params.get("redirectResponse")
+            if redirect and params.get("requestId") == request_id:
+                chain.append((int(redirect.get("status", 0)), redirect.get("url") or ""))
+            else:
+                chain, status, url, mime = [], 0, "", ""
+            request_id = params.get("requestId") or ""
+        elif method == "Network.responseReceived" and params.get("requestId") == request_id:
+            resp = params.get("response", {})
+            status = int(resp.get("status", 0))
+            url = resp.get("url") or ""
+            mime = resp.get("mimeType") or ""
+    if not request_id:
+        return None
+    return NavResult(status, url or final_url, mime, chain, "log", blocked)
+
+
+def _result_from_timing(driver: webdriver.Chrome, final_url: str) -> NavResult:
+    try:
+        nav = driver.execute_script(_NAV_TIMING_JS) or {}
+    except Exception:
+        nav = {}
+    return NavResult(int(nav.get("status") or 0), final_url, nav.get("mime") or "", [], "timing")
+
+
+_captures: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_captures_lock = threading.Lock()
+
+
+def get_capture(driver: webdriver.Chrome) -> Optional[NetworkCapture]:
+    """Sürücü başına tek dinleyici; CDP kapalıysa/bağlanamazsa None."""
+    if NET_CAPTURE != "cdp":
+        return None
+    with _captures_lock:
+        cap = _captures.get(driver)
+        if cap is None:
+            cap = NetworkCapture(driver)
+            cap.start()
+            _captures[driver] = cap
+    return cap if cap.active else None
+
+
+def navigate(driver: webdriver.Chrome, url: str) -> NavResult:
+    """
+    driver.get(url) yap ve ana belgenin (status, final_url, mime, redirect zinciri) bilgisini döndür.
+    driver.get'in fırlattığı hatalar (timeout, ölü oturum) çağırana aynen geçer.
+    """
+    cap = get_capture(driver)
+    if cap is not None:
+        cap.begin()
+        driver.get(url)
+        nav = cap.result(driver.current_url or url)
+    else:
+        _drain_log(driver)  # önceki sayfanın girdileri karışmasın
+        driver.get(url)
+        final_url = driver.current_url or url
+        nav = _result_from_log(driver, final_url) or _result_from_timing(driver, final_url)
+    _stats.add(nav)
+    return nav
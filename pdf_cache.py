@@ -0,0 +1,173 @@
+# pdf_cache.py
+"""
+Çıkarılmış PDF metni için diskte kalıcı önbellek.
+- Metin PDF baytlarının SHA-256'sı ile saklanır (normalize metin, zlib)
+- URL (istenen ve yönlendirme sonrası son URL) → SHA-256 eşlemesi, yanıtın ETag/Last-Modified/
+  Content-Length değerleriyle (validator) birlikte tutulur; son URL'in canlı yanıtı aynı
+  validator'ı taşıyorsa gövde hiç indirilmeden metin alınır (aynı URL'de değişen PDF eski
+  metinle değerlendirilmez; validator'sız yanıtta URL eşlemesine güvenilmez)
+- Aynı sayı PDF'ine giden onlarca makale tek indirme ve tek çıkarma ile kontrol edilir
+- Toplam boyut sınırı aşılınca en uzun süredir kullanılmayan metinler (LRU) silinir
+"""
+import hashlib
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterable, Optional
+
+from config import PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES
+from crossref_cache import normalize_url
+from textnorm import NORM_VERSION
+
+_HEX_LEN = 64
+# Metinler normalize saklanır: normalizasyon kuralı değişince yeni dizine yazılır
+_TEXT_DIR = f"text-n{NORM_VERSION}"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def pdf_validator(headers) -> str:
+    """Yanıt başlıklarından sürüm imzası; hiçbiri yoksa '' (URL eşlemesi kullanılmaz)."""
+    parts = [(headers.get(h) or "").strip() for h in ("ETag", "Last-Modified", "Content-Length")]
+    return "|".join(parts) if any(parts) else ""
+
+
+class PdfTextCache:
+    def __init__(self, root: str = PDF_CACHE_DIR, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.url_hits = 0
+        self.misses = 0
+        (self.root / _TEXT_DIR).mkdir(parents=True, exist_ok=True)
+        (self.root / "url").mkdir(parents=True, exist_ok=True)
+        self._size = sum(p.stat().st_size for p in self.root.glob(f"{_TEXT_DIR}/*/*.z"))
+
+    def _text_path(self, sha: str) -> Path:
+        return self.root / _TEXT_DIR / sha[:2] / f"{sha}.z"
+
+    def _url_path(self, url: str) -> Path:
+        key = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return self.root / "url" / key[:2] / key
+
+    # ---------- Okuma ----------
+    def get(self, sha: str) -> Optional[str]:
+        """İçerik özetine göre normalize metin; yoksa None."""
+        path = self._text_path(sha)
+        try:
+            text = zlib.decompress(path.read_bytes()).decode("utf-8")
+        except (OSError, zlib.error, UnicodeDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        # LRU: erişim zamanı dosyanın mtime'ı
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def hash_for_url(self, url: str, validator: str) -> Optional[str]:
+        """URL'in bağlı olduğu özet; yalnızca kayıtlı validator canlı yanıttakiyle aynıysa."""
+        if not validator:
+            return None
+        try:
+            sha, _, stored = self._url_path(url).read_text(encoding="utf-8").partition("\n")
+        except (OSError, UnicodeDecodeError):
+            return None
+        if stored != validator:
+            return None  # PDF değişmiş olabilir (ya da eski biçimde kayıt)
+        sha = sha.strip()
+        return sha if len(sha) == _HEX_LEN else None
+
+    def get_by_url(self, *urls: str, validator: str = "") -> Optional[str]:
+        """
+        URL'lerden biri daha önce bir PDF'e çözüldüyse ve validator tutuyorsa metni (indirmeden).
+        Metin silinmişse None.
+        """
+        for url in urls:
+            if not url:
+                continue
+            sha = self.hash_for_url(url, validator)
+            if sha is None:
+                continue
+            path = self._text_path(sha)
+            if not path.exists():
+                continue
+            text = self.get(sha)
+            if text is not None:
+                with self._lock:
+                    self.url_hits += 1
+                return text
+        return None
+
+    # ---------- Yazma ----------
+    def link(self, urls: Iterable[str], sha: str, validator: str = "") -> None:
+        """URL'leri içerik özetine (yanıtın validator'ıyla) bağla."""
+        for url in urls:
+            if not url:
+                continue
+            path = self._url_path(url)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{path.name}.tmp{os.getpid()}.{threading.get_ident()}")
+                tmp.write_text(f"{sha}\n{validator}", encoding="utf-8")
+                os.replace(tmp, path)
+            except OSError:
+                pass
+
+    def put(self, urls: Iterable[str], sha: str, text_norm: str, validator: str = "") -> None:
+        path = self._text_path(sha)
+        data = zlib.compress(text_norm.encode("utf-8"), 6)
+        old_size = path.stat().st_size if path.exists() else 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Yarım yazılmış dosya kalmasın: önce tmp, sonra rename
+        tmp = path.with_name(f"{path.name}.tmp{os.getpid()}.{threading.get_ident()}")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self.link(urls, sha, validator)
+        with self._lock:
+            self._size += len(data) - old_size
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self) -> None:
+        """Boyut sınırının %90'ına inene kadar en eski erişilen metinleri sil (URL eşlemeleri kalır)."""
+        with self._lock:
+            entries = []
+            for path in self.root.glob(f"{_TEXT_DIR}/*/*.z"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+            entries.sort()
+            target = int(self.max_bytes * 0.9)
+            for _, size, path in entries:
+                if self._size <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                self._size -= size
+
+
+# Tüm PDF kontrolleri için ortak önbellek (None: önbellek yok)
+_cache: Optional[PdfTextCache] = None
+
+
+def set_pdf_cache(cache: Optional[PdfTextCache]) -> None:
+    global _cache
+    _cache = cache
+
+
+def get_pdf_cache() -> Optional[PdfTextCache]:
+    return _cache
@@ -0,0 +1,202 @@
+# pdf_service.py
+"""
+PDF metin çıkarma servisi.
+- Çıkarma ayrı süreçlerde yapılır (ProcessPoolExecutor, spawn); tarayıcı ve HTTP thread'leri
+  sonucu beklerken diğer çekirdekler PDF'i ayrıştırır
+- Yalnızca ilk PDF_MAX_PAGES sayfa okunur (başlık ilk sayfalardadır)
+- Her iş PDF_TIMEOUT ile sınırlı: işçi içinde SIGALRM, üst süreçte de yedek zaman aşımı
+  (işçi yine de dönmezse havuz öldürülüp yeniden kurulur)
+- pdfminer yoksa, hata verirse ya da süre dolarsa PDF_FALLBACK açıkça uygulanır ve
+  kullanılan yol PdfText.method'a yazılır
+İndirme tarafında read_capped ile en fazla PDF_MAX_BYTES okunur.
+"""
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from config import PDF_MAX_BYTES, PDF_MAX_PAGES, PDF_TIMEOUT, PDF_WORKERS, PDF_FALLBACK
+
+# İşçi içindeki alarm çalmadıysa (C kodunda takılma) üst süreç bu kadar daha bekler
+_TIMEOUT_GRACE = 5.0
+
+
+class PdfText(NamedTuple):
+    text: str
+    method: str  # "pdfminer" | "fallback-latin1" | "fallback-none"
+    error: str = ""  # pdfminer neden kullanılamadı
+    truncated: bool = False  # baytlar PDF_MAX_BYTES sınırında kesildi
+
+
+def truncation_note(max_bytes: int = PDF_MAX_BYTES) -> str:
+    return f"PDF_MAX_BYTES sınırında kesildi ({max_bytes / (1024 * 1024):g} MB)"
+
+
+def read_capped(chunks: Iterable[bytes], head: bytes = b"",
+                max_bytes: int = PDF_MAX_BYTES) -> Tuple[bytes, bool]:
+    """Parçaları en fazla max_bytes kadar birleştir. Dönüş: (bytes, kesildi_mi)."""
+    buf = bytearray(head)
+    for chunk in chunks:
+        buf.extend(chunk)
+        if max_bytes and len(buf) >= max_bytes:
+            return bytes(buf[:max_bytes]), True
+    return bytes(buf), False
+
+
+def fallback_text(pdf_bytes: bytes, error: str, fallback: str = PDF_FALLBACK) -> PdfText:
+    if fallback == "latin1":
+        return PdfText(pdf_bytes.decode("latin-1", errors="ignore"), "fallback-latin1", error)
+    return PdfText("", "fallback-none", error)
+
+
+def pdfminer_available() -> bool:
+    try:
+        import pdfminer  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _Alarm(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _Alarm()
+
+
+def extract_inline(pdf_bytes: bytes, max_pages: int = PDF_MAX_PAGES, timeout: float = 0,
+                   fallback: str = PDF_FALLBACK) -> PdfText:
+    """
+    Bu süreçte çıkar (havuz işçisi de bunu çalıştırır). timeout yalnızca ana thread'de
+    (SIGALRM) uygulanabilir; başka thread'de süre sınırı yoktur.
+    """
+    try:
+        from pdfminer.high_level import extract_text
+    except ImportError:
+        return fallback_text(pdf_bytes, "pdfminer yok", fallback)
+
+    use_alarm = (timeout > 0 and hasattr(signal, "setitimer")
+                 and threading.current_thread() is threading.main_thread())
+    if use_alarm:
+        old_handler = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return PdfText(extract_text(BytesIO(pdf_bytes), maxpages=max(0, int(max_pages))) or "", "pdfminer")
+    except _Alarm:
+        return fallback_text(pdf_bytes, f"zaman aşımı ({timeout} sn)", fallback)
+    except Exception as e:
+        return fallback_text(pdf_bytes, f"{type(e).__name__}: {e}"[:200], fallback)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, old_handler)
+
+
+def _kill_pool(pool: ProcessPoolExecutor) -> None:
+    """Takılı işçileri öldür (Python < 3.14'te public API yok)."""
+    kill = getattr(pool, "kill_workers", None)
+    if kill is not None:
+        kill()
+        return
+    for p in list((getattr(pool, "_processes", None) or {}).values()):
+        try:
+            p.kill()
+        except Exception:
+            pass
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+class PdfService:
+    def __init__(self, workers: int = PDF_WORKERS, max_pages: int = PDF_MAX_PAGES,
+                 timeout: float = PDF_TIMEOUT, fallback: str = PDF_FALLBACK):
+        self.workers = workers if workers > 0 else max(1, (os.cpu_count() or 2) - 1)
+        self.max_pages = max_pages
+        self.timeout = float(timeout)
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # İstatistik
+        self.jobs = 0
+        self.fallbacks = 0
+        self.truncated = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: Selenium/trio thread'leri olan süreçten fork etmeyelim
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _discard(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is not pool:
+                return  # başka thread zaten yeniledi
+            self._pool = None
+            self.restarts += 1
+        _kill_pool(pool)
+
+    def extract(self, pdf_bytes: bytes, truncated: bool = False) -> PdfText:
+        """
+        PDF metnini havuzda çıkar; her durumda bir PdfText döner. truncated: baytlar
+        PDF_MAX_BYTES sınırında kesildi (xref tablosu sonda olduğundan pdfminer çoğu zaman
+        okuyamaz; bu durum yedek yöntem sayacına değil truncated sayacına yazılır).
+        """
+        self.jobs += 1
+        if truncated:
+            self.truncated += 1
+        if not pdfminer_available():
+            # Havuza baytları taşımaya gerek yok
+            self.fallbacks += 1
+            return fallback_text(pdf_bytes, "pdfminer yok", self.fallback)._replace(truncated=truncated)
+        pool = self._get_pool()
+        try:
+            fut = pool.submit(extract_inline, pdf_bytes, self.max_pages, self.timeout, self.fallback)
+            result = fut.result(timeout=self.timeout + _TIMEOUT_GRACE if self.timeout > 0 else None)
+        except FutureTimeout:
+            self.timeouts += 1
+            self._discard(pool)
+            result = fallback_text(pdf_bytes, f"işçi {self.timeout} sn içinde dönmedi", self.fallback)
+        except (BrokenProcessPool, RuntimeError) as e:
+            # İşçi çöktü ya da havuz başka thread'de kapatıldı
+            self._discard(pool)
+            result = fallback_text(pdf_bytes, f"işçi hatası: {e}"[:200], self.fallback)
+        if result.method != "pdfminer" and not truncated:
+            self.fallbacks += 1
+            if result.error.startswith("zaman aşımı"):
+                self.timeouts += 1
+        return result._replace(truncated=truncated)
+
+    def stats(self) -> Dict[str, int]:
+        return {"jobs": self.jobs, "fallbacks": self.fallbacks, "truncated": self.truncated,
+                "timeouts": self.timeouts, "restarts": self.restarts}
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Süreç genelinde tek havuz
+_service: Optional[PdfService] = None
+_service_lock = threading.Lock()
+
+
+def get_pdf_service() -> PdfService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = PdfService()
+        return _service
+
+
+def extract_pdf_text(pdf_bytes: bytes, truncated: bool = False) -> PdfText:
+    return get_pdf_service().extract(pdf_bytes, truncated)
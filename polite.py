@@ -0,0 +1,110 @@
+# polite.py
+"""
+Host bazında nezaket zamanlayıcısı.
+Her host için bir token bucket (saniyede HOST_RATE istek, en fazla HOST_BURST
+birikim) ve iki istek arasında en az HOST_MIN_INTERVAL saniye uygulanır.
+Global bir time.sleep yerine yalnızca aynı host'a giden istek bekletilir;
+çağıran taraf delay() ile hazır olan başka bir host'un işini seçebilir.
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from config import HOST_MIN_INTERVAL, HOST_RATE, HOST_BURST
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url or "").hostname or "").lower()
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "next_start")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+        self.next_start = 0.0
+
+
+class HostScheduler:
+    def __init__(self, min_interval: float = HOST_MIN_INTERVAL, rate: float = HOST_RATE,
+                 burst: float = HOST_BURST):
+        self.min_interval = max(0.0, float(min_interval))
+        self.rate = max(1e-6, float(rate))
+        self.burst = max(1.0, float(burst))
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _Bucket] = {}
+        self.waited = 0.0  # toplam bekleme (istatistik)
+
+    def _bucket(self, host: str, now: float) -> _Bucket:
+        b = self._buckets.get(host)
+        if b is None:
+            b = _Bucket(self.burst, now)
+            self._buckets[host] = b
+        # token'ları yenile
+        b.tokens = min(self.burst, b.tokens + (now - b.updated) * self.rate)
+        b.updated = now
+        return b
+
+    def _wait_for(self, b: _Bucket, now: float) -> float:
+        token_wait = 0.0 if b.tokens >= 1 else (1 - b.tokens) / self.rate
+        return max(0.0, b.next_start - now, token_wait)
+
+    def delay(self, url: Optional[str]) -> float:
+        """Bu URL'in host'u için şimdi başlanırsa kaç saniye beklenir (rezervasyon yapmaz)."""
+        host = host_of(url)
+        if not host:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            return self._wait_for(self._bucket(host, now), now)
+
+    def reserve(self, url: str) -> float:
+        """Host için bir istek hakkı ayır; beklenmesi gereken süreyi döndür."""
+        host = host_of(url)
+        if not host:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            b = self._bucket(host, now)
+            wait = self._wait_for(b, now)
+            # Hak şimdiden düşülür (borç olarak); sıradaki çağıran daha uzun bekler
+            b.tokens -= 1
+            b.next_start = now + wait + self.min_interval
+            self.waited += wait
+            return wait
+
+    def acquire(self, url: str) -> None:
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str) -> None:
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pick_ready(self, urls: List[Optional[str]]) -> int:
+        """
+        Aday URL'ler içinden beklemeden (ya da en az bekleyerek) başlanabilecek
+        olanın index'i. Böylece yoğun bir host yüzünden boru hattı boş kalmaz.
+        None: ağa çıkmayan iş, her zaman hazır.
+        """
+        best, best_delay = 0, None
+        for k, url in enumerate(urls):
+            d = self.delay(url)
+            if d <= 0:
+                return k
+            if best_delay is None or d < best_delay:
+                best, best_delay = k, d
+        return best
+
+
+# Süreç genelinde tek zamanlayıcı: paralel tarayıcı thread'leri de aynı host sınırını paylaşır
+_scheduler = HostScheduler()
+
+
+def get_scheduler() -> HostScheduler:
+    return _scheduler
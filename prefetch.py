@@ -0,0 +1,160 @@
+# prefetch.py
+"""
+Dergiler arası Crossref ön indirme (boru hattı).
+Arka plandaki bir thread sıradaki dergilerin ilk Crossref sayfasını (WorksStream.open)
+indirir; tarayıcılar bir dergiyi kontrol ederken sonrakilerin Crossref gecikmesi gizlenir.
+Geri basınç: işlenmemiş (done() çağrılmamış) dergi sayısı `depth`'i ya da bellekteki
+sayfaların toplam boyutu `max_bytes`'ı aşarsa üretici bekler.
+İlk sayfa inemezse akış açılmadan verilir; process_one_issn yeniden dener ve hatayı yazar.
+batch_size > 1 ise dergiler gruplar halinde tek /works?filter=issn:... sorgusuyla çekilir
+(crossref.harvest_batch); grupta tamamlanamayan dergiler tek tek açılır.
+"""
+import itertools
+import queue
+import threading
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from config import (
+    CROSSREF_MAX_ITEMS, CROSSREF_PREFETCH_JOURNALS, CROSSREF_PREFETCH_MAX_BYTES, CROSSREF_BATCH_SIZE
+)
+from crossref import WorksStream, harvest_batch, make_stream
+
+_END = object()
+
+
+class Prefetched(NamedTuple):
+    job: Tuple[Any, ...]  # (idx, issn, dp_name[, (issn, eissn)]) — jobs'tan geldiği gibi
+    stream: WorksStream
+    size: int  # bütçeden düşülen bayt (done() ile geri verilir)
+
+
+class CrossrefPrefetcher:
+    """
+    Kullanım:
+        pf = CrossrefPrefetcher(jobs, depth=4)
+        for item in pf:                 # jobs sırası korunur
+            try:
+                process_one_issn(..., stream=item.stream)
+            finally:
+                pf.done(item)
+        pf.close()
+    """
+
+    def __init__(self, jobs: Iterable[Tuple[Any, ...]], depth: int = CROSSREF_PREFETCH_JOURNALS,
+                 max_bytes: int = CROSSREF_PREFETCH_MAX_BYTES, max_items: int = CROSSREF_MAX_ITEMS,
+                 batch_size: int = CROSSREF_BATCH_SIZE, sample: int = 0):
+        self._jobs = jobs
+        self.sample = max(0, int(sample))
+        # Örneklemede toplu sorgu kullanılmaz (her derginin tabakaları ayrı)
+        self.batch_size = max(0, int(batch_size)) if not self.sample else 0
+        self.depth = max(1, int(depth))
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_items = max_items
+        self._cond = threading.Condition()
+        self._outstanding = 0  # üretilmiş ama done() çağrılmamış dergi
+        self._bytes = 0
+        self._stop = threading.Event()
+        # Sınırı Condition uygular; kuyruk kendisi sınırsız (üretici put'ta takılmasın)
+        self._q: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.failed = 0  # ön indirmede ilk sayfası inemeyen dergi
+        self.batched = 0  # toplu sorgudan karşılanan dergi
+
+    def _has_room(self) -> bool:
+        if self._outstanding == 0:
+            return True  # tek dergi bütçeyi aşsa bile boru hattı durmasın
+        if self._outstanding >= self.depth:
+            return False
+        return not self.max_bytes or self._bytes < self.max_bytes
+
+    def _wait_room(self) -> bool:
+        """Bütçede yer açılana kadar bekle ve bir dergi ayır; durdurulduysa False."""
+        with self._cond:
+            while not self._stop.is_set() and not self._has_room():
+                self._cond.wait(0.5)
+            if self._stop.is_set():
+                return False
+            self._outstanding += 1
+            return True
+
+    def _open(self, job: Tuple[Any, ...]) -> WorksStream:
+        stream = make_stream(job[1], max_items=self.max_items, sample=self.sample)
+        try:
+            stream.open()
+        except Exception:
+            self.failed += 1
+        return stream
+
+    def _emit(self, job: Tuple[Any, ...], stream: WorksStream) -> None:
+        size = stream.approx_bytes() if stream.is_open else 0
+        with self._cond:
+            self._bytes += size
+        self._q.put(Prefetched(job, stream, size))
+
+    @staticmethod
+    def _issns_of(job: Tuple[Any, ...]) -> List[str]:
+        issns = [job[1]]
+        if len(job) > 3:
+            issns.extend(i for i in job[3] if i)
+        return issns
+
+    def _produce_batched(self) -> None:
+        jobs = iter(self._jobs)
+        while True:
+            batch = list(itertools.islice(jobs, self.batch_size))
+            if not batch:
+                return
+            try:
+                api_url, found = harvest_batch([self._issns_of(job) for job in batch],
+                                               max_items=self.max_items)
+            except Exception:
+                api_url, found = "", [None] * len(batch)
+            for job, items in zip(batch, found):
+                if not self._wait_room():
+                    return
+                if items is None:
+                    stream = self._open(job)
+                else:
+                    self.batched += 1
+                    stream = WorksStream.from_items(job[1], items, self.max_items, api_url)
+                self._emit(job, stream)
+
+    def _produce(self) -> None:
+        try:
+            if self.batch_size > 1:
+                self._produce_batched()
+                return
+            for job in self._jobs:
+                if not self._wait_room():
+                    return
+                self._emit(job, self._open(job))
+        except BaseException as e:
+            self._q.put(e)
+        finally:
+            self._q.put(_END)
+
+    def __iter__(self) -> Iterator[Prefetched]:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._produce, name="crossref-prefetch", daemon=True)
+            self._thread.start()
+        while True:
+            obj = self._q.get()
+            if obj is _END:
+                return
+            if isinstance(obj, BaseException):
+                raise obj
+            if self._stop.is_set():
+                return
+            yield obj
+
+    def done(self, item: Prefetched) -> None:
+        """Dergi işlendi; bütçeyi geri ver."""
+        with self._cond:
+            self._outstanding -= 1
+            self._bytes -= item.size
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
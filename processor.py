@@ -1,160 +1,332 @@
 # processor.py
 import json
-import time
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 from selenium import webdriver
 
-from config import CROSSREF_API_TEMPLATE, UA, POLITE_DELAY
+from config import FETCHER, ASYNC_CONCURRENCY, ASYNC_PER_HOST, CROSSREF_MAX_ITEMS
 from utils import (
-    normalize_text, append_jsonl, read_jsonl_names,
-    build_doi_url, check_url_selenium
+    normalize_title, append_jsonl, read_jsonl_names,
+    build_doi_url
 )
+from fetcher import check_url, needs_network
+from async_checker import aiohttp_available, check_many
+from crossref import WorksStream, CrossrefError, make_stream
+from run_state import RunState
+from jsonl_writer import JsonlWriter
+from polite import get_scheduler
+from titlematch import TitleMatcher
+
+PageMemo = Dict[str, Tuple[int, str, bool, str]]  # url → (status, info, is_accessible, tier)
+
+
+def prepare_item(it: Dict[str, Any]) -> Tuple[str, str, str, List[str], Dict[str, List[str]]]:
+    """Crossref kaydından (doi, title, title_norm, unique_urls, labels_for_url) üret."""
+    doi = (it.get("DOI") or "").strip()
+    title_list = it.get("title") or []
+    title = (title_list[0] if title_list else "").strip()
+    title_norm = normalize_title(title)
+
+    # Aday URL'ler
+    try:
+        resource_primary_url = (
+            ((it.get("resource") or {}).get("primary") or {}).get("URL") or ""
+        ).strip()
+    except Exception:
+        resource_primary_url = ""
+    crossref_url = (it.get("URL") or "").strip()
+    doi_url = build_doi_url(doi)
+
+    raw_candidates: List[Tuple[str, str]] = [
+        ("resource.primary.URL", resource_primary_url),
+        ("URL", crossref_url),
+        ("DOI", doi_url),
+    ]
+
+    # Dedup
+    unique_urls: List[str] = []
+    labels_for_url: Dict[str, List[str]] = {}
+    for label, url in raw_candidates:
+        if not url:
+            continue
+        if url not in labels_for_url:
+            labels_for_url[url] = [label]
+            unique_urls.append(url)
+        else:
+            labels_for_url[url].append(label)
+    return doi, title, title_norm, unique_urls, labels_for_url
+
+
+def memo_verdict(memo: PageMemo, matcher: TitleMatcher, url: str,
+                 title_norm: str) -> Optional[Tuple[int, bool, str, bool, str]]:
+    """
+    Bu sayfadaki başka bir makale için açılmış URL'den karar çıkar (sayfayı tekrar açmadan).
+    Başlık için kesin bilgi yoksa (tarama tarayıcıya devredilmişti) None.
+    """
+    hit = memo.get(url)
+    if hit is None:
+        return None
+    status, info, is_accessible, tier = hit
+    info = f"{info} (sayfa tekrar açılmadı)"
+    if status != 200 or not is_accessible:
+        return status, False, info, is_accessible, tier
+    seen = matcher.found_on(url)
+    if seen is None:
+        return None
+    if title_norm and title_norm in seen.found:
+        return status, True, info, is_accessible, tier
+    if seen.final and seen.complete:
+        return status, False, info, is_accessible, tier
+    return None
+
 
 def process_one_issn(
     driver: webdriver.Chrome,
     issn: str,
     summary_path: Path,
     detail_path: Path,
-    dp_journal_name: str = None
-) -> None:
-    """Bir ISSN için Crossref -> Selenium doğrulama -> summary/detail JSONL yaz."""
-    api_url = CROSSREF_API_TEMPLATE.format(issn=issn)
+    dp_journal_name: str = None,
+    fetcher: str = FETCHER,
+    http_concurrency: int = ASYNC_CONCURRENCY,
+    max_items: int = CROSSREF_MAX_ITEMS,
+    state: Optional[RunState] = None,
+    writer: Optional[JsonlWriter] = None,
+    resume: bool = False,
+    stream: Optional[WorksStream] = None,
+    sample: int = 0
+) -> bool:
+    """
+    Bir ISSN için Crossref -> link doğrulama -> summary/detail JSONL yaz.
+    driver: webdriver ya da ManagedBrowser (yeniden başlatma/ölü oturum kurtarma ile).
+    fetcher: "tiered" (önce HTTP, gerekirse Selenium) ya da "selenium".
+    http_concurrency > 0 ise (tiered) sayfadaki tüm makalelerin HTTP katmanı önce paralel
+    çalışır; yalnızca belirsiz kalan URL'ler sırayla tarayıcıya gider.
+    max_items: dergi başına en fazla kaç makale (0: hepsi). Kayıtlar cursor ile sayfa sayfa
+    akar; ilk sayfa kontrol edilirken sonrakiler arka planda iner.
+    state: koşu durumu deposu; verilirse "zaten işlendi mi?" buradan sorulur ve dergi
+    bitince transaction ile işaretlenir (yoksa summary.jsonl taranır).
+    writer: paylaşılan JSONL yazıcı; verilmezse her satır doğrudan dosyaya eklenir.
+    resume: state'te bu ISSN için checkpoint varsa kontrol edilmiş makaleler atlanır,
+    sayaçlar checkpoint'ten alınır ve özet yine tüm dergi için yazılır.
+    Nezaket beklemesi host bazındadır (polite.py); detail satırları makaleler
+    bittikçe yazılır, bu yüzden idx sırası karışık olabilir.
+    stream: ilk sayfası önceden indirilmiş (open() çağrılmış) akış (bkz. prefetch.py);
+    verilmezse burada açılır.
+    sample > 0: dergiden yıl tabakalı N makalelik rastgele örnek (SampledWorksStream);
+    tabakalar özet satırına "strata" olarak yazılır.
+    Dönüş: dergi bitti (özet yazıldı ya da zaten vardı) ise True, Crossref hatası ile
+    yarıda kaldıysa False (iş kuyruğu tekrar dener).
+    """
+    emit = writer.write if writer is not None else append_jsonl
+
+    if stream is None:
+        stream = make_stream(issn, max_items=max_items, sample=sample)
+    api_url = stream.api_url
     try:
-        r = requests.get(api_url, headers={"User-Agent": UA}, timeout=10)
-        r.raise_for_status()
-    except requests.RequestException as e:
+        if not stream.is_open:
+            stream.open()
+    except (requests.RequestException, ValueError) as e:
         msg = f"[ERR] Crossref API hatası: {e}"
         print(msg)
-        append_jsonl(detail_path, {
+        emit(detail_path, {
             "level": "ERROR", "issn": issn, "msg": msg,
             "api_url": api_url, "dp_journal_name": dp_journal_name
         })
-        return
-
-    data = r.json()
-    items = (data.get("message") or {}).get("items") or []
-    total = len(items)
-
-    # Crossref'ten dergi adı
-    journal_name = "Unknown Journal"
-    if items:
-        it0 = items[0]
-        ct = it0.get("container-title") or []
-        if ct and isinstance(ct, list) and ct[0]:
-            journal_name = (ct[0] or "").strip()
-        elif (it0.get("publisher") or "").strip():
-            journal_name = (it0.get("publisher") or "").strip()
+        return False
+
+    total = stream.total
+    journal_name = stream.journal_name
 
     # (İstersen bu kontrolü kaldırabilirsin; hızlı skip artık main'de yapılabilir)
-    existing_names = read_jsonl_names(summary_path)
-    if journal_name.strip().lower() in existing_names:
+    if state is not None:
+        already_done = state.is_done(issn) or state.has_name(journal_name)
+    else:
+        already_done = journal_name.strip().lower() in read_jsonl_names(summary_path)
+    if already_done:
         info = f"[INFO] summary.jsonl içinde '{journal_name}' zaten var; atlandı."
         print(info)
-        append_jsonl(detail_path, {
+        emit(detail_path, {
             "level": "INFO", "event": "skip-existing",
             "issn": issn, "journal_name": journal_name,
             "dp_journal_name": dp_journal_name, "msg": info
         })
-        return
+        return True
 
     accessible_cnt = 0
     correct_cnt = 0
 
-    append_jsonl(detail_path, {
+    # Makale düzeyi checkpoint: yarıda kalmış dergide kontrol edilmişleri tekrar açma
+    checked = state.checked_items(issn) if (state is not None and resume) else {}
+    if state is not None:
+        state.begin_journal(issn, journal_name, total, resume=resume)
+    if checked:
+        print(f"[RESUME] {journal_name} | ISSN={issn} | {len(checked)} makale checkpoint'ten alınacak")
+
+    emit(detail_path, {
         "level": "INFO", "event": "start",
         "issn": issn, "journal_name": journal_name,
         "dp_journal_name": dp_journal_name, "api_url": api_url,
-        "total": total
+        "total": total, "resumed": len(checked)
     })
 
-    for i, it in enumerate(items, 1):
-        doi = (it.get("DOI") or "").strip()
-        title_list = it.get("title") or []
-        title = (title_list[0] if title_list else "").strip()
-        title_norm = normalize_text(title)
-
-        # Aday URL'ler
-        try:
-            resource_primary_url = (
-                ((it.get("resource") or {}).get("primary") or {}).get("URL") or ""
-            ).strip()
-        except Exception:
-            resource_primary_url = ""
-        crossref_url = (it.get("URL") or "").strip()
-        doi_url = build_doi_url(doi)
-
-        raw_candidates: List[Tuple[str, str]] = [
-            ("resource.primary.URL", resource_primary_url),
-            ("URL", crossref_url),
-            ("DOI", doi_url),
-        ]
-
-        # Dedup
-        unique_urls: List[str] = []
-        labels_for_url: Dict[str, List[str]] = {}
-        for label, url in raw_candidates:
-            if not url:
-                continue
-            if url not in labels_for_url:
-                labels_for_url[url] = [label]
-                unique_urls.append(url)
-            else:
-                labels_for_url[url].append(label)
-
-        passed = False
-        this_item_accessible = False
-        trials: List[Dict[str, Any]] = []
-
-        for url in unique_urls:
-            primary_label = labels_for_url[url][0]
-            aliases = labels_for_url[url][1:]
-            status, has_title, info, is_accessible = check_url_selenium(driver, url, title_norm)
-            trials.append({
-                "label": primary_label,
-                "aliases": aliases,
-                "url": url,
-                "status": status,
-                "has_title": has_title,
-                "is_accessible": is_accessible,
-                "info": info
-            })
-            if is_accessible:
-                this_item_accessible = True
-            if status == 200 and has_title:
-                passed = True
-                break
-            time.sleep(POLITE_DELAY)
-
-        if this_item_accessible:
-            accessible_cnt += 1
-        if passed:
-            correct_cnt += 1
-
-        append_jsonl(detail_path, {
-            "journal_name": journal_name,
-            "dp_journal_name": dp_journal_name,
-            "issn": issn,
-            "idx": i,
-            "total": total,
-            "doi": doi,
-            "title": title,
-            "passed": passed,
-            "accessible": this_item_accessible,
-            "trials": trials
+    # Makale checkpoint'i, detail.jsonl satırı diske indikten sonra yazılır: çökmede
+    # "kontrol edildi" görünüp detail satırı kaybolmuş makale kalmasın
+    pending_items: List[Tuple[str, int, bool, bool]] = []
+
+    def commit_items() -> None:
+        if state is None or not pending_items:
+            return
+        if writer is not None:
+            writer.sync()
+        state.record_items(issn, pending_items)
+        pending_items.clear()
+
+    scheduler = get_scheduler()
+    i = 0
+    try:
+        for page in stream.pages():
+            prepared = [prepare_item(it) for it in page]
+            todo = [k for k, p in enumerate(prepared)
+                    if RunState.item_key(p[0], i + k + 1) not in checked]
+            # Aynı sayfayı (sayı PDF'i, dergi sayfası) açan her kontrol tüm başlıkları tarar
+            matcher = TitleMatcher(prepared[k][2] for k in todo)
+            page_memo: PageMemo = {}
+
+            # HTTP katmanı: makaleler paralel, her makalenin adayları kendi içinde sıralı
+            http_verdicts = None
+            if fetcher == "tiered" and http_concurrency > 0 and todo:
+                if aiohttp_available():
+                    results = check_many(
+                        [(prepared[k][3], prepared[k][2]) for k in todo],
+                        concurrency=http_concurrency, per_host=ASYNC_PER_HOST, matcher=matcher,
+                    )
+                    http_verdicts = dict(zip(todo, results))
+                else:
+                    print("[WARN] aiohttp yok; HTTP katmanı sıralı çalışacak (pip install aiohttp)")
+
+            # Makaleler host'lar arasında serpiştirilir: sıradaki URL'in host'u beklemedeyse
+            # başka bir makalenin hazır URL'ine geçilir (global sleep yok)
+            tasks = deque()
+            for k, (doi, title, title_norm, unique_urls, labels_for_url) in enumerate(prepared):
+                i += 1
+                item_key = RunState.item_key(doi, i)
+                if item_key in checked:
+                    was_passed, was_accessible = checked[item_key]
+                    accessible_cnt += int(was_accessible)
+                    correct_cnt += int(was_passed)
+                    continue
+                tasks.append({
+                    "idx": i, "doi": doi, "title": title, "title_norm": title_norm,
+                    "urls": unique_urls, "labels": labels_for_url, "pos": 0,
+                    "verdicts": http_verdicts[k] if http_verdicts is not None else {},
+                    "passed": False, "accessible": False, "trials": []
+                })
+
+            while tasks:
+                # Ağa çıkmayacak (HTTP kararı hazır) adımlar None: hemen hazır sayılır
+                next_urls = []
+                for t in tasks:
+                    url = t["urls"][t["pos"]] if t["pos"] < len(t["urls"]) else None
+                    if url is not None and (not needs_network(url, fetcher, t["verdicts"].get(url))
+                                            or memo_verdict(page_memo, matcher, url, t["title_norm"])):
+                        url = None
+                    next_urls.append(url)
+                pick = scheduler.pick_ready(next_urls)
+                task = tasks[pick]
+                del tasks[pick]
+
+                if task["pos"] < len(task["urls"]):
+                    url = task["urls"][task["pos"]]
+                    task["pos"] += 1
+                    prefetched = task["verdicts"].get(url)
+                    memo = None
+                    if needs_network(url, fetcher, prefetched):
+                        memo = memo_verdict(page_memo, matcher, url, task["title_norm"])
+                    if memo is not None:
+                        status, has_title, info, is_accessible, tier = memo
+                    else:
+                        status, has_title, info, is_accessible, tier = check_url(
+                            driver, url, task["title_norm"], fetcher,
+                            prefetched=prefetched, matcher=matcher
+                        )
+                        page_memo[url] = (status, info, is_accessible, tier)
+                    task["trials"].append({
+                        "label": task["labels"][url][0],
+                        "aliases": task["labels"][url][1:],
+                        "url": url,
+                        "status": status,
+                        "has_title": has_title,
+                        "is_accessible": is_accessible,
+                        "info": info,
+                        "tier": tier
+                    })
+                    if is_accessible:
+                        task["accessible"] = True
+                    if status == 200 and has_title:
+                        task["passed"] = True
+                    if not task["passed"] and task["pos"] < len(task["urls"]):
+                        tasks.append(task)
+                        continue
+
+                # Makale bitti (geçti ya da aday kalmadı)
+                if task["accessible"]:
+                    accessible_cnt += 1
+                if task["passed"]:
+                    correct_cnt += 1
+
+                emit(detail_path, {
+                    "journal_name": journal_name,
+                    "dp_journal_name": dp_journal_name,
+                    "issn": issn,
+                    "idx": task["idx"],
+                    "total": total,
+                    "doi": task["doi"],
+                    "title": task["title"],
+                    "passed": task["passed"],
+                    "accessible": task["accessible"],
+                    "trials": task["trials"]
+                })
+                if state is not None:
+                    pending_items.append((task["doi"], task["idx"], task["passed"], task["accessible"]))
+            # Crossref sayfası bitti: bu sayfanın checkpoint'leri
+            commit_items()
+    except CrossrefError as e:
+        # Akış ortasında sayfa alınamadı: yarım dergi için özet yazma
+        msg = f"[ERR] Crossref sayfa hatası ({i}/{total} kontrol edildi): {e}"
+        print(msg)
+        emit(detail_path, {
+            "level": "ERROR", "event": "crossref-page-error", "issn": issn,
+            "journal_name": journal_name, "dp_journal_name": dp_journal_name,
+            "checked": i, "total": total, "msg": msg
         })
+        return False
+    finally:
+        # Hata/sinyal ile çıkışta da yazılmış satırların checkpoint'i kaybolmasın
+        commit_items()
 
     # Özet satırı
-    append_jsonl(summary_path, {
+    summary_row = {
         "journal_name": journal_name,
         "dp_journal_name": dp_journal_name,
         "issn": issn,
-        "total": total,
+        "total": i,
         "accessible": accessible_cnt,
         "correct": correct_cnt,
-        "fetcher": "selenium"
-    })
+        "fetcher": fetcher
+    }
+    if stream.strata is not None:
+        summary_row["sample"] = stream.total
+        summary_row["population"] = stream.population
+        summary_row["strata"] = stream.strata
+    emit(summary_path, summary_row)
+    if writer is not None:
+        # Dergi sınırı: satırlar diske inmeden dergi "bitti" işaretlenmesin
+        writer.sync()
+    if state is not None:
+        state.mark_done(summary_row)
 
-    print(f"[DONE] {journal_name} | ISSN={issn} | total={total} | accessible={accessible_cnt} | correct={correct_cnt}")
+    print(f"[DONE] {journal_name} | ISSN={issn} | total={i} | accessible={accessible_cnt} | correct={correct_cnt}")
+    return True
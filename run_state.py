@@ -0,0 +1,268 @@
+# run_state.py
+"""
+Koşu durumu (hangi dergiler bitti) için SQLite deposu.
+summary.jsonl'yi her ISSN'de baştan okumak yerine normalize ISSN (ve
+normalize dergi adı) üzerinden O(1) "işlendi mi?" sorgusu yapılır.
+"""
+import argparse
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, Tuple
+
+from config import RUN_STATE_DB
+
+_ISSN_RE = re.compile(r"[^0-9X]")
+_NAME_PUNCT_RE = re.compile(r"[^\w\s]")
+_WS_RE = re.compile(r"\s+")
+# Türkçe i/ı/İ/I hepsi 'i'ye; ASCII'leştirilmiş adlarla eşleşsin
+_TR_FOLD = str.maketrans({"İ": "i", "I": "i", "ı": "i"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS journals (
+    issn            TEXT PRIMARY KEY,
+    journal_name    TEXT,
+    dp_journal_name TEXT,
+    total           INTEGER,
+    accessible      INTEGER,
+    correct         INTEGER,
+    fetcher         TEXT,
+    completed_at    REAL
+);
+CREATE TABLE IF NOT EXISTS names (
+    name_key TEXT PRIMARY KEY,
+    issn     TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS inflight (
+    issn         TEXT PRIMARY KEY,
+    journal_name TEXT,
+    total        INTEGER,
+    started_at   REAL
+);
+CREATE TABLE IF NOT EXISTS items (
+    issn       TEXT,
+    item_key   TEXT,
+    idx        INTEGER,
+    passed     INTEGER,
+    accessible INTEGER,
+    checked_at REAL,
+    PRIMARY KEY (issn, item_key)
+);
+"""
+
+
+def normalize_issn(issn: str) -> str:
+    """'1303-2518', '13032518', ' 1011-727x ' → 'XXXX-XXXX'; geçersizse ''."""
+    s = _ISSN_RE.sub("", (issn or "").upper())
+    return f"{s[:4]}-{s[4:]}" if len(s) == 8 else ""
+
+
+def normalize_name(name: str) -> str:
+    """Aksan/Türkçe harf farklarını yok say: 'Çalışmaları' == 'Calismalari'."""
+    s = (name or "").translate(_TR_FOLD).lower()
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = _NAME_PUNCT_RE.sub(" ", s)
+    return _WS_RE.sub(" ", s).strip()
+
+
+class RunState:
+    def __init__(self, path: str = RUN_STATE_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Paralel tarayıcı thread'leri ve shard süreçleri aynı dosyayı kullanabilir
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------- Sorgular ----------
+    def is_done(self, *issns: str) -> bool:
+        keys = [k for k in (normalize_issn(i) for i in issns) if k]
+        if not keys:
+            return False
+        q = f"SELECT 1 FROM journals WHERE issn IN ({','.join('?' * len(keys))}) LIMIT 1"
+        with self._lock:
+            return self._conn.execute(q, keys).fetchone() is not None
+
+    def has_name(self, *names: str) -> bool:
+        keys = [k for k in (normalize_name(n) for n in names) if k]
+        if not keys:
+            return False
+        q = f"SELECT 1 FROM names WHERE name_key IN ({','.join('?' * len(keys))}) LIMIT 1"
+        with self._lock:
+            return self._conn.execute(q, keys).fetchone() is not None
+
+    # ---------- Güncelleme ----------
+    def _insert_row(self, row: Dict[str, Any]) -> bool:
+        issn = normalize_issn(row.get("issn") or "")
+        if not issn:
+            return False
+        self._conn.execute(
+            "INSERT OR REPLACE INTO journals VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (issn, row.get("journal_name"), row.get("dp_journal_name"),
+             row.get("total"), row.get("accessible"), row.get("correct"),
+             row.get("fetcher"), row.get("completed_at") or time.time()),
+        )
+        for name in (row.get("journal_name"), row.get("dp_journal_name")):
+            key = normalize_name(name or "")
+            if key:
+                self._conn.execute("INSERT OR REPLACE INTO names VALUES (?, ?)", (key, issn))
+        return True
+
+    def mark_done(self, row: Dict[str, Any]) -> None:
+        """summary satırını tek transaction içinde kaydet; dergiye ait checkpoint'leri sil."""
+        issn = normalize_issn(row.get("issn") or "")
+        with self._lock, self._conn:
+            self._insert_row(row)
+            self._conn.execute("DELETE FROM inflight WHERE issn = ?", (issn,))
+            self._conn.execute("DELETE FROM items WHERE issn = ?", (issn,))
+
+    # ---------- Makale düzeyi checkpoint ----------
+    @staticmethod
+    def item_key(doi: str, idx: int) -> str:
+        return (doi or "").strip().lower() or f"#{idx}"
+
+    def begin_journal(self, issn: str, journal_name: str, total: int, resume: bool) -> None:
+        """Dergiyi 'yarıda' olarak işaretle. resume=False ise eski checkpoint'ler silinir."""
+        key = normalize_issn(issn)
+        with self._lock, self._conn:
+            if not resume:
+                self._conn.execute("DELETE FROM items WHERE issn = ?", (key,))
+            self._conn.execute("INSERT OR REPLACE INTO inflight VALUES (?, ?, ?, ?)",
+                               (key, journal_name, total, time.time()))
+
+    def record_item(self, issn: str, doi: str, idx: int, passed: bool, accessible: bool) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_issn(issn), self.item_key(doi, idx), idx,
+                 int(bool(passed)), int(bool(accessible)), time.time()),
+            )
+
+    def record_items(self, issn: str, items: Iterable[Tuple[str, int, bool, bool]]) -> None:
+        """record_item'in toplu hali (tek transaction): items = [(doi, idx, passed, accessible), ...]"""
+        now = time.time()
+        rows = [(normalize_issn(issn), self.item_key(doi, idx), idx, int(bool(passed)), int(bool(accessible)), now)
+                for doi, idx, passed, accessible in items]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def checked_items(self, issn: str) -> Dict[str, Tuple[bool, bool]]:
+        """Yarıda kalmış dergide kontrol edilmiş makaleler: {item_key: (passed, accessible)}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_key, passed, accessible FROM items WHERE issn = ?",
+                (normalize_issn(issn),),
+            ).fetchall()
+        return {k: (bool(p), bool(a)) for k, p, a in rows}
+
+    def import_detail_jsonl(self, detail_path: Path) -> int:
+        """
+        Bu özellikten önceki koşular için: detail.jsonl'deki makale satırlarından
+        henüz bitmemiş dergilerin checkpoint'lerini oluştur. Bitmiş dergiler atlanır.
+        """
+        detail_path = Path(detail_path)
+        if not detail_path.exists():
+            return 0
+        meta_key = f"imported-detail:{detail_path.resolve()}"
+        with self._lock:
+            r = self._conn.execute("SELECT value FROM meta WHERE key = ?", (meta_key,)).fetchone()
+            done = {row[0] for row in self._conn.execute("SELECT issn FROM journals")}
+        offset = int(r[0]) if r else 0
+        if offset > detail_path.stat().st_size:
+            offset = 0
+
+        count = 0
+        with detail_path.open("rb") as f, self._lock, self._conn:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                offset += len(raw)
+                # Hızlı ön eleme: makale satırlarında "passed" alanı var
+                if b'"passed"' not in raw:
+                    continue
+                try:
+                    obj = json.loads(raw.decode("utf-8", errors="replace"))
+                except json.JSONDecodeError:
+                    continue
+                issn = normalize_issn(obj.get("issn") or "")
+                if not issn or issn in done or "idx" not in obj:
+                    continue
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)",
+                    (issn, self.item_key(obj.get("doi"), obj["idx"]), obj["idx"],
+                     int(bool(obj.get("passed"))), int(bool(obj.get("accessible"))), time.time()),
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO inflight VALUES (?, ?, ?, ?)",
+                    (issn, obj.get("journal_name"), obj.get("total"), time.time()),
+                )
+                count += 1
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (meta_key, str(offset)))
+        return count
+
+    def import_summary_jsonl(self, summary_path: Path) -> int:
+        """
+        summary.jsonl'yi içe aktar. Dosyada en son nereye kadar okunduğu meta
+        tablosunda tutulur; sonraki çağrılar yalnızca yeni eklenen satırları okur.
+        """
+        summary_path = Path(summary_path)
+        if not summary_path.exists():
+            return 0
+        meta_key = f"imported:{summary_path.resolve()}"
+        with self._lock:
+            r = self._conn.execute("SELECT value FROM meta WHERE key = ?", (meta_key,)).fetchone()
+        offset = int(r[0]) if r else 0
+        size = summary_path.stat().st_size
+        if offset > size:  # dosya kısalmış/yenilenmiş
+            offset = 0
+
+        count = 0
+        with summary_path.open("rb") as f, self._lock, self._conn:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # yarım satır: bir sonraki içe aktarmada okunur
+                offset += len(raw)
+                line = raw.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                try:
+                    obj = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if self._insert_row(obj):
+                    count += 1
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (meta_key, str(offset)))
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="summary.jsonl → run_state.sqlite içe aktarma")
+    parser.add_argument("--db", default=RUN_STATE_DB, help="SQLite dosyası")
+    parser.add_argument("--summary", default="summary.jsonl", help="İçe aktarılacak özet JSONL")
+    args = parser.parse_args()
+
+    state = RunState(args.db)
+    n = state.import_summary_jsonl(Path(args.summary))
+    print(f"[OK] {n} dergi içe aktarıldı → {args.db}")
+    state.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# shard.py
+"""
+Dergileri ISSN özetine göre deterministik olarak N parçaya bölme.
+- shard_of: aynı ISSN her makinede/süreçte aynı parçaya düşer (koordinasyon gerekmez)
+- her parça kendi çıktısını yazar: summary.part-3-of-8.jsonl, detail.part-3-of-8.jsonl
+- merge_parts: parçaları asıl summary.jsonl / detail.jsonl'e ekler ve parçaları siler
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from run_state import normalize_issn, normalize_name
+
+_PART_RE = re.compile(r"\.part-(\d+)-of-(\d+)$")
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """'3/8' → (3, 8). Parça numarası 1'den başlar (1/8 ... 8/8)."""
+    try:
+        i, n = (int(x) for x in (spec or "").split("/", 1))
+    except ValueError:
+        raise ValueError(f"--shard i/n biçiminde olmalı: {spec!r}")
+    if n < 1 or not (1 <= i <= n):
+        raise ValueError(f"--shard için 1 <= i <= n olmalı: {spec!r}")
+    return i, n
+
+
+def journal_key(j: Dict[str, Any]) -> str:
+    """Parçalama anahtarı: ISSN, yoksa eISSN, o da yoksa normalize ad."""
+    for field in ("issn", "eissn"):
+        key = normalize_issn(j.get(field) or "")
+        if key:
+            return key
+    return normalize_name(j.get("journal_name") or "")
+
+
+def shard_of(key: str, n: int) -> int:
+    """Anahtarın parçası (1..n). Python hash()'i süreçten sürece değiştiği için SHA-1."""
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % n + 1
+
+
+def part_path(path: Path, i: int, n: int) -> Path:
+    """summary.jsonl → summary.part-3-of-8.jsonl"""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.part-{i}-of-{n}{path.suffix}")
+
+
+def find_parts(path: Path) -> List[Path]:
+    """path'e ait parça dosyaları, parça numarasına göre sıralı."""
+    path = Path(path)
+    parts = []
+    for p in path.parent.glob(f"{path.stem}.part-*-of-*{path.suffix}"):
+        m = _PART_RE.search(p.name[: -len(path.suffix)] if path.suffix else p.name)
+        if m:
+            parts.append((int(m.group(2)), int(m.group(1)), p))
+    return [p for _, _, p in sorted(parts)]
+
+
+def _complete_lines(p: Path):
+    """Yarım kalmış (\\n ile bitmeyen) son satırı atla."""
+    with p.open("rb") as f:
+        for raw in f:
+            if raw.endswith(b"\n"):
+                yield raw
+
+
+def merge_parts(path: Path, dedupe_issn: bool = False) -> int:
+    """
+    Parçaları asıl dosyanın sonuna ekle, fsync yap, parçaları sil. Eklenen satır sayısını döndür.
+    dedupe_issn: summary için; asıl dosyada (ya da önceki parçada) olan ISSN tekrar yazılmaz.
+    """
+    path = Path(path)
+    parts = find_parts(path)
+    if not parts:
+        return 0
+
+    seen = set()
+    if dedupe_issn and path.exists():
+        for raw in _complete_lines(path):
+            try:
+                seen.add(normalize_issn(json.loads(raw).get("issn") or ""))
+            except (ValueError, AttributeError):
+                continue
+
+    added = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("ab") as out:
+        for p in parts:
+            for raw in _complete_lines(p):
+                if dedupe_issn:
+                    try:
+                        key = normalize_issn(json.loads(raw).get("issn") or "")
+                    except (ValueError, AttributeError):
+                        continue
+                    if key and key in seen:
+                        continue
+                    seen.add(key)
+                out.write(raw)
+                added += 1
+        out.flush()
+        os.fsync(out.fileno())
+    # Ancak asıl dosya diske indikten sonra parçaları sil (yarıda kesilirse tekrar birleştirilebilir)
+    for p in parts:
+        p.unlink()
+    return added
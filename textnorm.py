@@ -0,0 +1,140 @@
+# textnorm.py
+"""
+Başlık ve sayfa metni normalizasyonu (tüm karşılaştırmalar bu kuralla yapılır).
+- HTML varlıkları çözülür (&amp;, &#8217; ...), NFKD uygulanır (ligatür, tam genişlik, NBSP)
+  ve birleşik işaretler silinir: aksanlar atılır (ç→c, ş→s, ğ→g, é→e ...)
+- Türkçe büyük/küçük harf: İ/I/ı hepsi "i" (str.lower() "İ"yi "i̇" yapar)
+- Tipografik tırnak/tire düz karşılığına iner, yumuşak tire ve sıfır genişlikli karakterler silinir
+- Harf/rakam arasındaki tire ve ardından gelen boşluk/satır sonu silinir: PDF'teki
+  "algo-\\nrithm" ile "algorithm", "self-esteem" ile "self- esteem" aynı olur
+- Boşluklar tek boşluğa iner, küçük harfe çevrilir
+Tablolar ve regex'ler modül yüklenirken bir kez kurulur; saf ASCII metinde (sayfaların
+çoğu) NFKD ve tablo adımı atlanır. Aynı kural JS_NORMALIZE ile tarayıcıda da uygulanır.
+İsteğe bağlı token benzerliği: tam eşleşme yoksa başlık kelimelerinin en az `threshold`
+oranı sayfada geçiyorsa başlık bulunmuş sayılır (TITLE_SIMILARITY, 0 = kapalı).
+"""
+import html
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from typing import AbstractSet, Dict, FrozenSet, Optional
+
+from config import TITLE_SIMILARITY, TITLE_SIMILARITY_MIN_TOKENS, TITLE_NORM_CACHE
+
+
+# Kural değişince artırılır: normalize metin saklayan önbellekler (pdf_cache) eskisini okumasın
+NORM_VERSION = 2
+
+
+def _build_fold() -> Dict[str, str]:
+    # NFKD ile ayrışmayan harfler ve tipografik işaretler (ayrışanlar için tablo gerekmez:
+    # NFKD + birleşik işaret silme "İ"→"I", "ç"→"c", "ﬁ"→"fi" yapar)
+    fold = {"ı": "i", "ł": "l", "Ł": "l", "ø": "o", "Ø": "o", "đ": "d", "Đ": "d",
+            "ß": "ss", "æ": "ae", "Æ": "ae", "œ": "oe", "Œ": "oe"}
+    for c in "‘’‚‛′":
+        fold[c] = "'"
+    for c in "“”„‟«»":
+        fold[c] = '"'
+    for c in "‐‑‒–—―−":
+        fold[c] = "-"
+    for c in "\u00ad\u200b\u200c\u200d\u2060\ufeff":
+        fold[c] = ""
+    return fold
+
+
+_FOLD_MAP = _build_fold()
+# Metinde geçmeyen karakter için replace'e hiç girilmez; sayfa başına birkaç C taraması
+# str.translate'in karakter başına sözlük aramasından belirgin hızlı
+_FOLD_ITEMS = tuple(_FOLD_MAP.items())
+_COMBINING_RE = re.compile("[\u0300-\u036f]+")
+# Literal '-' ile başlar (regex motoru tireye atlar), sonra geriye/ileriye bakar
+_HYPHEN_RE = re.compile(r"-(?<=\w-)\s*(?=\w)")
+_WS_RE = re.compile(r"\s+")
+# Satır içi JATS/HTML etiketleri metni bölmez ("CO<sub>2</sub>" → "CO2"); diğerleri boşluk olur.
+# htmltext sayfa tarafında aynı listeyi kullanır.
+INLINE_TAGS = ("i", "b", "u", "em", "strong", "sub", "sup", "sc", "scp",
+               "italic", "bold", "underline", "small", "span")
+_INLINE_TAG_RE = re.compile(r"</?(?:[\w-]+:)?(?:%s)\b[^>]*>" % "|".join(INLINE_TAGS), re.I)
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"\w+")
+
+# Tarayıcıda aynı kural (utils._IN_PAGE_CHECK_JS bunu kullanır)
+JS_NORMALIZE = """
+var FOLD = %s;
+var FOLD_RE = new RegExp("[%s]", "g");
+function normalizeText(s) {
+    s = (s || "").normalize("NFKD").replace(/[\\u0300-\\u036f]+/g, "");
+    s = s.replace(FOLD_RE, function (c) { return FOLD[c]; });
+    s = s.replace(/([\\p{L}\\p{N}_])-\\s*(?=[\\p{L}\\p{N}_])/gu, "$1");
+    return s.replace(/\\s+/g, " ").trim().toLowerCase();
+}
+function textTokens(s) {
+    return s.match(/[\\p{L}\\p{N}_]+/gu) || [];
+}
+""" % (json.dumps(_FOLD_MAP, ensure_ascii=True),
+       "".join("\\\\u%04x" % ord(c) for c in _FOLD_MAP))
+
+
+def normalize_text(s: str) -> str:
+    if not s:
+        return ""
+    if "&" in s:
+        s = html.unescape(s)
+    if not s.isascii():
+        s = _COMBINING_RE.sub("", unicodedata.normalize("NFKD", s))
+        for c, r in _FOLD_ITEMS:
+            if c in s:
+                s = s.replace(c, r)
+    if "-" in s:
+        s = _HYPHEN_RE.sub("", s)
+    return _WS_RE.sub(" ", s).strip().lower()
+
+
+def strip_inline_tags(markup: str) -> str:
+    return _INLINE_TAG_RE.sub("", markup)
+
+
+@lru_cache(maxsize=TITLE_NORM_CACHE)
+def normalize_title(title: str) -> str:
+    """Crossref başlığı (JATS etiketleri <i>, <sub> ... atılır); sonuçlar önbelleklenir."""
+    if title and "<" in title:
+        title = _TAG_RE.sub(" ", strip_inline_tags(title))
+    return normalize_text(title)
+
+
+# ---------- Token benzerliği ----------
+_similarity = TITLE_SIMILARITY
+
+
+def set_similarity(threshold: float) -> None:
+    global _similarity
+    _similarity = min(1.0, max(0.0, float(threshold)))
+
+
+def get_similarity() -> float:
+    return _similarity
+
+
+@lru_cache(maxsize=TITLE_NORM_CACHE)
+def title_tokens(title_norm: str) -> FrozenSet[str]:
+    return frozenset(_TOKEN_RE.findall(title_norm))
+
+
+def text_tokens(text_norm: str) -> FrozenSet[str]:
+    return frozenset(_TOKEN_RE.findall(text_norm or ""))
+
+
+def similar_in(title_norm: str, page_tokens: AbstractSet[str],
+               threshold: Optional[float] = None) -> bool:
+    """
+    Başlık kelimelerinin en az threshold oranı sayfada geçiyor mu? Kısa başlıklarda
+    (TITLE_SIMILARITY_MIN_TOKENS'tan az kelime) yanlış pozitif riski yüzünden hep False.
+    """
+    threshold = _similarity if threshold is None else threshold
+    if threshold <= 0 or not title_norm:
+        return False
+    words = title_tokens(title_norm)
+    if len(words) < TITLE_SIMILARITY_MIN_TOKENS:
+        return False
+    return len(words & page_tokens) >= threshold * len(words)
@@ -0,0 +1,135 @@
+# titlematch.py
+"""
+Bir sayfa metninde birden çok makale başlığını tek seferde arama.
+- TitleMatcher bir dergi sayfasındaki (Crossref sayfası) tüm normalize başlıklarla kurulur
+- find(text): metinde geçen tüm başlıklar; pyahocorasick kuruluysa Aho-Corasick otomatı ile
+  tek geçiş (maliyet başlık sayısından bağımsız)
+- Otomat yoksa scan yalnızca sorulan başlığa bakar (her sayfa için başlık sayısı kadar tarama
+  yapılmasın); kayıt eksik (complete=False) işaretlenir, yalnızca bulunan başlıklar kullanılır
+- textnorm benzerlik eşiği açıksa (TITLE_SIMILARITY) tam geçmeyen başlıklar sayfanın kelime
+  kümesine karşı bir kez daha denenir (kelime kümesi sayfa başına bir kez çıkarılır)
+- scan/record: URL başına bulunan başlıklar saklanır; processor aynı URL'e giden diğer
+  makaleleri sayfayı tekrar açmadan buradan değerlendirir (found_on)
+"""
+import threading
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Set
+
+from textnorm import get_similarity, similar_in, text_tokens
+
+
+def ahocorasick_available() -> bool:
+    try:
+        import ahocorasick  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class PageTitles(NamedTuple):
+    found: FrozenSet[str]  # sayfada geçen başlıklar (normalize)
+    final: bool  # tarama son katmanda mı yapıldı (False: başlık yoksa tarayıcıda tekrar bakılabilir)
+    complete: bool = True  # tüm başlıklar arandı mı (False: olmayan başlık için kesin bilgi yok)
+
+
+class TitleMatcher:
+    def __init__(self, titles: Iterable[str]):
+        # Aynı başlık birden çok makalede olabilir; boş başlık aranmaz
+        self.titles: List[str] = sorted({t for t in titles if t})
+        self._title_set = frozenset(self.titles)
+        self._automaton = None
+        if self.titles and ahocorasick_available():
+            import ahocorasick
+            automaton = ahocorasick.Automaton()
+            for k, t in enumerate(self.titles):
+                automaton.add_word(t, k)
+            automaton.make_automaton()
+            self._automaton = automaton
+        self._lock = threading.Lock()
+        self._pages: Dict[str, PageTitles] = {}
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __contains__(self, title_norm: str) -> bool:
+        return title_norm in self._title_set
+
+    @property
+    def scans_all(self) -> bool:
+        """Tek geçişte tüm başlıklar aranabiliyor mu (Aho-Corasick otomatı var mı)."""
+        return self._automaton is not None
+
+    def find(self, text: str) -> Set[str]:
+        """text (normalize) içinde geçen başlıklar."""
+        if not text or not self.titles:
+            return set()
+        if self._automaton is not None:
+            found = {self.titles[k] for _, k in self._automaton.iter(text)}
+        else:
+            n = len(text)
+            found = {t for t in self.titles if len(t) <= n and t in text}
+        if get_similarity() > 0 and len(found) < len(self.titles):
+            page_tokens = text_tokens(text)
+            found.update(t for t in self.titles if t not in found and similar_in(t, page_tokens))
+        return found
+
+    def record(self, url: str, found: Iterable[str], final: bool = True, complete: bool = True) -> None:
+        if not url:
+            return
+        with self._lock:
+            if not complete:
+                # Eksik taramalar birikir: daha önce bu URL'de bulunanlar unutulmasın
+                seen = self._pages.get(url)
+                if seen is not None:
+                    found = seen.found.union(found)
+                    final = final and seen.final
+            self._pages[url] = PageTitles(frozenset(found), final, complete)
+
+    def _has(self, title_norm: str, text: str) -> bool:
+        if title_norm in text:
+            return True
+        return get_similarity() > 0 and similar_in(title_norm, text_tokens(text))
+
+    def scan(self, url: str, text: str, final: bool = True, title_norm: str = "") -> Set[str]:
+        """
+        Metni tara, sonucu URL için sakla ve döndür. Otomat yoksa yalnızca title_norm aranır
+        (dönüş {title_norm} ya da boş küme).
+        """
+        if self.scans_all or not title_norm:
+            found = self.find(text)
+            self.record(url, found, final)
+            return found
+        found = {title_norm} if (text and self._has(title_norm, text)) else set()
+        self.record(url, found, final, complete=False)
+        return found
+
+    def mark_final(self, url: str) -> None:
+        with self._lock:
+            seen = self._pages.get(url)
+            if seen is not None and not seen.final:
+                self._pages[url] = PageTitles(seen.found, True, seen.complete)
+
+    def found_on(self, url: str) -> Optional[PageTitles]:
+        with self._lock:
+            return self._pages.get(url)
+
+
+def title_found(title_norm: str, text_norm: str, matcher: Optional[TitleMatcher] = None,
+                url: str = "", final: bool = True, meta: Sequence[str] = ()) -> bool:
+    """
+    title_norm text_norm'da geçiyor mu? meta: sayfanın normalize metadata başlıkları
+    (htmltext: citation_title, og:title, <title>); önce bunlara bakılır.
+    matcher verilirse metin bir kez taranır ve sayfadaki tüm başlıklar url için kaydedilir.
+    """
+    # Normalize başlıkta satır sonu olmaz: "\n" ile birleştirilen parçalar arasında eşleşme oluşmaz
+    page = "\n".join((*meta, text_norm)) if meta else text_norm
+    if matcher is not None and url:
+        found = matcher.scan(url, page, final, title_norm)
+        if title_norm in matcher:
+            return title_norm in found
+    if not title_norm:
+        return False
+    if any(title_norm in t for t in meta) or title_norm in text_norm:
+        return True
+    if get_similarity() <= 0:
+        return False
+    return similar_in(title_norm, text_tokens(page))
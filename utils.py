@@ -1,25 +1,36 @@
 # utils.py
 import json
 import re
-from io import BytesIO
+import threading
 from pathlib import Path
-from typing import Any, Dict, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import requests
+import urllib3
 from selenium import webdriver
+from selenium.common.exceptions import (
+    InvalidSessionIdException, NoSuchWindowException, TimeoutException, WebDriverException
+)
 
-from config import UA
-
-# ---------- Metin yardımcıları ----------
-def normalize_text(s: str) -> str:
-    import re as _re
-    return _re.sub(r"\s+", " ", s or "").strip().lower()
+from config import UA, SELENIUM_TITLE_CHECK, TITLE_SIMILARITY_MIN_TOKENS
+from netcapture import navigate
+from pdf_cache import content_hash, get_pdf_cache, pdf_validator
+from pdf_service import extract_pdf_text, read_capped, truncation_note
+from titlematch import TitleMatcher, title_found
+from htmltext import page_text_norm
+# Metin normalizasyonu textnorm.py'de (NFKD + aksan silme, Türkçe harf katlama, varlık çözme)
+from textnorm import normalize_text, normalize_title, get_similarity, JS_NORMALIZE  # noqa: F401
 
 # ---------- JSONL yardımcıları ----------
+# Paralel tarayıcılar aynı dosyaya yazarken satırlar iç içe geçmesin
+_jsonl_lock = threading.Lock()
+
 def append_jsonl(path: Path, obj: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    line = json.dumps(obj, ensure_ascii=False) + "\n"
+    with _jsonl_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(line)
 
 def read_jsonl_names(path: Path) -> Set[str]:
     """summary.jsonl içindeki journal_name’leri (küçük harf) set olarak oku."""
@@ -40,91 +51,188 @@ def read_jsonl_names(path: Path) -> Set[str]:
     return names
 
 # ---------- PDF yardımcıları ----------
+def pdf_text_norm(pdf_bytes: bytes, *urls: str, validator: str = "",
+                  truncated: bool = False) -> Tuple[str, str]:
+    """
+    PDF baytlarının normalize metni. Önbellekte (aynı SHA-256) varsa pdfminer çalışmaz;
+    yeni çıkarılan metin URL'lerle (validator: son yanıtın pdf_validator'ı) birlikte önbelleğe yazılır.
+    truncated: baytlar read_capped ile PDF_MAX_BYTES sınırında kesildi.
+    Dönüş: (text_norm, not) — not yedek yöntem kullanıldıysa ya da PDF kesildiyse dolu.
+    """
+    cut = truncation_note() if truncated else ""
+    cache = get_pdf_cache()
+    sha = content_hash(pdf_bytes) if cache is not None else ""
+    if cache is not None:
+        text = cache.get(sha)
+        if text is not None:
+            cache.link(urls, sha, validator)
+            return text, cut
+    pdf = extract_pdf_text(pdf_bytes, truncated)
+    text = normalize_text(pdf.text)
+    if pdf.method != "pdfminer":
+        # Yedek yöntemin çıktısı önbelleğe girmez (pdfminer sonradan kurulabilir)
+        note = f"{pdf.method}: {pdf.error}"
+        return text, f"{cut}, {note}" if cut else note
+    if cache is not None:
+        cache.put(urls, sha, text, validator)
+    return text, cut
+
+def cached_pdf_text(*urls: str, validator: str = "") -> Optional[str]:
+    """
+    Bu URL'lerden biri daha önce çıkarılmış bir PDF'e çözüldüyse ve canlı yanıtın validator'ı
+    (pdf_validator) kayıtlıyla aynıysa normalize metni.
+    """
+    cache = get_pdf_cache()
+    return cache.get_by_url(*urls, validator=validator) if cache is not None else None
+
 def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
     """
-    Tercihen pdfminer.six ile PDF metni çıkar. Yoksa kaba fallback:
-    latin-1 decode (errors='ignore').
+    PDF metni (pdf_service havuzunda, ilk PDF_MAX_PAGES sayfa). pdfminer kullanılamazsa
+    PDF_FALLBACK uygulanır.
     """
-    try:
-        from pdfminer.high_level import extract_text
-        text = extract_text(BytesIO(pdf_bytes)) or ""
-        return text
-    except Exception:
-        try:
-            return pdf_bytes.decode("latin-1", errors="ignore")
-        except Exception:
-            return ""
+    return extract_pdf_text(pdf_bytes).text
 
 def fetch_pdf_text(url: str) -> Tuple[int, str]:
     """
-    PDF içeriğini indirip metne çevir. (status_code, text_norm) döndür.
+    PDF içeriğini (en fazla PDF_MAX_BYTES) indirip metne çevir. (status_code, text_norm) döndür.
+    Son URL önbellekte bir PDF'e bağlıysa gövde indirilmez.
     """
     try:
-        resp = requests.get(
+        with requests.get(
             url,
             headers={"User-Agent": UA},
             allow_redirects=True,
             timeout=15,
             verify=True,
-        )
-        status = resp.status_code
-        if status != 200 or not resp.content:
+            stream=True,
+        ) as resp:
+            status = resp.status_code
+            if status != 200:
+                return status, ""
+            final_url = resp.url or url
+            validator = pdf_validator(resp.headers)
+            cached = cached_pdf_text(final_url, validator=validator)
+            if cached is not None:
+                return status, cached
+            content, truncated = read_capped(resp.iter_content(chunk_size=64 * 1024))
+        if not content:
             return status, ""
-        text = extract_text_from_pdf_bytes(resp.content)
-        return status, normalize_text(text)
+        text_norm, _ = pdf_text_norm(content, url, final_url, validator=validator, truncated=truncated)
+        return status, text_norm
     except requests.RequestException:
         return 0, ""
 
 # ---------- Selenium + ağ ----------
+# Sayfa içinde çalışır: görünür metni normalize_text ile aynı kurala (JS_NORMALIZE) göre
+# normalize edip başlığı ve "404 not found"u arar. page_source yerine yalnızca bu küçük nesne döner;
+# inline script/style içerikleri innerText'e girmediği için oralarda eşleşme olmaz.
+# arguments: [başlık, diğer başlıklar, benzerlik eşiği, benzerlik için en az kelime]
+_IN_PAGE_CHECK_JS = JS_NORMALIZE + """
+var title = arguments[0] || "";
+var titles = arguments[1] || [];
+var threshold = arguments[2] || 0;
+var minTokens = arguments[3] || 1;
+var body = document.body ? (document.body.innerText || "") : "";
+var text = normalizeText((document.title || "") + " " + body);
+var pageTokens = null;
+function matches(t) {
+    if (text.indexOf(t) !== -1) return true;
+    if (threshold <= 0) return false;
+    var words = Array.from(new Set(textTokens(t)));
+    if (words.length < minTokens) return false;
+    if (pageTokens === null) pageTokens = new Set(textTokens(text));
+    var hit = 0;
+    for (var j = 0; j < words.length; j++) {
+        if (pageTokens.has(words[j])) hit++;
+    }
+    return hit >= threshold * words.length;
+}
+var found = [];
+for (var i = 0; i < titles.length; i++) {
+    if (matches(titles[i])) found.push(i);
+}
+return {
+    length: text.length,
+    has_title: title ? matches(title) : false,
+    not_found: text.indexOf("404 not found") !== -1,
+    found: found
+};
+"""
+
+# Bu hatalar sayfaya değil tarayıcıya ait: (0, ..., False) diye yutulmaz, çağırana geçer
+_DEAD_SESSION_MARKERS = (
+    "invalid session id", "session deleted", "no such window", "target window already closed",
+    "chrome not reachable", "disconnected:", "connection refused", "max retries exceeded",
+)
+
+def is_dead_session_error(e: BaseException) -> bool:
+    """Tarayıcı/chromedriver oturumu ölmüş mü? (zaman aşımı, sayfa hatası değil)"""
+    if isinstance(e, (InvalidSessionIdException, NoSuchWindowException, ConnectionError)):
+        return True
+    if isinstance(e, TimeoutException):
+        return False
+    if isinstance(e, (WebDriverException, urllib3.exceptions.HTTPError)):
+        msg = str(e).lower()
+        return any(m in msg for m in _DEAD_SESSION_MARKERS)
+    return False
+
+def _load_and_get_status(driver: webdriver.Chrome, url: str) -> Tuple[int, str, str]:
+    """
+    URL'e driver.get; ana belgenin status + mimeType'ı (netcapture).
+    Dönüş: (status_code_or_0, final_url, mimeType_or_empty)
+    """
+    nav = navigate(driver, url)
+    return nav.status, nav.final_url, nav.mime_type
+
 def get_http_status_source_mime(driver: webdriver.Chrome, url: str) -> Tuple[int, str, str, str]:
     """
-    URL'e driver.get; performance loglarından Document status + mimeType'ı bul.
+    URL'e driver.get; ana belgenin status + mimeType'ı (netcapture) ve sayfa kaynağı.
     Dönüş: (status_code_or_0, page_source, final_url, mimeType_or_empty)
+    Ölü oturum hataları (is_dead_session_error) yutulmaz.
     """
     if not url:
         return 0, "", "", ""
     try:
-        # Önceki logları temizle
-        try:
-            _ = driver.get_log("performance")
-        except Exception:
-            pass
-
-        driver.get(url)
-
-        status_code = 0
-        mime_type = ""
-        final_url = driver.current_url or url
-
-        try:
-            logs = driver.get_log("performance")
-            for entry in logs:
-                try:
-                    msg = json.loads(entry["message"])["message"]
-                except Exception:
-                    continue
-                if msg.get("method") == "Network.responseReceived":
-                    params = msg.get("params", {})
-                    if params.get("type") == "Document":
-                        resp = params.get("response", {})
-                        resp_url = resp.get("url") or ""
-                        code = int(resp.get("status", 0))
-                        mtype = resp.get("mimeType") or ""
-                        # final_url eşleşmesi varsa onu tercih et
-                        if resp_url == final_url:
-                            status_code = code
-                            mime_type = mtype or mime_type
-                        else:
-                            status_code = code
-                            mime_type = mtype or mime_type
-        except Exception:
-            pass
-
+        status_code, final_url, mime_type = _load_and_get_status(driver, url)
         html = driver.page_source or ""
-        return status_code, html, final_url, (mime_type or "")
-    except Exception:
+        return status_code, html, final_url, mime_type
+    except Exception as e:
+        if is_dead_session_error(e):
+            raise
         return 0, "", "", ""
 
+def get_http_status_page_verdict(
+    driver: webdriver.Chrome, url: str, title_norm: str, titles: Optional[List[str]] = None
+) -> Tuple[int, Optional[Dict[str, Any]], str, str]:
+    """
+    get_http_status_source_mime'ın sayfa içi karşılığı: kaynak yerine
+    {"length", "has_title", "not_found", "found"} döner.
+    titles: sayfada ayrıca aranacak başlıklar; "found" bulunanların indeksleri.
+    Dönüş: (status_code_or_0, verdict_or_None, final_url, mimeType_or_empty)
+    verdict None ise sayfa yüklenemedi ya da script çalışmadı (PDF görüntüleyici vb.).
+    Ölü oturum hataları (is_dead_session_error) yutulmaz.
+    """
+    if not url:
+        return 0, None, "", ""
+    try:
+        status_code, final_url, mime_type = _load_and_get_status(driver, url)
+    except Exception as e:
+        if is_dead_session_error(e):
+            raise
+        return 0, None, "", ""
+    if is_pdf_mime_or_url(mime_type, final_url):
+        return status_code, None, final_url, mime_type
+    try:
+        verdict = driver.execute_script(_IN_PAGE_CHECK_JS, title_norm or "", titles or [],
+                                        get_similarity(), TITLE_SIMILARITY_MIN_TOKENS)
+    except Exception as e:
+        if is_dead_session_error(e):
+            raise
+        verdict = None
+    if not isinstance(verdict, dict):
+        verdict = None
+    return status_code, verdict, final_url, mime_type
+
 def is_pdf_mime_or_url(mime_type: str, url: str) -> bool:
     mime_type = (mime_type or "").lower()
     url_l = (url or "").lower()
@@ -134,7 +242,9 @@ def build_doi_url(doi: str) -> str:
     doi = (doi or "").strip()
     return f"https://doi.org/{doi}" if doi else ""
 
-def check_url_selenium(driver: webdriver.Chrome, url: str, title_norm: str) -> Tuple[int, bool, str, bool]:
+def check_url_selenium(driver: webdriver.Chrome, url: str, title_norm: str,
+                       title_check: str = SELENIUM_TITLE_CHECK,
+                       matcher: Optional[TitleMatcher] = None) -> Tuple[int, bool, str, bool]:
     """
     Selenium ile URL'i aç ve değerlendir:
       - HTTP status,
@@ -142,12 +252,39 @@ def check_url_selenium(driver: webdriver.Chrome, url: str, title_norm: str) -> T
       - info,
       - erişilebilir mi (200 + body '404 not found' değil).
     PDF ise bytes indirip PDF metninde başlık ara.
+    title_check: "page" ise arama tarayıcıda yapılır (page_source aktarılmaz),
+    "source" ise page_source Python'da normalize edilip aranır.
+    matcher: verilirse sayfadaki tüm başlıklar da aranıp url için kaydedilir (titlematch).
     """
     from config import TIMEOUT  # sadece garanti amaçlı
     if not url:
         return 0, False, "boş URL", False
 
-    status, html, final_url, mime_type = get_http_status_source_mime(driver, url)
+    if title_check == "page":
+        titles = matcher.titles if matcher is not None else None
+        status, verdict, final_url, mime_type = get_http_status_page_verdict(driver, url, title_norm, titles)
+        if verdict is not None:
+            if status == 0:
+                status = 404 if verdict.get("not_found") else 200
+            if status == 200:
+                if verdict.get("not_found"):
+                    return 404, False, "200 ama body 404 içeriyor ❌", False
+                if titles:
+                    matcher.record(url, (titles[k] for k in verdict.get("found") or []
+                                         if isinstance(k, int) and 0 <= k < len(titles)))
+                return 200, bool(verdict.get("has_title")), "200 OK", True
+            return status, False, f"HTTP {status}", False
+        html = ""
+        if final_url and not is_pdf_mime_or_url(mime_type, final_url):
+            # Sayfa yüklendi ama script çalışmadı: yeniden açmadan kaynağa düş
+            try:
+                html = driver.page_source or ""
+            except Exception as e:
+                if is_dead_session_error(e):
+                    raise
+                html = ""
+    else:
+        status, html, final_url, mime_type = get_http_status_source_mime(driver, url)
 
     # PDF ise
     if is_pdf_mime_or_url(mime_type, final_url):
@@ -156,7 +293,7 @@ def check_url_selenium(driver: webdriver.Chrome, url: str, title_norm: str) -> T
         if st == 200:
             if "404 not found" in pdf_text_norm:
                 return 404, False, "PDF 200 ama içerikte '404 not found' var ❌", False
-            has_title = title_norm in pdf_text_norm if title_norm else False
+            has_title = title_found(title_norm, pdf_text_norm, matcher, url)
             return 200, has_title, "200 OK (PDF)", True
         else:
             return st, False, f"HTTP {st} (PDF)", False
@@ -165,13 +302,14 @@ def check_url_selenium(driver: webdriver.Chrome, url: str, title_norm: str) -> T
     if not html:
         return (404 if status == 0 else status), False, "İçerik boş / yüklenemedi", False
 
-    text_norm = normalize_text(html)
+    text_norm, meta_norm = page_text_norm(html)
+    not_found = "404 not found" in text_norm or any("404 not found" in t for t in meta_norm)
     if status == 0:
-        status = 404 if "404 not found" in text_norm else 200
+        status = 404 if not_found else 200
     if status == 200:
-        if "404 not found" in text_norm:
+        if not_found:
             return 404, False, "200 ama body 404 içeriyor ❌", False
-        has_title = title_norm in text_norm if title_norm else False
+        has_title = title_found(title_norm, text_norm, matcher, url, meta=meta_norm)
         return 200, has_title, "200 OK", True
     return status, False, f"HTTP {status}", False
 
@@ -0,0 +1,200 @@
+# work_queue.py
+"""
+Birden çok main.py sürecinin (aynı makinede ya da ortak diskte) dergi paylaştığı
+SQLite iş kuyruğu.
+- İş durumları: pending → leased → done / failed
+- claim() bir işi atomik olarak kiralar (BEGIN IMMEDIATE); kira JOB_LEASE_SECONDS sürer
+- Çalışan süreç heartbeat() ile kirayı uzatır; süresi dolan kira başka bir sürece geçer
+- Hata olursa fail(): JOB_MAX_ATTEMPTS'e kadar tekrar pending, sonra failed
+Kuyruğa aynı liste birden çok kez eklenebilir (INSERT OR IGNORE); sonradan katılan
+yardımcı süreç aynı komutla kuyruğa bağlanır.
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional
+
+from config import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS
+from run_state import normalize_issn
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    issn          TEXT PRIMARY KEY,
+    raw_issn      TEXT,
+    eissn         TEXT,
+    dp_name       TEXT,
+    idx           INTEGER,
+    state         TEXT NOT NULL DEFAULT 'pending',
+    owner         TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    last_error    TEXT,
+    updated_at    REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, idx);
+"""
+
+
+class Job(NamedTuple):
+    issn: str  # normalize ISSN (kuyruk anahtarı)
+    raw_issn: str  # Crossref'e gidecek ISSN (girdideki hali)
+    eissn: str
+    dp_name: str
+    idx: int
+    attempts: int
+
+
+def worker_id(suffix: str = "") -> str:
+    """host:pid[:suffix] — kiranın sahibi."""
+    base = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{base}:{suffix}" if suffix else base
+
+
+class WorkQueue:
+    def __init__(self, path: str, lease_seconds: float = JOB_LEASE_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = float(lease_seconds)
+        self.max_attempts = max(1, int(max_attempts))
+        self._lock = threading.Lock()
+        # isolation_level=None: transaction'ları BEGIN IMMEDIATE ile elle yönet
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        # IMMEDIATE: yazma kilidi baştan alınır; iki süreç aynı işi seçemez
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    # ---------- Kuyruğa ekleme ----------
+    def enqueue(self, journals: Iterable[Dict[str, Any]]) -> int:
+        """DergiPark listesini kuyruğa ekle (zaten olanlar değişmez). Eklenen iş sayısı."""
+        now = time.time()
+        added = 0
+        with self._tx() as c:
+            for idx, j in enumerate(journals, start=1):
+                issn = (j.get("issn") or "").strip()
+                eissn = (j.get("eissn") or "").strip()
+                key = normalize_issn(issn) or normalize_issn(eissn)
+                if not key:
+                    continue
+                cur = c.execute(
+                    "INSERT OR IGNORE INTO jobs (issn, raw_issn, eissn, dp_name, idx, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, issn or eissn, eissn, (j.get("journal_name") or "").strip(), idx, now),
+                )
+                added += cur.rowcount
+        return added
+
+    # ---------- İşçi tarafı ----------
+    def claim(self, owner: str) -> Optional[Job]:
+        """Sıradaki bekleyen (ya da kirası dolmuş) işi kirala; iş yoksa None."""
+        now = time.time()
+        with self._tx() as c:
+            # Hakkı bitmiş ve kirası dolmuş (çöken işçi) işler artık denenmez
+            c.execute(
+                "UPDATE jobs SET state = 'failed', last_error = COALESCE(last_error, 'kira doldu'), "
+                "updated_at = ? WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = c.execute(
+                "SELECT issn, raw_issn, eissn, dp_name, idx, attempts FROM jobs "
+                "WHERE (state = 'pending' OR (state = 'leased' AND lease_expires < ?)) "
+                "AND attempts < ? ORDER BY idx LIMIT 1",
+                (now, self.max_attempts),
+            ).fetchone()
+            if row is None:
+                return None
+            c.execute(
+                "UPDATE jobs SET state = 'leased', owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE issn = ?",
+                (owner, now + self.lease_seconds, now, row[0]),
+            )
+        return Job(row[0], row[1], row[2] or "", row[3] or "", row[4], row[5] + 1)
+
+    def heartbeat(self, job: Job, owner: str) -> bool:
+        """Kirayı uzat. Kira başkasına geçmişse False."""
+        now = time.time()
+        with self._tx() as c:
+            cur = c.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE issn = ? AND owner = ? AND state = 'leased'",
+                (now + self.lease_seconds, now, job.issn, owner),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job: Job, owner: str) -> None:
+        with self._tx() as c:
+            c.execute(
+                "UPDATE jobs SET state = 'done', lease_expires = NULL, updated_at = ? "
+                "WHERE issn = ? AND owner = ?",
+                (time.time(), job.issn, owner),
+            )
+
+    def fail(self, job: Job, owner: str, error: str = "") -> str:
+        """Deneme hakkı kaldıysa tekrar pending, yoksa failed. Yeni durumu döndür."""
+        new_state = "pending" if job.attempts < self.max_attempts else "failed"
+        with self._tx() as c:
+            c.execute(
+                "UPDATE jobs SET state = ?, lease_expires = NULL, last_error = ?, updated_at = ? "
+                "WHERE issn = ? AND owner = ?",
+                (new_state, error[:500], time.time(), job.issn, owner),
+            )
+        return new_state
+
+    def release(self, owner_prefix: str) -> int:
+        """
+        Bu sürecin (owner_prefix ile başlayan) kiraladığı işleri geri bırak (kesinti);
+        yarım deneme hak olarak sayılmaz.
+        """
+        with self._tx() as c:
+            cur = c.execute(
+                "UPDATE jobs SET state = 'pending', lease_expires = NULL, "
+                "attempts = MAX(attempts - 1, 0), updated_at = ? "
+                "WHERE state = 'leased' AND substr(owner, 1, length(?)) = ?",
+                (time.time(), owner_prefix, owner_prefix),
+            )
+            return cur.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {state: n for state, n in rows}
+
+    @contextmanager
+    def leased(self, job: Job, owner: str) -> Iterator[None]:
+        """Blok süresince arka planda heartbeat gönder."""
+        stop = threading.Event()
+
+        def _beat():
+            while not stop.wait(self.lease_seconds / 3):
+                try:
+                    if not self.heartbeat(job, owner):
+                        print(f"[QUEUE] {job.raw_issn} kirası başka işçiye geçti")
+                        return
+                except sqlite3.Error as e:
+                    print(f"[QUEUE] heartbeat hatası: {e}")
+
+        t = threading.Thread(target=_beat, name=f"heartbeat-{job.issn}", daemon=True)
+        t.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            t.join()